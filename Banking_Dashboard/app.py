@@ -1,11 +1,21 @@
+import pandas as pd
 import streamlit as st
-from utils.preprocessing import preprocess_data
+from utils import jobs
+from utils.datasets import current_dataset, memory_report
+from utils.export import FORMATS, dataset_export, file_name
+from utils.navigation import hide_disabled_pages
+from utils.profiling import PROFILE_ENABLED
+
+# Sessions get shallow views of the shared datasets (utils/datasets.py); with copy-on-write
+# a write in one session copies just the column it touches
+pd.set_option("mode.copy_on_write", True)
 
 st.set_page_config(
     page_title="Home Credit Default Risk Dashboard",
     page_icon="🏦",
     layout="wide"
 )
+hide_disabled_pages()
 
 st.title("🏦 Home Credit Default Risk Dashboard")
 st.markdown("""
@@ -27,31 +37,80 @@ Use the sidebar to navigate between modules:
 uploaded_file = st.file_uploader("Upload Dataset (CSV)", type=["csv"])
 
 # ------------------- Load Dataset -------------------
-if "df" not in st.session_state:
-    source = uploaded_file if uploaded_file else "application_train_10000.csv"
-    try:
-        df, outliers_dict, _ = preprocess_data(source)
-        st.session_state["df"] = df
-        st.session_state["outliers_dict"] = outliers_dict
-        st.success("Dataset loaded successfully.")
-    except FileNotFoundError:
-        st.error("Dataset not found. Please upload a CSV file.")
+# Preprocessing runs on a background worker (utils/jobs.py); a new upload cancels the session's running job.
+# Sessions keep only the dataset key; the processed frame lives once per process in utils/datasets.py.
+# A file that failed keeps its error (dataset_error) and is not submitted again until another upload
+upload_id = uploaded_file.file_id if uploaded_file else None
+if st.session_state.get("dataset_upload_id") != upload_id or not (
+        "dataset_key" in st.session_state or "dataset_error" in st.session_state
+        or jobs.get_job(st.session_state.get("dataset_job")) is not None):
+    jobs.cancel(st.session_state.get("dataset_job"))
+    st.session_state["dataset_job"] = jobs.submit(uploaded_file).id
+    st.session_state["dataset_upload_id"] = upload_id
+    st.session_state.pop("dataset_key", None)
+    st.session_state.pop("dataset_error", None)
+
+
+def show_partial(job):
+    # What the running job has published so far: schema and row count, then missing values, then engineered features
+    schema, nulls, engineered = job.artifact("schema"), job.artifact("nulls"), job.artifact("features")
+    if schema is not None:
+        st.write(f"**Shape:** {job.artifact('rows'):,} rows × {len(schema):,} columns (before feature engineering)")
+        with st.expander("📋 Schema"):
+            st.dataframe(schema, hide_index=True)
+    if nulls is not None:
+        st.subheader("🕳️ Missing Values (before treatment)")
+        st.dataframe(nulls.rename("missing").to_frame().head(20))
+    if engineered is not None and not engineered.empty:
+        st.subheader("🛠️ Engineered Features")
+        st.dataframe(engineered)
+
+
+finished_job = jobs.collect_job(st.session_state)
+if finished_job is not None and finished_job.state == "done":
+    timings = " (stage timings on the Performance page)" if PROFILE_ENABLED else ""
+    st.success(f"Dataset loaded successfully in {finished_job.wall_s:.2f}s{timings}.")
+if st.session_state.get("dataset_error"):
+    st.error(f"The dataset could not be processed: {st.session_state['dataset_error']}. Please upload another CSV file.")
+load_job = jobs.session_job(st.session_state)
+if load_job is not None:
+    jobs.follow_job(load_job, show_partial)
 
 # ------------------- Display Dataset -------------------
-if "df" in st.session_state:
-    df = st.session_state["df"]
+if st.session_state.get("dataset_key"):
+    dataset = current_dataset(st.session_state["dataset_key"])
+    if dataset is None:
+        # Gone from the registry and the preprocessing cache: process this session's file again
+        st.session_state.pop("dataset_key")
+        st.session_state["dataset_job"] = jobs.submit(uploaded_file).id
+        st.rerun()
+    df = dataset.frame()
 
     st.subheader("📊 Dataset Preview")
     st.dataframe(df.head())
     st.write(f"**Shape:** {df.shape[0]:,} rows × {df.shape[1]:,} columns")
 
-    if st.session_state.get("outliers_dict"):
+    if dataset.outliers:
         st.subheader("📈 Outlier Summary")
-        total_outliers = 0
-        for col, outliers in st.session_state["outliers_dict"].items():
-            st.write(f"**{col}:** {len(outliers)} outliers detected")
-        st.write(f"**Total Outliers:** {total_outliers}")
+        outliers_dict = dataset.outliers
+        for col, count in outliers_dict.counts().items():
+            st.write(f"**{col}:** {count} outliers detected")
+        st.write(f"**Total Outliers:** {outliers_dict.total()}")
     st.subheader("💾 Download Processed Dataset")
 
-    csv = df.to_csv(index=False).encode("utf-8")
-    st.download_button(label="📥 Download CSV",data=csv,file_name="processed_dataset.csv",mime="text/csv")
+    # The file is only written when asked for, in chunks, and kept per dataset version (utils/export.py)
+    col1, col2 = st.columns([3, 1])
+    export_format = col1.selectbox("Format", list(FORMATS), format_func=lambda f: FORMATS[f][0])
+    export_request = (dataset.key, export_format)
+    if col2.button("⚙️ Prepare Download"):
+        st.session_state["export_request"] = export_request
+    if st.session_state.get("export_request") == export_request:
+        with st.spinner("Preparing export..."):
+            export_path = dataset_export(dataset, export_format)
+        with open(export_path, "rb") as export_file:
+            st.download_button(label=f"📥 Download {FORMATS[export_format][0]}", data=export_file,
+                               file_name=file_name(export_format), mime=FORMATS[export_format][2],
+                               on_click="ignore")
+
+    with st.expander("🧠 Shared Dataset Memory"):
+        st.dataframe(memory_report())
@@ -0,0 +1,66 @@
+"""
+Micro-benchmark: row-wise apply feature engineering vs the vectorized registry in utils/features.py.
+
+Run from Banking_Dashboard/:
+    python -m benchmarks.bench_features [rows ...]
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.features import compute_features
+
+DEFAULT_ROWS = [10_000, 300_000, 3_000_000]
+FAMILY_STATUSES = ["Married", "Single / not married", "Civil marriage", "Separated", "Widow"]
+
+
+def make_inputs(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "DAYS_BIRTH": -rng.integers(7_500, 25_000, n).astype("int16"),
+        "DAYS_EMPLOYED": np.where(rng.random(n) < 0.18, 365243, -rng.integers(0, 15_000, n)).astype("int32"),
+        "NAME_FAMILY_STATUS": pd.Categorical(rng.choice(FAMILY_STATUSES, n)),
+        "CNT_CHILDREN": rng.poisson(0.4, n).astype("int8"),
+        "CNT_FAM_MEMBERS": rng.integers(1, 6, n).astype("float16"),
+        "AMT_INCOME_TOTAL": rng.lognormal(11.9, 0.5, n).astype("float32"),
+        "AMT_CREDIT": rng.lognormal(13, 0.6, n).astype("float32"),
+        "AMT_ANNUITY": rng.lognormal(10, 0.5, n).astype("float32"),
+    })
+
+
+def legacy_features(df):
+    # The apply-based rules preprocess_data used before the registry
+    df["AGE_YEARS"] = (-df["DAYS_BIRTH"] / 365.25).astype(int)
+    df["EMPLOYMENT_YEARS"] = df["DAYS_EMPLOYED"].apply(lambda x: -x / 365.25 if x < 0 else None)
+    df["IS_MARRIED"] = df["NAME_FAMILY_STATUS"].apply(lambda x: 1 if x in ["Married", "Civil marriage"] else 0)
+    df["HAS_CHILDREN"] = (df["CNT_CHILDREN"] > 0).astype(int)
+    df["FAMILY_SIZE"] = df["CNT_FAM_MEMBERS"].fillna(df["CNT_FAM_MEMBERS"].median())
+    df["LTI"] = df["AMT_CREDIT"] / df["AMT_INCOME_TOTAL"]
+    df["DTI"] = df["AMT_ANNUITY"] / df["AMT_INCOME_TOTAL"]
+    df["ANNUITY_TO_CREDIT_RATIO"] = df["AMT_ANNUITY"] / df["AMT_CREDIT"]
+    return df
+
+
+def best_of(fn, base, repeat=3):
+    times = []
+    for _ in range(repeat):
+        frame = base.copy()
+        start = time.perf_counter()
+        fn(frame)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(rows):
+    print(f"{'rows':>10} {'apply (s)':>10} {'vector (s)':>11} {'speedup':>8}")
+    for n in rows:
+        base = make_inputs(n)
+        legacy = best_of(legacy_features, base, repeat=1 if n > 1_000_000 else 3)
+        vector = best_of(compute_features, base)
+        print(f"{n:>10,} {legacy:>10.3f} {vector:>11.4f} {legacy / vector:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or DEFAULT_ROWS)
@@ -0,0 +1,350 @@
+"""
+Pipeline benchmark: time and memory of every preprocessing stage and of each page's
+KPI block, on synthetic application_train-shaped data (benchmarks/synthetic.py).
+
+Run from Banking_Dashboard/:
+    python -m benchmarks.bench_pipeline [--rows 10000 100000 ...] [--out results.json]
+    python -m benchmarks.bench_pipeline --compare baseline.json results.json [--threshold 0.2]
+    python -m benchmarks.bench_pipeline --memory-check [--rows ...] [--max-headroom 1.3]
+
+Each measurement records wall and CPU seconds (best of --repeat), the peak RSS growth
+over the stage (sampled by a background thread; reads low when the allocator reuses freed
+pages) and the peak of traced allocations, which numpy reports to tracemalloc and which
+is taken in a separate untimed call. Generated CSVs are kept in --data-dir
+and reused across runs. --compare exits with status 1 when any stage regressed.
+
+--memory-check runs the in-memory stages once per size in a fresh process and fails
+(status 1) when their peak RSS growth over the loaded frame exceeds --max-headroom
+times the final frame. CSV parsing is left out: the reader's buffers scale with the file.
+It also fails when a registered Dataset, with its 0/1 indicator columns packed into
+bitmaps, does not hold fewer bytes than the processed frame it was built from.
+"""
+import argparse
+import gc
+import json
+import multiprocessing as mp
+import os
+import platform
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import psutil
+
+from benchmarks.synthetic import write_csv
+from utils import preprocessing
+from utils.aggregates import build_cube
+from utils.datasets import Dataset
+from utils.filters import FilterEngine
+
+DEFAULT_ROWS = [10_000, 100_000, 1_000_000, 5_000_000]
+DATA_DIR = os.environ.get("BANKING_BENCH_DIR", ".cache/bench")
+# Differences below these are noise, whatever the ratio
+MIN_SECONDS = 0.005
+MIN_RSS_MB = 5.0
+# Extra memory the in-memory stages may take beyond the loaded frame, as a multiple of the final frame
+MAX_HEADROOM = 1.3
+
+
+# ------------------- Measurement -------------------
+class _PeakRss:
+    """Highest RSS of this process seen while the block runs."""
+
+    def __init__(self, interval=0.002):
+        self.interval = interval
+        self.proc = psutil.Process()
+
+    def __enter__(self):
+        self.start = self.peak = self.proc.memory_info().rss
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self.proc.memory_info().rss)
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.proc.memory_info().rss)
+        self.end = self.proc.memory_info().rss
+
+
+def _alloc_peak_mb(fn, *args):
+    tracemalloc.start()
+    try:
+        fn(*args)
+        return tracemalloc.get_traced_memory()[1] / 1024**2
+    finally:
+        tracemalloc.stop()
+
+
+def measure(fn, *args, repeat=1):
+    """
+    (result of the last timed call, stats): best wall/CPU time and largest peak RSS growth
+    over `repeat` calls, plus the traced allocation peak of one more call.
+    """
+    wall, cpu, peak = [], [], []
+    for _ in range(repeat):
+        with _PeakRss() as rss:
+            t0, c0 = time.perf_counter(), time.process_time()
+            result = fn(*args)
+            wall.append(time.perf_counter() - t0)
+            cpu.append(time.process_time() - c0)
+        peak.append((rss.peak - rss.start) / 1024**2)
+    return result, {"wall_s": min(wall), "cpu_s": min(cpu), "peak_rss_mb": max(peak),
+                    "alloc_peak_mb": _alloc_peak_mb(fn, *args)}
+
+
+def _frame_mb(df):
+    return float(df.memory_usage(deep=True).sum()) / 1024**2
+
+
+# ------------------- Page KPI Blocks -------------------
+# The statistics each page computes before drawing, as in pages/*.py
+def kpis_overview(df, cube):
+    return {
+        "total": df["SK_ID_CURR"].count(),
+        "default_rate": cube.mean("TARGET") * 100,
+        "missing": df.isnull().mean().mean() * 100,
+        "numeric": df.select_dtypes(include="number").shape[1],
+        "categorical": df.select_dtypes(include=["object", "category"]).shape[1],
+        "median_age": df["AGE_YEARS"].median(),
+        "median_income": df["AMT_INCOME_TOTAL"].median(),
+        "avg_credit": cube.mean("AMT_CREDIT"),
+    }
+
+
+def kpis_target_risk(df, cube):
+    defaulters = {"TARGET": 1}
+    out = {"defaults": cube.sum("TARGET"), "rate": cube.mean("TARGET")}
+    for col in ("AMT_INCOME_TOTAL", "AMT_CREDIT", "AMT_ANNUITY", "EMPLOYMENT_YEARS"):
+        out[col] = cube.mean(col, where=defaulters)
+    for col in ("CODE_GENDER", "NAME_EDUCATION_TYPE", "NAME_FAMILY_STATUS", "NAME_HOUSING_TYPE"):
+        out[col] = cube.mean("TARGET", by=col)
+    return out
+
+
+def kpis_finance(df, cube):
+    out = {col: cube.mean(col) for col in ("AMT_INCOME_TOTAL", "AMT_CREDIT", "AMT_ANNUITY", "AMT_GOODS_PRICE", "DTI", "LTI")}
+    out["median_income"] = df["AMT_INCOME_TOTAL"].median()
+    out["income_by_target"] = cube.mean("AMT_INCOME_TOTAL", by="TARGET")
+    out["credit_by_target"] = cube.mean("AMT_CREDIT", by="TARGET")
+    out["high_credit"] = cube.mean("HIGH_CREDIT")
+    return out
+
+
+def kpis_demographics(df, cube):
+    return {
+        "gender_share": cube.share("CODE_GENDER"),
+        "age_defaulters": cube.mean("AGE_YEARS", where={"TARGET": 1}),
+        "age_repaid": cube.mean("AGE_YEARS", where={"TARGET": 0}),
+        "children": cube.mean("HAS_CHILDREN"),
+        "family_size": cube.mean("FAMILY_SIZE"),
+        "married": cube.mean("IS_MARRIED"),
+        "education": cube.share("NAME_EDUCATION_TYPE"),
+        "housing": cube.share("NAME_HOUSING_TYPE"),
+        "working": cube.mean("CURRENTLY_WORKING"),
+        "employment": cube.mean("DAYS_EMPLOYED_WORKING"),
+    }
+
+
+CORR_DIMS = ("CODE_GENDER", "NAME_EDUCATION_TYPE")
+CORR_COLS = ["AGE_YEARS", "AMT_CREDIT", "AMT_INCOME_TOTAL", "AMT_ANNUITY",
+             "EMPLOYMENT_YEARS", "CNT_FAM_MEMBERS", "DTI", "LTI", "TARGET"]
+
+
+def kpis_correlations(df, engine):
+    selection = {d: list(df[d].unique()) for d in CORR_DIMS}
+    corr = engine.corr(selection)
+    return {"rows": int(engine.mask(selection).sum()), "target_corr": corr["TARGET"].sort_values()}
+
+
+# ------------------- Benchmark Run -------------------
+def dataset_path(rows, seed, data_dir=DATA_DIR):
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"application_train_synth_{rows}_s{seed}.csv")
+    if not os.path.exists(path):
+        print(f"generating {rows:,} rows -> {path}", file=sys.stderr)
+        write_csv(path, rows, seed)
+    return path
+
+
+def bench_rows(rows, seed=0, repeat=None, data_dir=DATA_DIR):
+    """Stage results for one dataset size, in pipeline order."""
+    repeat = repeat or (1 if rows >= 1_000_000 else 3)
+    path = dataset_path(rows, seed, data_dir)
+    results = {}
+
+    def record(name, fn, *args):
+        frame_in = args[0] if args and isinstance(args[0], pd.DataFrame) else None
+        out, stats = measure(fn, *args, repeat=repeat)
+        if frame_in is not None:
+            stats["frame_in_mb"] = _frame_mb(frame_in)
+        if isinstance(out, pd.DataFrame):
+            stats["frame_out_mb"] = _frame_mb(out)
+            stats["shape_out"] = list(out.shape)
+        results[name] = stats
+        print(f"{rows:>10,} {name:<24} {stats['wall_s']:>9.3f}s {stats['cpu_s']:>9.3f}s "
+              f"{stats['peak_rss_mb']:>9.1f}MB rss {stats['alloc_peak_mb']:>9.1f}MB alloc", file=sys.stderr)
+        return out
+
+    df = record("load", preprocessing._load_data, path)
+    df = record("optimize_dataframe", preprocessing.optimize_dataframe, df)
+    df = record("treat_nulls", preprocessing.treat_nulls, df)
+    record("find_outliers_iqr", preprocessing.find_outliers_iqr, df)
+    df = record("engineer_features", lambda frame: preprocessing.engineer_features(frame.copy()), df)
+
+    cube = record("kpi_cube", build_cube, df)
+    record("page.overview", kpis_overview, df, cube)
+    record("page.target_risk", kpis_target_risk, df, cube)
+    record("page.finance_health", kpis_finance, df, cube)
+    record("page.demographics", kpis_demographics, df, cube)
+    cols = [c for c in CORR_COLS if c in df.columns]
+    engine = record("page.correlations.engine", lambda frame: FilterEngine(frame, CORR_DIMS, cols), df)
+    record("page.correlations", kpis_correlations, df, engine)
+    return results
+
+
+def run(rows_list, seed=0, repeat=None, data_dir=DATA_DIR):
+    return {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "seed": seed,
+        },
+        "results": {str(rows): bench_rows(rows, seed, repeat, data_dir) for rows in rows_list},
+    }
+
+
+# ------------------- Memory Check -------------------
+def _stage_headroom(path):
+    # Runs in a fresh process, so RSS reflects only this pipeline
+    df = preprocessing._load_data(path)
+    gc.collect()
+    with _PeakRss() as rss:
+        df = preprocessing.optimize_dataframe(df)
+        df = preprocessing.treat_nulls(df)
+        preprocessing.find_outliers_iqr(df)
+        df = preprocessing.engineer_features(df)
+    return (rss.peak - rss.start) / 1024**2, _frame_mb(df)
+
+
+def memory_check(rows, seed=0, data_dir=DATA_DIR, max_headroom=MAX_HEADROOM):
+    """Peak RSS growth of optimize -> treat_nulls -> outliers -> features against the final frame."""
+    path = dataset_path(rows, seed, data_dir)
+    with ProcessPoolExecutor(1, mp_context=mp.get_context("spawn")) as pool:
+        headroom_mb, frame_mb = pool.submit(_stage_headroom, path).result()
+    ratio = headroom_mb / frame_mb if frame_mb else 0.0
+    passed = headroom_mb <= max_headroom * frame_mb + MIN_RSS_MB  # small frames: fixed overhead is noise
+    return {"headroom_mb": headroom_mb, "frame_mb": frame_mb, "ratio": ratio, "passed": passed}
+
+
+def indicator_check(rows, seed=0, data_dir=DATA_DIR):
+    """Dataset.nbytes() (indicator columns packed) against the processed frame it holds."""
+    path = dataset_path(rows, seed, data_dir)
+    df, outliers_dict, _ = preprocessing.preprocess_data(path, use_cache=False)
+    dataset = Dataset(None, path, df, outliers_dict)
+    frame_mb, dataset_mb = _frame_mb(df), dataset.nbytes() / 1024**2
+    return {"frame_mb": frame_mb, "dataset_mb": dataset_mb, "packed": len(dataset.indicators()),
+            "passed": dataset_mb < frame_mb}
+
+
+def print_indicator_check(checks):
+    print(f"{'rows':>10} {'packed':>7} {'frame MB':>10} {'dataset MB':>11} {'saved':>7}")
+    for rows, c in checks.items():
+        flag = "" if c["passed"] else "  NOT SMALLER"
+        saved = 1 - c["dataset_mb"] / c["frame_mb"] if c["frame_mb"] else 0.0
+        print(f"{rows:>10,} {c['packed']:>7} {c['frame_mb']:>10.1f} {c['dataset_mb']:>11.1f} {saved:>6.1%}{flag}")
+    failures = sum(not c["passed"] for c in checks.values())
+    print(f"\n{failures} size(s) where packing indicators did not shrink the dataset")
+    return failures
+
+
+def print_memory_check(checks, max_headroom):
+    print(f"{'rows':>10} {'headroom MB':>12} {'frame MB':>10} {'ratio':>7}")
+    for rows, c in checks.items():
+        flag = "" if c["passed"] else "  OVER"
+        print(f"{rows:>10,} {c['headroom_mb']:>12.1f} {c['frame_mb']:>10.1f} {c['ratio']:>6.2f}x{flag}")
+    failures = sum(not c["passed"] for c in checks.values())
+    print(f"\n{failures} size(s) over {max_headroom:.2f}x the final frame")
+    return failures
+
+
+# ------------------- Comparison -------------------
+def compare(old, new, threshold=0.2):
+    """Rows of (rows, stage, metric, old, new, ratio, regressed) for every stage present in both runs."""
+    out = []
+    for rows, stages in new["results"].items():
+        for stage, stats in stages.items():
+            before = old["results"].get(rows, {}).get(stage)
+            if before is None:
+                continue
+            for metric, floor in (("wall_s", MIN_SECONDS), ("peak_rss_mb", MIN_RSS_MB), ("alloc_peak_mb", MIN_RSS_MB)):
+                if metric not in before or metric not in stats:
+                    continue
+                a, b = before[metric], stats[metric]
+                ratio = b / a if a > 0 else float("inf") if b > 0 else 1.0
+                regressed = b - a > floor and ratio > 1 + threshold
+                out.append((int(rows), stage, metric, a, b, ratio, regressed))
+    return out
+
+
+def print_comparison(rows, threshold):
+    print(f"{'rows':>10} {'stage':<24} {'metric':<14} {'old':>10} {'new':>10} {'ratio':>7}")
+    for n, stage, metric, a, b, ratio, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{n:>10,} {stage:<24} {metric:<14} {a:>10.3f} {b:>10.3f} {ratio:>6.2f}x{flag}")
+    regressions = sum(r[-1] for r in rows)
+    print(f"\n{regressions} regression(s) above {threshold:.0%}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark preprocessing stages and page KPI blocks.")
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=None, help="default: 3 below 1M rows, else 1")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--out", help="write results JSON here (default: stdout)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative slowdown flagged as regression")
+    parser.add_argument("--memory-check", action="store_true", help="only check stage memory headroom")
+    parser.add_argument("--max-headroom", type=float, default=MAX_HEADROOM,
+                        help="allowed peak RSS growth of the in-memory stages, in final-frame sizes")
+    args = parser.parse_args(argv)
+
+    if args.memory_check:
+        checks = {rows: memory_check(rows, args.seed, args.data_dir, args.max_headroom) for rows in args.rows}
+        failures = print_memory_check(checks, args.max_headroom)
+        print()
+        failures += print_indicator_check({rows: indicator_check(rows, args.seed, args.data_dir) for rows in args.rows})
+        return 1 if failures else 0
+
+    if args.compare:
+        with open(args.compare[0]) as fh_old, open(args.compare[1]) as fh_new:
+            old, new = json.load(fh_old), json.load(fh_new)
+        return 1 if print_comparison(compare(old, new, args.threshold), args.threshold) else 0
+
+    report = run(args.rows, args.seed, args.repeat, args.data_dir)
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+"""
+Seeded synthetic data shaped like Home Credit's application_train.csv.
+
+Same 122 columns, CSV dtypes, approximate null ratios and category cardinalities as the
+real file, the DAYS_EMPLOYED == 365243 sentinel for pensioners / unemployed applicants,
+and a TARGET rate of ~8% that leans on EXT_SOURCE_2/3 so correlation charts have signal.
+
+Run from Banking_Dashboard/:
+    python -m benchmarks.synthetic ROWS OUT.csv [--seed N]
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+DAYS_EMPLOYED_SENTINEL = 365243
+SENTINEL_RATIO = 0.18
+TARGET_RATE = 0.08
+CHUNK_ROWS = 250_000
+
+# ------------------- Categorical Columns: (values, probabilities, null ratio) -------------------
+CATEGORICAL = {
+    "NAME_CONTRACT_TYPE": (["Cash loans", "Revolving loans"], [0.905, 0.095], 0.0),
+    "CODE_GENDER": (["F", "M", "XNA"], [0.6583, 0.3416, 0.0001], 0.0),
+    "FLAG_OWN_CAR": (["N", "Y"], [0.66, 0.34], 0.0),
+    "FLAG_OWN_REALTY": (["Y", "N"], [0.694, 0.306], 0.0),
+    "NAME_TYPE_SUITE": (
+        ["Unaccompanied", "Family", "Spouse, partner", "Children", "Other_B", "Other_A", "Group of people"],
+        [0.812, 0.131, 0.037, 0.011, 0.006, 0.002, 0.001], 0.0042),
+    "NAME_INCOME_TYPE": (
+        ["Working", "Commercial associate", "State servant", "Student", "Businessman", "Maternity leave"],
+        [0.6305, 0.2835, 0.0853, 0.0003, 0.0003, 0.0001], 0.0),
+    "NAME_EDUCATION_TYPE": (
+        ["Secondary / secondary special", "Higher education", "Incomplete higher", "Lower secondary", "Academic degree"],
+        [0.7102, 0.2435, 0.0334, 0.0124, 0.0005], 0.0),
+    "NAME_FAMILY_STATUS": (
+        ["Married", "Single / not married", "Civil marriage", "Separated", "Widow", "Unknown"],
+        [0.6388, 0.1478, 0.0968, 0.0643, 0.0523, 0.0000], 0.0),
+    "NAME_HOUSING_TYPE": (
+        ["House / apartment", "With parents", "Municipal apartment", "Rented apartment", "Office apartment", "Co-op apartment"],
+        [0.8873, 0.0483, 0.0364, 0.0159, 0.0085, 0.0036], 0.0),
+    "OCCUPATION_TYPE": (
+        ["Laborers", "Sales staff", "Core staff", "Managers", "Drivers", "High skill tech staff", "Accountants",
+         "Medicine staff", "Security staff", "Cooking staff", "Cleaning staff", "Private service staff",
+         "Low-skill Laborers", "Waiters/barmen staff", "Secretaries", "Realty agents", "HR staff", "IT staff"],
+        [0.2607, 0.1517, 0.1301, 0.1009, 0.0879, 0.0537, 0.0463, 0.0402, 0.0316, 0.0280,
+         0.0220, 0.0125, 0.0099, 0.0064, 0.0062, 0.0035, 0.0027, 0.0025], 0.3135),
+    "WEEKDAY_APPR_PROCESS_START": (
+        ["TUESDAY", "WEDNESDAY", "MONDAY", "THURSDAY", "FRIDAY", "SATURDAY", "SUNDAY"],
+        [0.1753, 0.1689, 0.1649, 0.1645, 0.1637, 0.1101, 0.0526], 0.0),
+    "ORGANIZATION_TYPE": (
+        ["Business Entity Type 3", "Self-employed", "Other", "Medicine", "Business Entity Type 2", "Government",
+         "School", "Trade: type 7", "Kindergarten", "Construction", "Business Entity Type 1", "Transport: type 4",
+         "Trade: type 3", "Industry: type 9", "Industry: type 3", "Security", "Housing", "Industry: type 11",
+         "Military", "Bank", "Agriculture", "Police", "Transport: type 2", "Postal", "Security Ministries",
+         "Trade: type 2", "Restaurant", "Services", "University", "Industry: type 7", "Transport: type 3",
+         "Industry: type 1", "Hotel", "Electricity", "Industry: type 4", "Trade: type 6", "Industry: type 5",
+         "Insurance", "Telecom", "Emergency", "Industry: type 2", "Advertising", "Realtor", "Culture",
+         "Industry: type 12", "Trade: type 1", "Mobile", "Legal Services", "Cleaning", "Transport: type 1",
+         "Industry: type 6", "Industry: type 10", "Religion", "Industry: type 13", "Trade: type 4",
+         "Trade: type 5", "Industry: type 8"],
+        None, 0.0),
+    "FONDKAPREMONT_MODE": (
+        ["reg oper account", "reg oper spec account", "not specified", "org spec account"],
+        [0.76, 0.12, 0.06, 0.06], 0.6839),
+    "HOUSETYPE_MODE": (["block of flats", "specific housing", "terraced house"], [0.983, 0.010, 0.007], 0.5018),
+    "WALLSMATERIAL_MODE": (
+        ["Panel", "Stone, brick", "Block", "Wooden", "Mixed", "Monolithic", "Others"],
+        [0.433, 0.424, 0.061, 0.035, 0.015, 0.012, 0.020], 0.5084),
+    "EMERGENCYSTATE_MODE": (["No", "Yes"], [0.986, 0.014], 0.4740),
+}
+
+# Building statistics: base name -> null ratio; each comes as _AVG, _MODE and _MEDI
+BUILDING = {
+    "APARTMENTS": 0.5075, "BASEMENTAREA": 0.5852, "YEARS_BEGINEXPLUATATION": 0.4878, "YEARS_BUILD": 0.6650,
+    "COMMONAREA": 0.6987, "ELEVATORS": 0.5330, "ENTRANCES": 0.5035, "FLOORSMAX": 0.4976, "FLOORSMIN": 0.6785,
+    "LANDAREA": 0.5938, "LIVINGAPARTMENTS": 0.6835, "LIVINGAREA": 0.5019, "NONLIVINGAPARTMENTS": 0.6941,
+    "NONLIVINGAREA": 0.5518,
+}
+DOCUMENT_RATES = {3: 0.71, 6: 0.088, 8: 0.081, 5: 0.015, 9: 0.004, 11: 0.004, 18: 0.008, 16: 0.0099,
+                  13: 0.0035, 14: 0.0029, 15: 0.0012, 19: 0.0006, 20: 0.0005, 21: 0.0003, 7: 0.0002,
+                  17: 0.0003, 2: 0.00004, 4: 0.00008, 10: 0.00002, 12: 0.000007}
+CREDIT_BUREAU = {"HOUR": 0.006, "DAY": 0.007, "WEEK": 0.034, "MON": 0.27, "QRT": 0.27, "YEAR": 1.9}
+
+COLUMNS = (
+    ["SK_ID_CURR", "TARGET", "NAME_CONTRACT_TYPE", "CODE_GENDER", "FLAG_OWN_CAR", "FLAG_OWN_REALTY",
+     "CNT_CHILDREN", "AMT_INCOME_TOTAL", "AMT_CREDIT", "AMT_ANNUITY", "AMT_GOODS_PRICE", "NAME_TYPE_SUITE",
+     "NAME_INCOME_TYPE", "NAME_EDUCATION_TYPE", "NAME_FAMILY_STATUS", "NAME_HOUSING_TYPE",
+     "REGION_POPULATION_RELATIVE", "DAYS_BIRTH", "DAYS_EMPLOYED", "DAYS_REGISTRATION", "DAYS_ID_PUBLISH",
+     "OWN_CAR_AGE", "FLAG_MOBIL", "FLAG_EMP_PHONE", "FLAG_WORK_PHONE", "FLAG_CONT_MOBILE", "FLAG_PHONE",
+     "FLAG_EMAIL", "OCCUPATION_TYPE", "CNT_FAM_MEMBERS", "REGION_RATING_CLIENT", "REGION_RATING_CLIENT_W_CITY",
+     "WEEKDAY_APPR_PROCESS_START", "HOUR_APPR_PROCESS_START", "REG_REGION_NOT_LIVE_REGION",
+     "REG_REGION_NOT_WORK_REGION", "LIVE_REGION_NOT_WORK_REGION", "REG_CITY_NOT_LIVE_CITY",
+     "REG_CITY_NOT_WORK_CITY", "LIVE_CITY_NOT_WORK_CITY", "ORGANIZATION_TYPE", "EXT_SOURCE_1", "EXT_SOURCE_2",
+     "EXT_SOURCE_3"]
+    + [f"{b}_{s}" for s in ("AVG", "MODE", "MEDI") for b in BUILDING]
+    + ["FONDKAPREMONT_MODE", "HOUSETYPE_MODE", "TOTALAREA_MODE", "WALLSMATERIAL_MODE", "EMERGENCYSTATE_MODE",
+       "OBS_30_CNT_SOCIAL_CIRCLE", "DEF_30_CNT_SOCIAL_CIRCLE", "OBS_60_CNT_SOCIAL_CIRCLE",
+       "DEF_60_CNT_SOCIAL_CIRCLE", "DAYS_LAST_PHONE_CHANGE"]
+    + [f"FLAG_DOCUMENT_{k}" for k in range(2, 22)]
+    + [f"AMT_REQ_CREDIT_BUREAU_{p}" for p in CREDIT_BUREAU]
+)
+
+
+def _with_nulls(rng, values, ratio):
+    if ratio <= 0:
+        return values
+    values = values.astype("float64") if values.dtype.kind in "iub" else values.astype(object)
+    values[rng.random(len(values)) < ratio] = np.nan if values.dtype.kind == "f" else None
+    return values
+
+
+def _choice(rng, n, name):
+    values, probs, null_ratio = CATEGORICAL[name]
+    if probs is None:  # long tail: Zipf-like weights
+        probs = 1.0 / np.arange(1, len(values) + 1)
+    probs = np.asarray(probs, dtype=np.float64)
+    return _with_nulls(rng, np.asarray(values, dtype=object)[rng.choice(len(values), n, p=probs / probs.sum())], null_ratio)
+
+
+def _binary(rng, n, p):
+    return (rng.random(n) < p).astype(np.int64)
+
+
+def generate(n, seed=0, start_id=100002):
+    """One DataFrame of n synthetic applications with the application_train columns, in file order."""
+    rng = np.random.default_rng(seed)
+    cols = {"SK_ID_CURR": np.arange(start_id, start_id + n, dtype=np.int64)}
+
+    for name in ("NAME_CONTRACT_TYPE", "CODE_GENDER", "FLAG_OWN_CAR", "FLAG_OWN_REALTY", "NAME_TYPE_SUITE",
+                 "NAME_EDUCATION_TYPE", "NAME_FAMILY_STATUS", "NAME_HOUSING_TYPE", "OCCUPATION_TYPE",
+                 "WEEKDAY_APPR_PROCESS_START", "ORGANIZATION_TYPE", "FONDKAPREMONT_MODE", "HOUSETYPE_MODE",
+                 "WALLSMATERIAL_MODE", "EMERGENCYSTATE_MODE"):
+        cols[name] = _choice(rng, n, name)
+
+    # Applicants without a job carry the sentinel, as in the real file
+    not_working = rng.random(n) < SENTINEL_RATIO
+    cols["DAYS_EMPLOYED"] = np.where(not_working, DAYS_EMPLOYED_SENTINEL,
+                                     -np.minimum(rng.exponential(2_400, n).astype(np.int64), 17_900))
+    cols["NAME_INCOME_TYPE"] = np.where(not_working, "Pensioner", _choice(rng, n, "NAME_INCOME_TYPE"))
+    cols["ORGANIZATION_TYPE"] = np.where(not_working, "XNA", cols["ORGANIZATION_TYPE"])
+    cols["OCCUPATION_TYPE"] = np.where(not_working, None, cols["OCCUPATION_TYPE"])
+    cols["DAYS_BIRTH"] = -rng.integers(7_489, 25_229, n)
+    cols["DAYS_BIRTH"] = np.where(not_working, -rng.integers(20_000, 25_229, n), cols["DAYS_BIRTH"])
+
+    children = np.minimum(rng.poisson(0.42, n), 19)
+    married = np.isin(cols["NAME_FAMILY_STATUS"], ["Married", "Civil marriage"])
+    cols["CNT_CHILDREN"] = children
+    cols["CNT_FAM_MEMBERS"] = _with_nulls(rng, 1.0 + married + children, 0.000007)
+
+    income = np.round(rng.lognormal(11.96, 0.5, n) / 450) * 450
+    credit = np.round(np.clip(rng.lognormal(13.07, 0.57, n), 45_000, 4_050_000) / 10) * 10
+    cols["AMT_INCOME_TOTAL"] = income
+    cols["AMT_CREDIT"] = credit
+    cols["AMT_ANNUITY"] = _with_nulls(rng, np.round(credit * rng.uniform(0.025, 0.09, n), 1), 0.00004)
+    cols["AMT_GOODS_PRICE"] = _with_nulls(rng, np.round(credit * rng.uniform(0.8, 1.0, n) / 4_500) * 4_500, 0.0009)
+
+    cols["REGION_POPULATION_RELATIVE"] = np.round(rng.gamma(2.0, 0.01, n), 6)
+    cols["DAYS_REGISTRATION"] = -np.round(rng.uniform(0, 24_672, n)).astype(np.float64)
+    cols["DAYS_ID_PUBLISH"] = -rng.integers(0, 7_197, n)
+    cols["OWN_CAR_AGE"] = np.where(cols["FLAG_OWN_CAR"] == "Y", np.minimum(rng.exponential(12, n).round(), 91), np.nan)
+    cols["FLAG_MOBIL"] = np.ones(n, dtype=np.int64)
+    cols["FLAG_EMP_PHONE"] = (~not_working).astype(np.int64)
+    for name, p in (("FLAG_WORK_PHONE", 0.2), ("FLAG_CONT_MOBILE", 0.998), ("FLAG_PHONE", 0.28), ("FLAG_EMAIL", 0.057)):
+        cols[name] = _binary(rng, n, p)
+    cols["REGION_RATING_CLIENT"] = rng.choice([1, 2, 3], n, p=[0.105, 0.738, 0.157])
+    cols["REGION_RATING_CLIENT_W_CITY"] = np.clip(cols["REGION_RATING_CLIENT"] + rng.choice([-1, 0, 1], n, p=[0.03, 0.95, 0.02]), 1, 3)
+    cols["HOUR_APPR_PROCESS_START"] = np.clip(np.round(rng.normal(12, 3.3, n)), 0, 23).astype(np.int64)
+    for name, p in (("REG_REGION_NOT_LIVE_REGION", 0.015), ("REG_REGION_NOT_WORK_REGION", 0.051),
+                    ("LIVE_REGION_NOT_WORK_REGION", 0.041), ("REG_CITY_NOT_LIVE_CITY", 0.078),
+                    ("REG_CITY_NOT_WORK_CITY", 0.23), ("LIVE_CITY_NOT_WORK_CITY", 0.18)):
+        cols[name] = _binary(rng, n, p)
+
+    ext = rng.beta(3.5, 2.5, (3, n))
+    cols["EXT_SOURCE_1"] = _with_nulls(rng, ext[0], 0.5638)
+    cols["EXT_SOURCE_2"] = _with_nulls(rng, ext[1], 0.0021)
+    cols["EXT_SOURCE_3"] = _with_nulls(rng, ext[2], 0.1983)
+    # Default risk rises as external scores fall; scaled so the overall rate is ~TARGET_RATE
+    risk = np.exp(-2.5 * (ext[1] + ext[2]))
+    cols["TARGET"] = (rng.random(n) < risk * (TARGET_RATE / np.exp(-2.5 * 1.167 + 0.26))).astype(np.int64)
+
+    # Building statistics: one shared missingness pattern per base column, AVG/MODE/MEDI close to each other
+    for base, null_ratio in BUILDING.items():
+        value = np.round(rng.beta(1.2, 8.0, n), 4)
+        missing = rng.random(n) < null_ratio
+        for suffix, jitter in (("AVG", 0.0), ("MODE", 0.01), ("MEDI", 0.002)):
+            v = np.clip(value + rng.normal(0, jitter, n), 0, 1) if jitter else value.copy()
+            cols[f"{base}_{suffix}"] = np.where(missing, np.nan, np.round(v, 4))
+    cols["TOTALAREA_MODE"] = _with_nulls(rng, np.round(rng.beta(1.2, 9.0, n), 4), 0.4827)
+
+    social = np.minimum(rng.poisson(1.4, n), 348).astype(np.float64)
+    social_default = np.minimum(rng.binomial(social.astype(np.int64), 0.1), 34).astype(np.float64)
+    social_missing = rng.random(n) < 0.0033
+    for window in (30, 60):
+        cols[f"OBS_{window}_CNT_SOCIAL_CIRCLE"] = np.where(social_missing, np.nan, social)
+        cols[f"DEF_{window}_CNT_SOCIAL_CIRCLE"] = np.where(social_missing, np.nan, social_default)
+    cols["DAYS_LAST_PHONE_CHANGE"] = _with_nulls(rng, -np.minimum(rng.exponential(960, n).round(), 4_292), 0.000003)
+
+    for k in range(2, 22):
+        cols[f"FLAG_DOCUMENT_{k}"] = _binary(rng, n, DOCUMENT_RATES[k])
+    bureau_missing = rng.random(n) < 0.135
+    for period, lam in CREDIT_BUREAU.items():
+        cols[f"AMT_REQ_CREDIT_BUREAU_{period}"] = np.where(bureau_missing, np.nan, rng.poisson(lam, n).astype(np.float64))
+
+    return pd.DataFrame({c: cols[c] for c in COLUMNS})
+
+
+def write_csv(path, n, seed=0, chunk_rows=CHUNK_ROWS):
+    """Write n rows to path in chunks, so multi-million-row files never sit in memory at once."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", newline="") as fh:
+        for i, start in enumerate(range(0, n, chunk_rows)):
+            rows = min(chunk_rows, n - start)
+            chunk = generate(rows, seed=[seed, i], start_id=100002 + start)
+            chunk.to_csv(fh, index=False, header=(i == 0))
+    os.replace(tmp, path)
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("rows", type=int)
+    parser.add_argument("out")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    write_csv(args.out, args.rows, args.seed)
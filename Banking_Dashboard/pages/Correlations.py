@@ -3,13 +3,39 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import pandas as pd
 
-from utils.preprocessing import preprocess_data
+from utils.datasets import current_dataset
+from utils.jobs import follow_job, session_job
+from utils.drivers import RANK_BY
+from utils.figures import show_figure
+from utils.profiling import stage
+from utils.plotdata import grouped_box_stats, stratified_sample
+from utils.filters import FilterEngine
+from utils.navigation import hide_disabled_pages
 
 st.set_page_config(page_title="Correlations, Drivers & Interactive Slice-and-Dice Dashboard", page_icon="🔍", layout="wide")
+hide_disabled_pages()
 st.title("🔍 Correlations, Drivers & Interactive Slice-and-Dice Profile")
 
-# ------------------- Load Dataset -------------------
-df, Outliers_Dict, _ = preprocess_data()
+# ------------------- Load Shared Dataset -------------------
+# An upload still processing in the background (utils/jobs.py): follow it rather than load another dataset
+Load_Job = session_job(st.session_state)
+if Load_Job is not None:
+    follow_job(Load_Job)
+    st.stop()
+# An upload that failed is reported here too, rather than showing the default dataset in its place
+if st.session_state.get("dataset_error"):
+    st.error(f"The uploaded dataset could not be processed: {st.session_state['dataset_error']}. Please upload another CSV on the main page.")
+    st.stop()
+
+# Source and engineered columns this page uses; opened directly, only these are loaded and processed
+Page_Columns = ['TARGET', 'AGE_YEARS', 'AMT_CREDIT', 'AMT_INCOME_TOTAL', 'AMT_ANNUITY',
+    'EMPLOYMENT_YEARS', 'CNT_FAM_MEMBERS', 'DTI', 'LTI', 'CODE_GENDER', 'NAME_EDUCATION_TYPE',
+    'NAME_FAMILY_STATUS']
+dataset = current_dataset(st.session_state.get("dataset_key"), Page_Columns)
+if dataset is None:
+    st.error("The uploaded dataset is no longer available on the server. Please upload the CSV again on the main page.")
+    st.stop()
+df = dataset.frame(Page_Columns)
 
 if df.empty:
     st.warning("No data loaded. Ensure 'application_train.csv' exists in the project folder.")
@@ -24,21 +50,28 @@ else:
         default=df['NAME_EDUCATION_TYPE'].unique()
     )
 
-    # Filter dataset based on sidebar selections
-    df_filtered = df[df['CODE_GENDER'].isin(Gender_Filter) & df['NAME_EDUCATION_TYPE'].isin(Education_Filter)]
-
-    # ------------------- KPIs -------------------
-    st.subheader("Key Correlation KPIs")
-
     # Select numeric columns relevant for correlations
     Numeric_Cols = [
         'AGE_YEARS','AMT_CREDIT','AMT_INCOME_TOTAL','AMT_ANNUITY',
         'EMPLOYMENT_YEARS','CNT_FAM_MEMBERS','DTI','LTI','TARGET'
     ]
-    Numeric_Cols = [c for c in Numeric_Cols if c in df_filtered.columns]
+    Numeric_Cols = [c for c in Numeric_Cols if c in df.columns]
+
+    # Filter dataset based on sidebar selections: row masks and correlations come from
+    # per-category bitmaps and statistics built once per dataset (utils/filters.py)
+    Filter_Dims = ('CODE_GENDER', 'NAME_EDUCATION_TYPE')
+    with stage("correlations.filter", "page"):
+        Engine = dataset.artifact(("filters", Filter_Dims, tuple(Numeric_Cols)),
+                                  lambda data: FilterEngine(data, Filter_Dims, Numeric_Cols))
+        Filter_Slice = {'CODE_GENDER': Gender_Filter, 'NAME_EDUCATION_TYPE': Education_Filter}
+        df_filtered = df[Engine.mask(Filter_Slice)]
+
+    # ------------------- KPIs -------------------
+    st.subheader("Key Correlation KPIs")
 
     # Compute correlation matrix if we have at least 2 numeric columns
-    Corr_Matrix = df_filtered[Numeric_Cols].corr() if len(Numeric_Cols) >= 2 else pd.DataFrame()
+    with stage("correlations.corr", "page"):
+        Corr_Matrix = Engine.corr(Filter_Slice) if len(Numeric_Cols) >= 2 else pd.DataFrame()
     
     if not Corr_Matrix.empty:
         # Correlation with TARGET column
@@ -71,96 +104,129 @@ else:
         C9.metric("Variance Explained (Top 5)", f"{Var_Explained:.2f}")
         C10.metric("# Features |corr| > 0.5", str(len(High_Corr_Features)))
 
+    # ------------------- Risk Driver Ranking -------------------
+    # Every numeric column and categorical level against TARGET, ranked once per dataset (utils/drivers.py)
+    with stage("correlations.drivers", "page"):
+        Drivers = dataset.drivers()
+    if not Drivers.empty:
+        st.subheader("Risk Driver Ranking")
+        R1, R2 = st.columns([1, 2])
+        Rank_By = R1.selectbox("Rank by", list(RANK_BY))
+        Driver_Kinds = R2.multiselect("Feature types", ['numeric', 'categorical'], default=['numeric', 'categorical'])
+        Ranked_Drivers = Drivers[Drivers['kind'].isin(Driver_Kinds)].sort_values(
+            RANK_BY[Rank_By], ascending=False, na_position='last', ignore_index=True)
+        Driver_Table = Ranked_Drivers[['feature', 'kind', 'rows', 'pearson', 'spearman', 'default_rate', 'woe', 'iv']].rename(
+            columns={'feature': 'Feature', 'kind': 'Type', 'rows': 'Rows', 'pearson': 'Pearson r',
+                     'spearman': 'Spearman r', 'default_rate': 'Default Rate', 'woe': 'WoE', 'iv': 'IV'})
+        st.dataframe(Driver_Table.style.format(
+            {'Rows': '{:,}', 'Pearson r': '{:.4f}', 'Spearman r': '{:.4f}', 'Default Rate': '{:.2%}',
+             'WoE': '{:.3f}', 'IV': '{:.4f}'}, na_rep='—'), hide_index=True)
+        if dataset.columns is not None:
+            st.caption("Ranked over the columns this page loads; load the dataset from the home page to rank every column.")
+
     st.markdown("---")
     st.subheader("Graphs")
 
+    # Charts render once per (dataset, filter selection) and are served from utils/figures.py afterwards
+
     # ------------------- 1. Correlation Heatmap -------------------
     if not Corr_Matrix.empty:
         st.subheader("Correlation Heatmap")
-        plt.figure(figsize=(8,5))
-        sns.heatmap(Corr_Matrix, annot=True, cmap='coolwarm', fmt=".2f")
-        st.pyplot(plt)
+        def draw():
+            sns.heatmap(Corr_Matrix, annot=True, cmap='coolwarm', fmt=".2f")
+        show_figure("correlations.heatmap", draw, dataset.key, Filter_Slice, figsize=(8,5))
 
     # ------------------- 2. Bar |Correlation| vs TARGET -------------------
     if not Target_Corr.empty:
         st.subheader("Top |Correlation| with TARGET")
-        plt.figure(figsize=(7,4))
-        sns.barplot(x=Target_Corr.abs().sort_values(ascending=False).index,
-                    y=Target_Corr.abs().sort_values(ascending=False).values, palette='viridis')
-        plt.ylabel("|Correlation|")
-        plt.xticks(rotation=45)
-        st.pyplot(plt)
+        def draw():
+            sns.barplot(x=Target_Corr.abs().sort_values(ascending=False).index,
+                        y=Target_Corr.abs().sort_values(ascending=False).values, palette='viridis')
+            plt.ylabel("|Correlation|")
+            plt.xticks(rotation=45)
+        show_figure("correlations.target_corr_bar", draw, dataset.key, Filter_Slice, figsize=(7,4))
+
+    # Point charts get a TARGET-stratified sample of at most plotdata.MAX_POINTS rows
+    df_points = stratified_sample(df_filtered, by='TARGET')
 
     # ------------------- 3. Scatter: Age vs Credit -------------------
     if all(c in df_filtered.columns for c in ['AGE_YEARS','AMT_CREDIT','TARGET']):
         st.subheader("Age vs Credit by TARGET")
-        plt.figure(figsize=(6,4))
-        sns.scatterplot(x='AGE_YEARS', y='AMT_CREDIT', hue='TARGET', data=df_filtered, alpha=0.6, palette='Set1')
-        plt.xlabel("Age")
-        plt.ylabel("Credit")
-        st.pyplot(plt)
+        def draw():
+            sns.scatterplot(x='AGE_YEARS', y='AMT_CREDIT', hue='TARGET', data=df_points, alpha=0.6, palette='Set1')
+            plt.xlabel("Age")
+            plt.ylabel("Credit")
+        show_figure("correlations.age_credit_scatter", draw, dataset.key, Filter_Slice, figsize=(6,4))
 
     # ------------------- 4. Scatter: Age vs Income -------------------
     if all(c in df_filtered.columns for c in ['AGE_YEARS','AMT_INCOME_TOTAL','TARGET']):
         st.subheader("Age vs Income by TARGET")
-        plt.figure(figsize=(6,4))
-        sns.scatterplot(x='AGE_YEARS', y='AMT_INCOME_TOTAL', hue='TARGET', data=df_filtered, alpha=0.6, palette='Set2')
-        plt.xlabel("Age")
-        plt.ylabel("Income")
-        st.pyplot(plt)
+        def draw():
+            sns.scatterplot(x='AGE_YEARS', y='AMT_INCOME_TOTAL', hue='TARGET', data=df_points, alpha=0.6, palette='Set2')
+            plt.xlabel("Age")
+            plt.ylabel("Income")
+        show_figure("correlations.age_income_scatter", draw, dataset.key, Filter_Slice, figsize=(6,4))
 
     # ------------------- 5. Scatter: Employment Years vs TARGET -------------------
     if all(c in df_filtered.columns for c in ['EMPLOYMENT_YEARS','TARGET']):
         st.subheader("Employment Years vs TARGET")
-        plt.figure(figsize=(6,4))
-        sns.stripplot(x='TARGET', y='EMPLOYMENT_YEARS', data=df_filtered, jitter=0.2, palette='Set3')
-        plt.xlabel("TARGET")
-        plt.ylabel("Employment Years")
-        st.pyplot(plt)
+        def draw():
+            sns.stripplot(x='TARGET', y='EMPLOYMENT_YEARS', data=df_points, jitter=0.2, palette='Set3')
+            plt.xlabel("TARGET")
+            plt.ylabel("Employment Years")
+        show_figure("correlations.employment_strip", draw, dataset.key, Filter_Slice, figsize=(6,4))
 
     # ------------------- 6. Boxplot: Credit by Education -------------------
     if all(c in df_filtered.columns for c in ['AMT_CREDIT','NAME_EDUCATION_TYPE']):
         st.subheader("Credit by Education")
-        plt.figure(figsize=(6,4))
-        sns.boxplot(x='NAME_EDUCATION_TYPE', y='AMT_CREDIT', data=df_filtered, palette='Pastel1')
-        plt.xticks(rotation=45)
-        plt.ylabel("Credit")
-        st.pyplot(plt)
+        def draw():
+            Stats = grouped_box_stats(df_filtered, 'AMT_CREDIT', 'NAME_EDUCATION_TYPE')
+            Boxes = plt.gca().bxp(Stats, patch_artist=True)
+            for Box, Color in zip(Boxes['boxes'], sns.color_palette('Pastel1', len(Stats))):
+                Box.set_facecolor(Color)
+            plt.xlabel('NAME_EDUCATION_TYPE')
+            plt.xticks(rotation=45)
+            plt.ylabel("Credit")
+        show_figure("correlations.credit_by_education_box", draw, dataset.key, Filter_Slice, figsize=(6,4))
 
     # ------------------- 7. Boxplot: Income by Family Status -------------------
     if all(c in df_filtered.columns for c in ['AMT_INCOME_TOTAL','NAME_FAMILY_STATUS']):
         st.subheader("Income by Family Status")
-        plt.figure(figsize=(6,4))
-        sns.boxplot(x='NAME_FAMILY_STATUS', y='AMT_INCOME_TOTAL', data=df_filtered, palette='Pastel2')
-        plt.xticks(rotation=45)
-        plt.ylabel("Income")
-        st.pyplot(plt)
+        def draw():
+            Stats = grouped_box_stats(df_filtered, 'AMT_INCOME_TOTAL', 'NAME_FAMILY_STATUS')
+            Boxes = plt.gca().bxp(Stats, patch_artist=True)
+            for Box, Color in zip(Boxes['boxes'], sns.color_palette('Pastel2', len(Stats))):
+                Box.set_facecolor(Color)
+            plt.xlabel('NAME_FAMILY_STATUS')
+            plt.xticks(rotation=45)
+            plt.ylabel("Income")
+        show_figure("correlations.income_by_family_box", draw, dataset.key, Filter_Slice, figsize=(6,4))
 
     #-----------------------Pair Plot ncome, Credit, Annuity, TARGET----------------
     Pair_Cols = ['AMT_INCOME_TOTAL','AMT_CREDIT','AMT_ANNUITY','TARGET']
-    Pair_Cols = [c for c in Pair_Cols if c in df_filtered.columns]
+    Pair_Cols = [c for c in Pair_Cols if c in df_points.columns]
     if len(Pair_Cols) >= 2:
         st.subheader("Pair Plot")
-        sns.pairplot(df_filtered[Pair_Cols], hue='TARGET' if 'TARGET' in Pair_Cols else None, palette='Set1')
-        st.pyplot(plt)
+        def draw():
+            return sns.pairplot(df_points[Pair_Cols], hue='TARGET' if 'TARGET' in Pair_Cols else None, palette='Set1')
+        show_figure("correlations.pairplot", draw, dataset.key, Filter_Slice)
 
 
     # ------------------- 9. Filtered Bar: Default Rate by Gender -------------------
     if all(c in df_filtered.columns for c in ['CODE_GENDER','TARGET']):
         st.subheader("Default Rate by Gender")
-        Gender_Default = df_filtered.groupby('CODE_GENDER')['TARGET'].mean()*100
-        plt.figure(figsize=(5,4))
-        sns.barplot(x=Gender_Default.index, y=Gender_Default.values, palette='cool')
-        plt.ylabel("Default Rate (%)")
-        st.pyplot(plt)
+        def draw():
+            Gender_Default = dataset.cube().mean('TARGET', by='CODE_GENDER', where=Filter_Slice)*100
+            sns.barplot(x=Gender_Default.index, y=Gender_Default.values, palette='cool')
+            plt.ylabel("Default Rate (%)")
+        show_figure("correlations.gender_default_bar", draw, dataset.key, Filter_Slice, figsize=(5,4))
 
     # ------------------- 10. Filtered Bar: Default Rate by Education -------------------
     if all(c in df_filtered.columns for c in ['NAME_EDUCATION_TYPE','TARGET']):
         st.subheader("Default Rate by Education")
-        Edu_Default = df_filtered.groupby('NAME_EDUCATION_TYPE')['TARGET'].mean()*100
-        plt.figure(figsize=(6,4))
-        sns.barplot(x=Edu_Default.index, y=Edu_Default.values, palette='magma')
-        plt.xticks(rotation=45)
-        plt.ylabel("Default Rate (%)")
-        st.pyplot(plt)
-
+        def draw():
+            Edu_Default = dataset.cube().mean('TARGET', by='NAME_EDUCATION_TYPE', where=Filter_Slice)*100
+            sns.barplot(x=Edu_Default.index, y=Edu_Default.values, palette='magma')
+            plt.xticks(rotation=45)
+            plt.ylabel("Default Rate (%)")
+        show_figure("correlations.education_default_bar", draw, dataset.key, Filter_Slice, figsize=(6,4))
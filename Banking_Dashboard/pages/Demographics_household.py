@@ -2,32 +2,57 @@ import streamlit as st
 import matplotlib.pyplot as plt
 import seaborn as sns
 import pandas as pd
-from utils.preprocessing import preprocess_data
+from utils.datasets import current_dataset
+from utils.jobs import follow_job, session_job
+from utils.figures import show_figure
+from utils.profiling import stage
+from utils.plotdata import box_stats, hist_bars, histogram
+from utils.navigation import hide_disabled_pages
 
 st.set_page_config(page_title=" Demographics & Household Profile", page_icon="🎯", layout="wide")
+hide_disabled_pages()
 st.title("👨‍👩‍👧 Demographics & Household Profile")
 
-# ------------------- Load Dataset with Session State -------------------
-if "df" not in st.session_state or st.session_state["df"].empty:
-    df, outliers_dict, _ = preprocess_data()
-    st.session_state["df"] = df
-else:
-    df = st.session_state["df"]
+# ------------------- Load Shared Dataset -------------------
+# An upload still processing in the background (utils/jobs.py): follow it rather than load another dataset
+Load_Job = session_job(st.session_state)
+if Load_Job is not None:
+    follow_job(Load_Job)
+    st.stop()
+# An upload that failed is reported here too, rather than showing the default dataset in its place
+if st.session_state.get("dataset_error"):
+    st.error(f"The uploaded dataset could not be processed: {st.session_state['dataset_error']}. Please upload another CSV on the main page.")
+    st.stop()
+
+# Source and engineered columns this page uses; opened directly, only these are loaded and processed
+Page_Columns = ['TARGET', 'AGE_YEARS', 'CNT_CHILDREN', 'CNT_FAM_MEMBERS', 'CODE_GENDER',
+    'DAYS_EMPLOYED', 'FAMILY_SIZE', 'HAS_CHILDREN', 'IS_MARRIED', 'NAME_EDUCATION_TYPE',
+    'NAME_FAMILY_STATUS', 'NAME_HOUSING_TYPE', 'OCCUPATION_TYPE']
+dataset = current_dataset(st.session_state.get("dataset_key"), Page_Columns)
+if dataset is None:
+    st.error("The uploaded dataset is no longer available on the server. Please upload the CSV again on the main page.")
+    st.stop()
+df = dataset.frame(Page_Columns)
 
 if df.empty:
     st.warning("No data loaded. Ensure 'application_train.csv' exists in the project folder.")
 else:
     st.subheader("Key KPIs")
-    Male_vs_Female = df['CODE_GENDER'].value_counts(normalize=True).mean()*100
-    Avg_Age_Defaulters = df[df['TARGET']==1]['AGE_YEARS'].mean() if 'AGE_YEARS' in df.columns else 0
-    Avg_Age_Non_Defaulters = df[df['TARGET']==0]['AGE_YEARS'].mean() if 'AGE_YEARS' in df.columns else 0
-    with_children = (df['HAS_CHILDREN'].mean() * 100) if 'HAS_CHILDREN' in df.columns else 0
-    Avg_Family_Size = df['FAMILY_SIZE'].mean() if 'FAMILY_SIZE' in df.columns else 0
-    Married_vs_Single = df['IS_MARRIED'].value_counts(normalize=True) * 100 if 'IS_MARRIED' in df.columns else 0
-    Higher_Education = (df['NAME_EDUCATION_TYPE'].isin(['Higher education','Academic degree']).mean())*100
-    Living_With_Parents = (df['NAME_HOUSING_TYPE'].eq('With parents').mean()) * 100
-    Currently_Working = (df['DAYS_EMPLOYED'] != 365243).mean() * 100
-    Average_Employment_Years = (-df['DAYS_EMPLOYED'][df['DAYS_EMPLOYED'] != 365243].mean()) / 365
+    # KPIs come from the shared aggregate cube
+    with stage("demographics.kpis", "page"):
+        cube = dataset.cube()
+        Male_vs_Female = cube.share('CODE_GENDER').mean()*100
+        Avg_Age_Defaulters = cube.mean('AGE_YEARS', where={'TARGET': 1}) if 'AGE_YEARS' in df.columns else 0
+        Avg_Age_Non_Defaulters = cube.mean('AGE_YEARS', where={'TARGET': 0}) if 'AGE_YEARS' in df.columns else 0
+        with_children = (cube.mean('HAS_CHILDREN') * 100) if 'HAS_CHILDREN' in df.columns else 0
+        Avg_Family_Size = cube.mean('FAMILY_SIZE') if 'FAMILY_SIZE' in df.columns else 0
+        Married_Share = cube.mean('IS_MARRIED') if 'IS_MARRIED' in df.columns else 0
+        Married_vs_Single = pd.Series({1: Married_Share, 0: 1 - Married_Share}) * 100
+        Education_Share = cube.share('NAME_EDUCATION_TYPE')
+        Higher_Education = Education_Share[Education_Share.index.isin(['Higher education','Academic degree'])].sum()*100
+        Living_With_Parents = cube.share('NAME_HOUSING_TYPE').get('With parents', 0) * 100
+        Currently_Working = cube.mean('CURRENTLY_WORKING') * 100
+        Average_Employment_Years = (-cube.mean('DAYS_EMPLOYED_WORKING')) / 365
 
     # Display KPIs
     col1, col2, col3, col4, col5 = st.columns(5)
@@ -50,29 +75,32 @@ else:
     st.markdown("---")
     st.subheader("Graphs")
 
+    # Charts render once per dataset and are served from utils/figures.py afterwards
+
     # ------------------- 1. Histograms — Age by all -------------------
     if 'AGE_YEARS' in df.columns:
         st.subheader("Age Distribution (All)")
-        plt.figure(figsize=(6,4))
-        plt.hist(df['AGE_YEARS'].dropna(), bins=20, color='skyblue', edgecolor='black')
-        plt.xlabel("Age (Years)")
-        plt.ylabel("Count")
-        plt.title("Age Distribution (All)")
-        st.pyplot(plt)
+        def draw():
+            counts, edges = histogram(df['AGE_YEARS'], bins=20)
+            hist_bars(plt.gca(), counts, edges, color='skyblue', edgecolor='black')
+            plt.xlabel("Age (Years)")
+            plt.ylabel("Count")
+            plt.title("Age Distribution (All)")
+        show_figure("demographics.age_hist", draw, dataset.key, figsize=(6,4))
 
     # ------------------- 2. Histogram — Age by Target (overlay) -------------------
     if 'AGE_YEARS' in df.columns and 'TARGET' in df.columns:
         st.subheader("Age Distribution by Target")
-        age_repaid = df[df['TARGET']==0]['AGE_YEARS'].dropna()
-        age_default = df[df['TARGET']==1]['AGE_YEARS'].dropna()
-        plt.figure(figsize=(6,4))
-        plt.hist(age_repaid, bins=20, alpha=0.7, label='Repaid', color='green', edgecolor='black')
-        plt.hist(age_default, bins=20, alpha=0.7, label='Default', color='red', edgecolor='black')
-        plt.xlabel("Age (Years)")
-        plt.ylabel("Count")
-        plt.title("Age Distribution by Target")
-        plt.legend()
-        st.pyplot(plt)
+        def draw():
+            age_repaid, repaid_edges = histogram(df.loc[df['TARGET']==0, 'AGE_YEARS'], bins=20)
+            age_default, default_edges = histogram(df.loc[df['TARGET']==1, 'AGE_YEARS'], bins=20)
+            hist_bars(plt.gca(), age_repaid, repaid_edges, alpha=0.7, label='Repaid', color='green', edgecolor='black')
+            hist_bars(plt.gca(), age_default, default_edges, alpha=0.7, label='Default', color='red', edgecolor='black')
+            plt.xlabel("Age (Years)")
+            plt.ylabel("Count")
+            plt.title("Age Distribution by Target")
+            plt.legend()
+        show_figure("demographics.age_by_target_hist", draw, dataset.key, figsize=(6,4))
 
     # ------------------- 3-6. Bar charts  -------------------
     bar_cols = st.columns(2)
@@ -80,93 +108,90 @@ else:
     # Gender Distribution (left)
     if 'CODE_GENDER' in df.columns:
         with bar_cols[0]:
-            gender_counts = df['CODE_GENDER'].value_counts()
-            plt.figure(figsize=(4,4))
-            plt.bar(gender_counts.index, gender_counts.values, color=['#66b3ff','#ff9999'])
-            plt.ylabel("Count")
-            plt.title("Gender Distribution")
-            plt.tight_layout()
-            st.pyplot(plt)
+            def draw():
+                gender_counts = df['CODE_GENDER'].value_counts()
+                plt.bar(gender_counts.index, gender_counts.values, color=['#66b3ff','#ff9999'])
+                plt.ylabel("Count")
+                plt.title("Gender Distribution")
+                plt.tight_layout()
+            show_figure("demographics.gender_bar", draw, dataset.key, figsize=(4,4))
 
     # Family Status Distribution (right)
     if 'NAME_FAMILY_STATUS' in df.columns:
         with bar_cols[1]:
-            family_counts = df['NAME_FAMILY_STATUS'].value_counts()
-            plt.figure(figsize=(5,4))
-            plt.bar(family_counts.index, family_counts.values, color='lightgreen')
-            plt.xticks(rotation=45, ha='right')
-            plt.ylabel("Count")
-            plt.title("Family Status Distribution")
-            plt.tight_layout()
-            st.pyplot(plt)
+            def draw():
+                family_counts = df['NAME_FAMILY_STATUS'].value_counts()
+                plt.bar(family_counts.index, family_counts.values, color='lightgreen')
+                plt.xticks(rotation=45, ha='right')
+                plt.ylabel("Count")
+                plt.title("Family Status Distribution")
+                plt.tight_layout()
+            show_figure("demographics.family_bar", draw, dataset.key, figsize=(5,4))
 
     # Education Distribution (left)
     if 'NAME_EDUCATION_TYPE' in df.columns:
         with bar_cols[0]:
-            edu_counts = df['NAME_EDUCATION_TYPE'].value_counts()
-            plt.figure(figsize=(5,4))
-            plt.bar(edu_counts.index, edu_counts.values, color='orange')
-            plt.xticks(rotation=45, ha='right')
-            plt.ylabel("Count")
-            plt.title("Education Distribution")
-            plt.tight_layout()
-            st.pyplot(plt)
+            def draw():
+                edu_counts = df['NAME_EDUCATION_TYPE'].value_counts()
+                plt.bar(edu_counts.index, edu_counts.values, color='orange')
+                plt.xticks(rotation=45, ha='right')
+                plt.ylabel("Count")
+                plt.title("Education Distribution")
+                plt.tight_layout()
+            show_figure("demographics.education_bar", draw, dataset.key, figsize=(5,4))
 
     # Occupation Distribution (Top 10) (right)
     if 'OCCUPATION_TYPE' in df.columns:
         with bar_cols[1]:
-            occ_counts = df['OCCUPATION_TYPE'].value_counts().head(10)
-            plt.figure(figsize=(6,4))
-            plt.bar(occ_counts.index, occ_counts.values, color='purple')
-            plt.xticks(rotation=45, ha='right')
-            plt.ylabel("Count")
-            plt.title("Top 10 Occupations")
-            plt.tight_layout()
-            st.pyplot(plt)
+            def draw():
+                occ_counts = df['OCCUPATION_TYPE'].value_counts().head(10)
+                plt.bar(occ_counts.index, occ_counts.values, color='purple')
+                plt.xticks(rotation=45, ha='right')
+                plt.ylabel("Count")
+                plt.title("Top 10 Occupations")
+                plt.tight_layout()
+            show_figure("demographics.occupation_bar", draw, dataset.key, figsize=(6,4))
 
     # Pie — Housing Type
     if 'NAME_HOUSING_TYPE' in df.columns:
-        st.subheader("Housing Type Distribution")  
-        housing_counts = df['NAME_HOUSING_TYPE'].value_counts()
-        explode = [0.1 if (count / housing_counts.sum() * 100) > 5 else 0 for count in housing_counts]
-        plt.figure(figsize=(5,5))
-        plt.pie(
-            housing_counts.values,labels=housing_counts.index,autopct='%1.1f%%',startangle=90,colors=sns.color_palette('pastel'),
-            explode=explode)
-        plt.title("Housing Type Distribution")
-        st.pyplot(plt.gcf())
-        
+        st.subheader("Housing Type Distribution")
+        def draw():
+            housing_counts = df['NAME_HOUSING_TYPE'].value_counts()
+            explode = [0.1 if (count / housing_counts.sum() * 100) > 5 else 0 for count in housing_counts]
+            plt.pie(
+                housing_counts.values,labels=housing_counts.index,autopct='%1.1f%%',startangle=90,colors=sns.color_palette('pastel'),
+                explode=explode)
+            plt.title("Housing Type Distribution")
+        show_figure("demographics.housing_pie", draw, dataset.key, figsize=(5,5))
+
     # Countplot — CNT_CHILDREN
     if 'CNT_CHILDREN' in df.columns:
         st.subheader("Children Count Distribution")
-        children_counts = df['CNT_CHILDREN'].value_counts().sort_index()
-        plt.figure(figsize=(6,4))
-        plt.bar(children_counts.index.astype(str), children_counts.values, color='teal')
-        plt.xlabel("Number of Children")
-        plt.ylabel("Count")
-        plt.title("Children Count Distribution")
-        st.pyplot(plt)
+        def draw():
+            children_counts = df['CNT_CHILDREN'].value_counts().sort_index()
+            plt.bar(children_counts.index.astype(str), children_counts.values, color='teal')
+            plt.xlabel("Number of Children")
+            plt.ylabel("Count")
+            plt.title("Children Count Distribution")
+        show_figure("demographics.children_bar", draw, dataset.key, figsize=(6,4))
 
     # Boxplot — Age vs Target
     if 'AGE_YEARS' in df.columns and 'TARGET' in df.columns:
         st.subheader("Age vs Target")
-        age_repaid = df[df['TARGET']==0]['AGE_YEARS']
-        age_default = df[df['TARGET']==1]['AGE_YEARS']
-        plt.figure(figsize=(6,4))
-        plt.boxplot([age_repaid, age_default], labels=['Repaid','Default'], patch_artist=True,
-                        boxprops=dict(facecolor='lightblue'))
-        plt.ylabel("Age (Years)")
-        st.pyplot(plt)
+        def draw():
+            age_repaid = box_stats(df.loc[df['TARGET']==0, 'AGE_YEARS'], label='Repaid')
+            age_default = box_stats(df.loc[df['TARGET']==1, 'AGE_YEARS'], label='Default')
+            plt.gca().bxp([age_repaid, age_default], patch_artist=True,
+                          boxprops=dict(facecolor='lightblue'))
+            plt.ylabel("Age (Years)")
+        show_figure("demographics.age_box", draw, dataset.key, figsize=(6,4))
 
     # Heatmap — Corr(Age, Children, Family Size, TARGET)
     corr_cols = ['AGE_YEARS','CNT_CHILDREN','CNT_FAM_MEMBERS','TARGET']
     available_cols = [c for c in corr_cols if c in df.columns]
     if len(available_cols) >= 2:
         st.subheader("Correlation Matrix")
-        corr_matrix = df[available_cols].corr()
-        plt.figure(figsize=(5,4))
-        sns.heatmap(corr_matrix, annot=True, cmap='coolwarm', fmt=".2f")
-        st.pyplot(plt)
-    
-
-
+        def draw():
+            corr_matrix = df[available_cols].corr()
+            sns.heatmap(corr_matrix, annot=True, cmap='coolwarm', fmt=".2f")
+        show_figure("demographics.corr_heatmap", draw, dataset.key, figsize=(5,4))
@@ -3,34 +3,57 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import pandas as pd
 import numpy as np
-from utils.preprocessing import preprocess_data
+from utils.datasets import current_dataset
+from utils.jobs import follow_job, session_job
+from utils.figures import show_figure
+from utils.profiling import stage
+from utils.plotdata import box_stats, hexbin_binned, hist_bars, histogram, stratified_sample
+from utils.navigation import hide_disabled_pages
 
 st.set_page_config(page_title="Financial Profile Dashboard", page_icon="💰", layout="wide")
+hide_disabled_pages()
 st.title("💳 Financial Profile")
 
-# ------------------- Load Dataset with Session State -------------------
-if "df" not in st.session_state or st.session_state["df"].empty:
-    df, outliers_dict, _ = preprocess_data()
-    st.session_state["df"] = df
-else:
-    df = st.session_state["df"]
+# ------------------- Load Shared Dataset -------------------
+# An upload still processing in the background (utils/jobs.py): follow it rather than load another dataset
+Load_Job = session_job(st.session_state)
+if Load_Job is not None:
+    follow_job(Load_Job)
+    st.stop()
+# An upload that failed is reported here too, rather than showing the default dataset in its place
+if st.session_state.get("dataset_error"):
+    st.error(f"The uploaded dataset could not be processed: {st.session_state['dataset_error']}. Please upload another CSV on the main page.")
+    st.stop()
+
+# Source and engineered columns this page uses; opened directly, only these are loaded and processed
+Page_Columns = ['TARGET', 'AMT_INCOME_TOTAL', 'AMT_CREDIT', 'AMT_ANNUITY', 'AMT_GOODS_PRICE', 'DTI',
+    'LTI']
+dataset = current_dataset(st.session_state.get("dataset_key"), Page_Columns)
+if dataset is None:
+    st.error("The uploaded dataset is no longer available on the server. Please upload the CSV again on the main page.")
+    st.stop()
+df = dataset.frame(Page_Columns)
 
 if df.empty:
     st.warning("No data loaded. Ensure 'application_train.csv' exists in the project folder.")
 else:
     st.subheader("Key Financial KPIs")
     
-    # ------------------- KPIs -------------------
-    Avg_Income = df['AMT_INCOME_TOTAL'].mean()
-    Median_Income = df['AMT_INCOME_TOTAL'].median()
-    Avg_Credit = df['AMT_CREDIT'].mean()
-    Avg_Annuity = df['AMT_ANNUITY'].mean()
-    Avg_Goods_Price = df['AMT_GOODS_PRICE'].mean() if 'AMT_GOODS_PRICE' in df.columns else 0
-    Avg_DTI = df['DTI'].mean()
-    Avg_LTI = df['LTI'].mean()
-    Income_Gap = df[df['TARGET']==0]['AMT_INCOME_TOTAL'].mean() - df[df['TARGET']==1]['AMT_INCOME_TOTAL'].mean()
-    Credit_Gap = df[df['TARGET']==0]['AMT_CREDIT'].mean() - df[df['TARGET']==1]['AMT_CREDIT'].mean()
-    High_Credit_pct = (df['AMT_CREDIT'] > 1_000_000).mean() * 100
+    # ------------------- KPIs (from the shared aggregate cube; medians need the rows) -------------------
+    with stage("finance_health.kpis", "page"):
+        cube = dataset.cube()
+        Avg_Income = cube.mean('AMT_INCOME_TOTAL')
+        Median_Income = df['AMT_INCOME_TOTAL'].median()
+        Avg_Credit = cube.mean('AMT_CREDIT')
+        Avg_Annuity = cube.mean('AMT_ANNUITY')
+        Avg_Goods_Price = cube.mean('AMT_GOODS_PRICE') if 'AMT_GOODS_PRICE' in df.columns else 0
+        Avg_DTI = cube.mean('DTI')
+        Avg_LTI = cube.mean('LTI')
+        Income_By_Target = cube.mean('AMT_INCOME_TOTAL', by='TARGET')
+        Credit_By_Target = cube.mean('AMT_CREDIT', by='TARGET')
+        Income_Gap = Income_By_Target.get(0) - Income_By_Target.get(1)
+        Credit_Gap = Credit_By_Target.get(0) - Credit_By_Target.get(1)
+        High_Credit_pct = cube.mean('HIGH_CREDIT') * 100
     # ------------------- Display KPIs -------------------
     col1, col2, col3,col4,col5 = st.columns(5)
     col1.metric("Avg Annual Income", f"{Avg_Income:,.0f}")
@@ -50,79 +73,83 @@ else:
     st.subheader("Graphs")
 
     # ------------------- Graphs -------------------
+    # Charts render once per dataset and are served from utils/figures.py afterwards
     # Hist -Plot
     graph_cols = ['AMT_INCOME_TOTAL','AMT_CREDIT','AMT_ANNUITY']
     for col in graph_cols:
         if col in df.columns:
             st.subheader(f"{col} Distribution")
-            plt.figure(figsize=(6,4))
-            plt.hist(df[col].dropna(), bins=20, color='skyblue', edgecolor='black')
-            plt.xlabel(col)
-            plt.ylabel("Count")
-            st.pyplot(plt)
+            def draw():
+                counts, edges = histogram(df[col], bins=20)
+                hist_bars(plt.gca(), counts, edges, color='skyblue', edgecolor='black')
+                plt.xlabel(col)
+                plt.ylabel("Count")
+            show_figure(f"finance.hist.{col}", draw, dataset.key, figsize=(6,4))
 
+    # Scatters get a TARGET-stratified sample of at most plotdata.MAX_POINTS rows, so overlapping
+    # points still show where loans concentrate
     # scatter -Income vs Credit scatter
     if all(c in df.columns for c in ['AMT_INCOME_TOTAL','AMT_CREDIT']):
         st.subheader("Income vs Credit")
-        plt.figure(figsize=(6,4))
-        plt.scatter(df['AMT_INCOME_TOTAL'], df['AMT_CREDIT'], alpha=0.3, color='green')
-        plt.xlabel("Income")
-        plt.ylabel("Credit")
-        st.pyplot(plt)
+        def draw():
+            points = stratified_sample(df, by='TARGET')
+            plt.scatter(points['AMT_INCOME_TOTAL'], points['AMT_CREDIT'], alpha=0.3, color='green')
+            plt.xlabel("Income")
+            plt.ylabel("Credit")
+        show_figure("finance.income_credit_scatter", draw, dataset.key, figsize=(6,4))
 
     # scatter - Income vs Annuity scatter
     if all(c in df.columns for c in ['AMT_INCOME_TOTAL','AMT_ANNUITY']):
         st.subheader("Income vs Annuity")
-        plt.figure(figsize=(6,4))
-        plt.scatter(df['AMT_INCOME_TOTAL'], df['AMT_ANNUITY'], alpha=0.3, color='purple')
-        plt.xlabel("Income")
-        plt.ylabel("Annuity")
-        st.pyplot(plt)
+        def draw():
+            points = stratified_sample(df, by='TARGET')
+            plt.scatter(points['AMT_INCOME_TOTAL'], points['AMT_ANNUITY'], alpha=0.3, color='purple')
+            plt.xlabel("Income")
+            plt.ylabel("Annuity")
+        show_figure("finance.income_annuity_scatter", draw, dataset.key, figsize=(6,4))
 
     # Boxplots by Target
     for col in ['AMT_CREDIT','AMT_INCOME_TOTAL']:
         if col in df.columns and 'TARGET' in df.columns:
             st.subheader(f"{col} by Target")
-            plt.figure(figsize=(6,4))
-            plt.boxplot([df[df['TARGET']==0][col], df[df['TARGET']==1][col]],
-                        labels=['Repaid','Default'], patch_artist=True,
-                        boxprops=dict(facecolor='lightblue'))
-            plt.ylabel(col)
-            st.pyplot(plt)
+            def draw():
+                plt.gca().bxp([box_stats(df.loc[df['TARGET']==0, col], label='Repaid'),
+                               box_stats(df.loc[df['TARGET']==1, col], label='Default')],
+                              patch_artist=True, boxprops=dict(facecolor='lightblue'))
+                plt.ylabel(col)
+            show_figure(f"finance.box_by_target.{col}", draw, dataset.key, figsize=(6,4))
 
     # ------------------- Income-Credit KDE PLOT Using Hexbin Plot -------------------
     if 'AMT_INCOME_TOTAL' in df.columns and 'AMT_CREDIT' in df.columns:
         st.subheader("Income–Credit Hexbin Plot")
-        plt.figure(figsize=(6,4))
-        x = df['AMT_INCOME_TOTAL']
-        y = df['AMT_CREDIT']
-        plt.hexbin(x, y, gridsize=50, cmap='Reds', mincnt=1)
-        plt.colorbar(label='Count in bin')
-        plt.xlabel("Income")
-        plt.ylabel("Credit")
-        plt.title("Income vs Credit Density (Hexbin)")
-        st.pyplot(plt)
+        def draw():
+            hb = hexbin_binned(plt.gca(), df['AMT_INCOME_TOTAL'], df['AMT_CREDIT'], gridsize=50, cmap='Reds', mincnt=1)
+            plt.colorbar(hb, label='Count in bin')
+            plt.xlabel("Income")
+            plt.ylabel("Credit")
+            plt.title("Income vs Credit Density (Hexbin)")
+        show_figure("finance.income_credit_hexbin", draw, dataset.key, figsize=(6,4))
 
     # ------------------- Income Brackets vs Default Rate -------------------
     if 'AMT_INCOME_TOTAL' in df.columns and 'TARGET' in df.columns:
         st.subheader("Income Brackets vs Default Rate")
-        bins = [0, 50000, 100000, 150000, 200000, 500000, 1_000_000, np.inf]
-        labels = ['<50k','50-100k','100-150k','150-200k','200-500k','500k-1M','>1M']
-        df['Income_Bracket'] = pd.cut(df['AMT_INCOME_TOTAL'], bins=bins, labels=labels)
-        default_rate = df.groupby('Income_Bracket')['TARGET'].mean() * 100
-        plt.figure(figsize=(8,4))
-        default_rate.plot(kind='bar', color='orange')
-        plt.ylabel("Default Rate (%)")
-        plt.xlabel("Income Bracket")
-        plt.xticks(rotation=45)
-        st.pyplot(plt)
+        def draw():
+            bins = [0, 50000, 100000, 150000, 200000, 500000, 1_000_000, np.inf]
+            labels = ['<50k','50-100k','100-150k','150-200k','200-500k','500k-1M','>1M']
+            income_bracket = pd.cut(df['AMT_INCOME_TOTAL'], bins=bins, labels=labels)
+            default_rate = df['TARGET'].groupby(income_bracket, observed=False).mean() * 100
+            default_rate.plot(kind='bar', color='orange')
+            plt.ylabel("Default Rate (%)")
+            plt.xlabel("Income Bracket")
+            plt.xticks(rotation=45)
+        show_figure("finance.income_bracket_default", draw, dataset.key, figsize=(8,4))
 
     # Heatmap — Financial correlations
     corr_cols = ['AMT_INCOME_TOTAL','AMT_CREDIT','AMT_ANNUITY','DTI','LTI','TARGET']
     available_cols = [c for c in corr_cols if c in df.columns]
     if len(available_cols) >= 2:
         st.subheader("Financial Correlation Matrix")
-        corr_matrix = df[available_cols].corr()
-        plt.figure(figsize=(6,4))
-        sns.heatmap(corr_matrix, annot=True, cmap='coolwarm', fmt=".2f")
-        st.pyplot(plt)
+        def draw():
+            corr_matrix = df[available_cols].corr()
+            sns.heatmap(corr_matrix, annot=True, cmap='coolwarm', fmt=".2f")
+        show_figure("finance.corr_heatmap", draw, dataset.key, figsize=(6,4))
@@ -2,17 +2,49 @@ import streamlit as st
 import matplotlib.pyplot as plt
 import seaborn as sns
 import pandas as pd
-from utils.preprocessing import preprocess_data
+import numpy as np
+from utils.datasets import current_dataset
+from utils.jobs import follow_job, session_job
+from utils.figures import show_figure
+from utils.profiling import stage
+from utils.plotdata import box_stats, histogram, kde_curve
+from utils.navigation import hide_disabled_pages
 
 st.set_page_config(page_title="Overview & Data Quality", page_icon="📊", layout="wide")
+hide_disabled_pages()
 st.title("📌 Overview & Data Quality Dashboard")
 
-# ------------------- Load Dataset with Session State -------------------
-if "df" not in st.session_state or st.session_state["df"].empty:
-    df, outliers_dict, _ = preprocess_data()
-    st.session_state["df"] = df
-else:
-    df = st.session_state["df"]
+# ------------------- Load Shared Dataset -------------------
+# An upload still processing in the background (utils/jobs.py): show the KPIs its finished stages
+# already answer, and rerun with the full page once it is done
+Load_Job = session_job(st.session_state)
+if Load_Job is not None:
+    def show_available_kpis(job):
+        Schema, Nulls = job.artifact("schema"), job.artifact("nulls")
+        if Schema is None:
+            return
+        Rows = job.artifact("rows")
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Total Applicants", f"{Rows:,}")
+        col2.metric("Source Columns", f"{len(Schema):,}")
+        col3.metric("Numerical Columns", int(Schema['dtype'].str.match(r'(u?int|float)').sum()))
+        col4.metric("Missing Cells before Treatment (%)",
+                    f"{Nulls.sum() / (Rows * len(Schema)) * 100:.2f}%" if Nulls is not None and Rows else "…")
+
+    st.subheader("Dataset Overview")
+    follow_job(Load_Job, show_available_kpis)
+    st.stop()
+# An upload that failed is reported here too, rather than showing the default dataset in its place
+if st.session_state.get("dataset_error"):
+    st.error(f"The uploaded dataset could not be processed: {st.session_state['dataset_error']}. Please upload another CSV on the main page.")
+    st.stop()
+
+# Whole frame: the data-quality KPIs and missing-values chart cover every column
+dataset = current_dataset(st.session_state.get("dataset_key"))
+if dataset is None:
+    st.error("The uploaded dataset is no longer available on the server. Please upload the CSV again on the main page.")
+    st.stop()
+df = dataset.frame()
 
 st.subheader("Dataset Overview")
 
@@ -20,16 +52,18 @@ if df.empty:
     st.warning("No data loaded. Ensure 'application_train.csv' exists in the project folder.")
 else:
     # ------------------- KPIs -------------------
-    Total_Applicants = df['SK_ID_CURR'].count() if 'SK_ID_CURR' in df.columns else "N/A"
-    Default_Rate = df['TARGET'].mean() * 100 if 'TARGET' in df.columns else 0
-    Repaid_Rate = 100 - Default_Rate
-    Total_Features = df.shape[1]
-    Avg_Missing_per_Feature = df.isnull().mean().mean() * 100
-    Numerical_Features = df.select_dtypes(include='number').shape[1]
-    Categorical_Features = df.select_dtypes(include='object').shape[1]
-    Median_Age = int(df['AGE_YEARS'].median()) if 'AGE_YEARS' in df.columns else "N/A"
-    Median_Income = df['AMT_INCOME_TOTAL'].median() if 'AMT_INCOME_TOTAL' in df.columns else "N/A"
-    Avg_Credit = df['AMT_CREDIT'].mean() if 'AMT_CREDIT' in df.columns else "N/A"
+    with stage("overview.kpis", "page"):
+        cube = dataset.cube()
+        Total_Applicants = df['SK_ID_CURR'].count() if 'SK_ID_CURR' in df.columns else "N/A"
+        Default_Rate = cube.mean('TARGET') * 100 if 'TARGET' in df.columns else 0
+        Repaid_Rate = 100 - Default_Rate
+        Total_Features = df.shape[1]
+        Avg_Missing_per_Feature = df.isnull().mean().mean() * 100
+        Numerical_Features = df.select_dtypes(include='number').shape[1]
+        Categorical_Features = df.select_dtypes(include=['object','category']).shape[1]
+        Median_Age = int(df['AGE_YEARS'].median()) if 'AGE_YEARS' in df.columns else "N/A"
+        Median_Income = df['AMT_INCOME_TOTAL'].median() if 'AMT_INCOME_TOTAL' in df.columns else "N/A"
+        Avg_Credit = cube.mean('AMT_CREDIT') if 'AMT_CREDIT' in df.columns else "N/A"
 
      # Display KPIs
     col1, col2, col3, col4, col5 = st.columns(5)
@@ -49,43 +83,46 @@ else:
     st.markdown("---")
 
     #=================GRAPHS============================
+    # Charts render once per dataset and are served from utils/figures.py afterwards
     st.subheader("Dataset Overview & Graphs")
 
     # 1. Pie / Donut — Target distribution
     if 'TARGET' in df.columns:
         st.subheader("Target Distribution (0 vs 1)")
-        plt.figure()
-        df['TARGET'].value_counts().plot.pie(autopct='%1.1f%%', startangle=90, colors=['#66b3ff','#ff9999'])
-        plt.ylabel('')
-        st.pyplot(plt)
+        def draw():
+            df['TARGET'].value_counts().plot.pie(autopct='%1.1f%%', startangle=90, colors=['#66b3ff','#ff9999'])
+            plt.ylabel('')
+        show_figure("overview.target_pie", draw, dataset.key)
 
     # 2. Bar — Top 20 features by missing %
     st.subheader("Top 20 Features by Missing %")
-    missing_pct = df.isnull().mean().sort_values(ascending=False).head(20) * 100
-    plt.figure(figsize=(10,4))
-    sns.barplot(x=missing_pct.index, y=missing_pct.values, palette='viridis')
-    plt.ylabel("Missing %")
-    plt.xticks(rotation=45, ha='right')
-    st.pyplot(plt)
+    def draw():
+        missing_pct = df.isnull().mean().sort_values(ascending=False).head(20) * 100
+        sns.barplot(x=missing_pct.index, y=missing_pct.values, palette='viridis')
+        plt.ylabel("Missing %")
+        plt.xticks(rotation=45, ha='right')
+    show_figure("overview.missing_bar", draw, dataset.key, figsize=(10,4))
 
     # ------------------- Histograms -------------------
+    # Bins and KDE are computed here (utils/plotdata.py); seaborn only draws the 30 bars
+    def hist_with_kde(col, color):
+        counts, edges = histogram(df[col], bins=30)
+        kde_x, kde_y = kde_curve(df[col])
+        sns.histplot(pd.DataFrame({col: edges[:-1], 'count': counts}), x=col, weights='count', bins=len(counts),
+                     binrange=(edges[0], edges[-1]), color=color)
+        plt.plot(kde_x, kde_y * np.diff(edges)[0], color=color)
+
     if 'AGE_YEARS' in df.columns:
         st.subheader("Age Distribution")
-        plt.figure()
-        sns.histplot(df['AGE_YEARS'], bins=30, kde=True, color='skyblue')
-        st.pyplot(plt)
+        show_figure("overview.age_hist", lambda: hist_with_kde('AGE_YEARS', 'skyblue'), dataset.key)
 
     if 'AMT_INCOME_TOTAL' in df.columns:
         st.subheader("Income Distribution")
-        plt.figure()
-        sns.histplot(df['AMT_INCOME_TOTAL'], bins=30, kde=True, color='lightgreen')
-        st.pyplot(plt)
+        show_figure("overview.income_hist", lambda: hist_with_kde('AMT_INCOME_TOTAL', 'lightgreen'), dataset.key)
 
     if 'AMT_CREDIT' in df.columns:
         st.subheader("Credit Amount Distribution")
-        plt.figure()
-        sns.histplot(df['AMT_CREDIT'], bins=30, kde=True, color='salmon')
-        st.pyplot(plt)
+        show_figure("overview.credit_hist", lambda: hist_with_kde('AMT_CREDIT', 'salmon'), dataset.key)
 
     # ------------------- Boxplots -------------------
     st.subheader("Boxplots")
@@ -94,39 +131,48 @@ else:
     if 'AMT_INCOME_TOTAL' in df.columns:
         with box1:
             st.subheader("Income Boxplot")
-            plt.figure()
-            sns.boxplot(x=df['AMT_INCOME_TOTAL'], color='lightgreen')
-            st.pyplot(plt)
+            def draw():
+                plt.gca().bxp([box_stats(df['AMT_INCOME_TOTAL'])], vert=False, patch_artist=True,
+                              boxprops=dict(facecolor='lightgreen'))
+                plt.xlabel('AMT_INCOME_TOTAL')
+            show_figure("overview.income_box", draw, dataset.key)
 
     if 'AMT_CREDIT' in df.columns:
         with box2:
             st.subheader("Credit Amount Boxplot")
-            plt.figure()
-            sns.boxplot(x=df['AMT_CREDIT'], color='salmon')
-            st.pyplot(plt)
+            def draw():
+                plt.gca().bxp([box_stats(df['AMT_CREDIT'])], vert=False, patch_artist=True,
+                              boxprops=dict(facecolor='salmon'))
+                plt.xlabel('AMT_CREDIT')
+            show_figure("overview.credit_box", draw, dataset.key)
 
     # ------------------- Countplots -------------------
+    # Counted server-side; the chart gets one bar per category
+    def count_bars(col):
+        counts = df[col].value_counts(sort=False)
+        sns.barplot(x=counts.values, y=counts.index.astype(str), palette='pastel', orient='h')
+        plt.xlabel('count')
+        plt.ylabel(col)
+
     st.subheader("Categorical Distributions")
     cat1, cat2 = st.columns(2)
 
     if 'CODE_GENDER' in df.columns:
         with cat1:
             st.subheader("Gender")
-            plt.figure()
-            sns.countplot(df['CODE_GENDER'], palette='pastel')
-            st.pyplot(plt)
+            show_figure("overview.gender_count", lambda: count_bars('CODE_GENDER'), dataset.key)
 
     if 'NAME_FAMILY_STATUS' in df.columns:
         with cat2:
             st.subheader("Family Status")
-            plt.figure(figsize=(6,4))
-            sns.countplot(df['NAME_FAMILY_STATUS'], palette='pastel')
-            plt.xticks(rotation=45, ha='right')
-            st.pyplot(plt)
+            def draw():
+                count_bars('NAME_FAMILY_STATUS')
+                plt.xticks(rotation=45, ha='right')
+            show_figure("overview.family_count", draw, dataset.key, figsize=(6,4))
 
     if 'NAME_EDUCATION_TYPE' in df.columns:
         st.subheader("Education Type Distribution")
-        plt.figure(figsize=(6,4))
-        sns.countplot(df['NAME_EDUCATION_TYPE'], palette='pastel')
-        plt.xticks(rotation=45, ha='right')
-        st.pyplot(plt)
+        def draw():
+            count_bars('NAME_EDUCATION_TYPE')
+            plt.xticks(rotation=45, ha='right')
+        show_figure("overview.education_count", draw, dataset.key, figsize=(6,4))
@@ -0,0 +1,72 @@
+import json
+
+import streamlit as st
+import pandas as pd
+from utils import profiling
+from utils.figures import cache_info
+from utils.navigation import hide_disabled_pages
+
+st.set_page_config(page_title="Performance", page_icon="⏱️", layout="wide")
+hide_disabled_pages()
+st.title("⏱️ Performance")
+st.markdown("Stage timings recorded by `utils/profiling.py` in this server process, across all sessions.")
+
+if not profiling.PROFILE_ENABLED:
+    st.info("Profiling is turned off. Start the app with BANKING_PROFILE=1 to record stage timings.")
+    st.stop()
+
+Events = profiling.events_frame()
+if Events.empty:
+    st.info("No stages recorded yet. Load a dataset or open a page first.")
+    st.stop()
+
+# ------------------- Sidebar Filters -------------------
+st.sidebar.header("Filters")
+Category_Filter = st.sidebar.multiselect(
+    "Select Category", options=sorted(Events['category'].unique()), default=sorted(Events['category'].unique())
+)
+Events = Events[Events['category'].isin(Category_Filter)]
+
+# ------------------- KPIs -------------------
+Pipeline_Run = profiling.last_run("preprocess_data")
+Figures = cache_info()
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("Recorded Stages", f"{len(Events):,}")
+col2.metric("Last Preprocessing (s)", f"{Pipeline_Run[0].wall_s:.2f}" if Pipeline_Run else "N/A")
+col3.metric("Cached Figures", Figures["figures"])
+col4.metric("Figure Cache (MB)", f"{Figures['bytes'] / 1024**2:.1f}")
+
+# ------------------- Latest Preprocessing Run -------------------
+st.subheader("Latest Preprocessing Run")
+if Pipeline_Run:
+    Run = pd.DataFrame([e.to_dict() for e in Pipeline_Run[1:]])
+    if not Run.empty:
+        st.bar_chart(Run.set_index('name')['wall_s'])
+        st.dataframe(Run[['name', 'category', 'wall_s', 'cpu_s', 'rss_delta_mb',
+                          'rows_in', 'cols_in', 'mb_in', 'rows_out', 'cols_out', 'mb_out']])
+    else:
+        st.write("Nothing ran below `preprocess_data`.")
+else:
+    st.write("No preprocessing run recorded since the server started (cached datasets skip it).")
+
+# ------------------- Summary by Stage -------------------
+st.subheader("Summary by Stage")
+Summary = Events.groupby(['category', 'name']).agg(
+    calls=('wall_s', 'size'), total_s=('wall_s', 'sum'), mean_s=('wall_s', 'mean'),
+    max_s=('wall_s', 'max'), max_rss_delta_mb=('rss_delta_mb', 'max'),
+).sort_values('total_s', ascending=False)
+st.dataframe(Summary)
+
+# ------------------- Recent Stages -------------------
+st.subheader("Recent Stages")
+Recent = Events.sort_values('start', ascending=False).head(200).copy()
+Recent['start'] = pd.to_datetime(Recent['start'], unit='s')
+st.dataframe(Recent.drop(columns=['thread']))
+
+# ------------------- Export -------------------
+col5, col6 = st.columns(2)
+col5.download_button("📥 Download Chrome Trace", data=json.dumps(profiling.chrome_trace()),
+                     file_name="banking_dashboard_trace.json", mime="application/json")
+if col6.button("🗑️ Clear Recorded Stages"):
+    profiling.clear()
+    st.rerun()
@@ -2,38 +2,63 @@ import streamlit as st
 import matplotlib.pyplot as plt
 import seaborn as sns
 import pandas as pd
-from utils.preprocessing import preprocess_data
+from utils.datasets import current_dataset
+from utils.jobs import follow_job, session_job
+from utils.indicators import INDICATOR_COLUMNS
+from utils.figures import show_figure
+from utils.profiling import stage
+from utils.plotdata import box_stats, hist_bars, histogram, violin_stats
+from utils.navigation import hide_disabled_pages
 
 st.set_page_config(page_title="Target & Risk Segmentation", page_icon="🎯", layout="wide")
+hide_disabled_pages()
 st.title("🎯 Target & Risk Segmentation Dashboard")
 
-# ------------------- Load Dataset with Session State -------------------
-if "df" not in st.session_state or st.session_state["df"].empty:
-    df, outliers_dict, _ = preprocess_data()
-    st.session_state["df"] = df
-else:
-    df = st.session_state["df"]
+# ------------------- Load Shared Dataset -------------------
+# An upload still processing in the background (utils/jobs.py): follow it rather than load another dataset
+Load_Job = session_job(st.session_state)
+if Load_Job is not None:
+    follow_job(Load_Job)
+    st.stop()
+# An upload that failed is reported here too, rather than showing the default dataset in its place
+if st.session_state.get("dataset_error"):
+    st.error(f"The uploaded dataset could not be processed: {st.session_state['dataset_error']}. Please upload another CSV on the main page.")
+    st.stop()
+
+# Source and engineered columns this page uses; opened directly, only these are loaded and processed
+Page_Columns = ['TARGET', 'AMT_INCOME_TOTAL', 'AMT_CREDIT', 'AMT_ANNUITY', 'AGE_YEARS',
+    'EMPLOYMENT_YEARS', 'CODE_GENDER', 'NAME_EDUCATION_TYPE', 'NAME_FAMILY_STATUS',
+    'NAME_HOUSING_TYPE', 'NAME_CONTRACT_TYPE']
+# Indicator flags are loaded too, but read packed through dataset.indicators() rather than unpacked into df
+dataset = current_dataset(st.session_state.get("dataset_key"), Page_Columns + INDICATOR_COLUMNS)
+if dataset is None:
+    st.error("The uploaded dataset is no longer available on the server. Please upload the CSV again on the main page.")
+    st.stop()
+df = dataset.frame(Page_Columns)
 
 if df.empty or 'TARGET' not in df.columns:
     st.warning("No TARGET column found or dataset not loaded. Ensure 'application_train.csv' exists.")
 else:
     st.subheader("Key KPIs")
 
-    # ------------------- KPIs -------------------
-    Total_Defaults = int(df['TARGET'].sum())
-    Default_Rate = df['TARGET'].mean() * 100
-    Repaid_Rate = 100 - Default_Rate
-
-    Avg_Income_Defaulters = df[df['TARGET'] == 1]['AMT_INCOME_TOTAL'].mean()
-    Avg_Credit_Defaulters = df[df['TARGET'] == 1]['AMT_CREDIT'].mean()
-    Avg_Annuity_Defaulters = df[df['TARGET'] == 1]['AMT_ANNUITY'].mean() if 'AMT_ANNUITY' in df.columns else 0
-    Avg_Employment_Years_Defaulters = df[df['TARGET'] == 1]['EMPLOYMENT_YEARS'].mean() if 'EMPLOYMENT_YEARS' in df.columns else 0
-
-    # Default rate by categorical columns
-    Default_Rate_by_Gender = df.groupby('CODE_GENDER')['TARGET'].mean() * 100 if 'CODE_GENDER' in df.columns else pd.Series()
-    Default_Rate_by_Education = df.groupby('NAME_EDUCATION_TYPE')['TARGET'].mean() * 100 if 'NAME_EDUCATION_TYPE' in df.columns else pd.Series()
-    Default_Rate_by_Family_Status = df.groupby('NAME_FAMILY_STATUS')['TARGET'].mean() * 100 if 'NAME_FAMILY_STATUS' in df.columns else pd.Series()
-    Default_Rate_by_Housing_Type = df.groupby('NAME_HOUSING_TYPE')['TARGET'].mean() * 100 if 'NAME_HOUSING_TYPE' in df.columns else pd.Series()
+    # ------------------- KPIs (from the shared aggregate cube) -------------------
+    with stage("target_risk.kpis", "page"):
+        cube = dataset.cube()
+        Defaulters = {'TARGET': 1}
+        Total_Defaults = int(cube.sum('TARGET'))
+        Default_Rate = cube.mean('TARGET') * 100
+        Repaid_Rate = 100 - Default_Rate
+
+        Avg_Income_Defaulters = cube.mean('AMT_INCOME_TOTAL', where=Defaulters)
+        Avg_Credit_Defaulters = cube.mean('AMT_CREDIT', where=Defaulters)
+        Avg_Annuity_Defaulters = cube.mean('AMT_ANNUITY', where=Defaulters) if 'AMT_ANNUITY' in df.columns else 0
+        Avg_Employment_Years_Defaulters = cube.mean('EMPLOYMENT_YEARS', where=Defaulters) if 'EMPLOYMENT_YEARS' in df.columns else 0
+
+        # Default rate by categorical columns
+        Default_Rate_by_Gender = cube.mean('TARGET', by='CODE_GENDER') * 100 if 'CODE_GENDER' in df.columns else pd.Series()
+        Default_Rate_by_Education = cube.mean('TARGET', by='NAME_EDUCATION_TYPE') * 100 if 'NAME_EDUCATION_TYPE' in df.columns else pd.Series()
+        Default_Rate_by_Family_Status = cube.mean('TARGET', by='NAME_FAMILY_STATUS') * 100 if 'NAME_FAMILY_STATUS' in df.columns else pd.Series()
+        Default_Rate_by_Housing_Type = cube.mean('TARGET', by='NAME_HOUSING_TYPE') * 100 if 'NAME_HOUSING_TYPE' in df.columns else pd.Series()
 
     # Display KPIs
     col1, col2, col3, col4, col5 = st.columns(5)
@@ -53,28 +78,27 @@ else:
     st.markdown("---")
     st.subheader("Graphs")
 
-    # Rest of the graphs remain unchanged, using df from session_state
-
+    # Charts render once per dataset and are served from utils/figures.py afterwards
 
     # ------------------- 1. Bar: Default vs Repaid -------------------
-    target_counts = df['TARGET'].value_counts().reindex([0,1])
-    plt.figure()
-    plt.bar(['Repaid','Default'], target_counts.values, color=['#66b3ff','#ff9999'])
-    plt.ylabel("Counts")
-    plt.title("Default vs Repaid")
-    st.pyplot(plt)
+    def draw():
+        target_counts = cube.count(by='TARGET').reindex([0,1])
+        plt.bar(['Repaid','Default'], target_counts.values, color=['#66b3ff','#ff9999'])
+        plt.ylabel("Counts")
+        plt.title("Default vs Repaid")
+    show_figure("target.default_vs_repaid", draw, dataset.key)
 
     # ------------------- 2-5. Default % by categorical -------------------
     cat_cols = ['CODE_GENDER', 'NAME_EDUCATION_TYPE', 'NAME_FAMILY_STATUS', 'NAME_HOUSING_TYPE']
     for col in cat_cols:
         if col in df.columns:
             st.subheader(f"Default % by {col.replace('_',' ')}")
-            default_pct = df.groupby(col)['TARGET'].mean() * 100  # Series
-            plt.figure()
-            plt.bar(default_pct.index, default_pct.values, color='skyblue')
-            plt.ylabel("Default %")
-            plt.xticks(rotation=45, ha='right')
-            st.pyplot(plt)
+            def draw():
+                default_pct = cube.mean('TARGET', by=col) * 100  # Series
+                plt.bar(default_pct.index, default_pct.values, color='skyblue')
+                plt.ylabel("Default %")
+                plt.xticks(rotation=45, ha='right')
+            show_figure(f"target.default_pct.{col}", draw, dataset.key)
 
     # ------------------- 6-7. Boxplots: Income & Credit by Target -------------------
     st.subheader("Boxplots by Target")
@@ -84,74 +108,89 @@ else:
     if 'AMT_INCOME_TOTAL' in df.columns:
         with box1:
             st.subheader("Income by Target")
-            plot_df = df[['TARGET', 'AMT_INCOME_TOTAL']].dropna()
-            income_repaid = plot_df[plot_df['TARGET']==0]['AMT_INCOME_TOTAL']
-            income_default = plot_df[plot_df['TARGET']==1]['AMT_INCOME_TOTAL']
-            plt.figure(figsize=(6,4))
-            plt.boxplot([income_repaid, income_default], labels=['Repaid','Default'], patch_artist=True,
-                        boxprops=dict(facecolor='lightgreen'))
-            plt.ylabel("AMT_INCOME_TOTAL")
-            st.pyplot(plt)
+            def draw():
+                income_repaid = box_stats(df.loc[df['TARGET']==0, 'AMT_INCOME_TOTAL'], label='Repaid')
+                income_default = box_stats(df.loc[df['TARGET']==1, 'AMT_INCOME_TOTAL'], label='Default')
+                plt.gca().bxp([income_repaid, income_default], patch_artist=True,
+                              boxprops=dict(facecolor='lightgreen'))
+                plt.ylabel("AMT_INCOME_TOTAL")
+            show_figure("target.income_box", draw, dataset.key, figsize=(6,4))
 
     # Credit by Target
     if 'AMT_CREDIT' in df.columns:
         with box2:
             st.subheader("Credit by Target")
-            plot_df = df[['TARGET', 'AMT_CREDIT']].dropna()
-            credit_repaid = plot_df[plot_df['TARGET']==0]['AMT_CREDIT']
-            credit_default = plot_df[plot_df['TARGET']==1]['AMT_CREDIT']
-            plt.figure(figsize=(6,4))
-            plt.boxplot([credit_repaid, credit_default], labels=['Repaid','Default'], patch_artist=True,
-                        boxprops=dict(facecolor='salmon'))
-            plt.ylabel("AMT_CREDIT")
-            st.pyplot(plt)
+            def draw():
+                credit_repaid = box_stats(df.loc[df['TARGET']==0, 'AMT_CREDIT'], label='Repaid')
+                credit_default = box_stats(df.loc[df['TARGET']==1, 'AMT_CREDIT'], label='Default')
+                plt.gca().bxp([credit_repaid, credit_default], patch_artist=True,
+                              boxprops=dict(facecolor='salmon'))
+                plt.ylabel("AMT_CREDIT")
+            show_figure("target.credit_box", draw, dataset.key, figsize=(6,4))
 
     # ------------------- 8. Violin — Age vs Target -------------------
     violin_col, hist_col = st.columns(2)
     if 'AGE_YEARS' in df.columns:
         with violin_col:
             st.subheader("Age Distribution by Target")
-            plot_df = df[['TARGET', 'AGE_YEARS']].dropna()
-            age_repaid = plot_df[plot_df['TARGET']==0]['AGE_YEARS']
-            age_default = plot_df[plot_df['TARGET']==1]['AGE_YEARS']
-            plt.figure(figsize=(6,4))
-            plt.violinplot([age_repaid, age_default])
-            plt.xticks([1,2], ['Repaid','Default'])
-            plt.ylabel('AGE_YEARS')
-            st.pyplot(plt)
+            def draw():
+                age_repaid = violin_stats(df.loc[df['TARGET']==0, 'AGE_YEARS'])
+                age_default = violin_stats(df.loc[df['TARGET']==1, 'AGE_YEARS'])
+                plt.gca().violin([age_repaid, age_default])
+                plt.xticks([1,2], ['Repaid','Default'])
+                plt.ylabel('AGE_YEARS')
+            show_figure("target.age_violin", draw, dataset.key, figsize=(6,4))
 
     # ------------------- 9. Histogram (stacked) — EMPLOYMENT_YEARS by Target -------------------
     if 'EMPLOYMENT_YEARS' in df.columns:
         with hist_col:
             st.subheader("Employment Years by Target (Stacked)")
-            plot_df = df[['TARGET', 'EMPLOYMENT_YEARS']].dropna()
-            target0 = plot_df[plot_df['TARGET']==0]['EMPLOYMENT_YEARS']
-            target1 = plot_df[plot_df['TARGET']==1]['EMPLOYMENT_YEARS']
-            plt.figure(figsize=(6,4))
-            plt.hist([target0, target1], bins=20, stacked=True, color=['skyblue','lightcoral'], label=['Repaid','Default'])
-            plt.xlabel("EMPLOYMENT_YEARS")
-            plt.ylabel("Count")
-            plt.legend()
-            st.pyplot(plt)
+            def draw():
+                _, edges = histogram(df['EMPLOYMENT_YEARS'], bins=20)
+                target0, _ = histogram(df.loc[df['TARGET']==0, 'EMPLOYMENT_YEARS'], bins=edges)
+                target1, _ = histogram(df.loc[df['TARGET']==1, 'EMPLOYMENT_YEARS'], bins=edges)
+                hist_bars(plt.gca(), [target0, target1], edges, stacked=True, color=['skyblue','lightcoral'], label=['Repaid','Default'])
+                plt.xlabel("EMPLOYMENT_YEARS")
+                plt.ylabel("Count")
+                plt.legend()
+            show_figure("target.employment_hist", draw, dataset.key, figsize=(6,4))
 
     # ------------------- 10. Stacked Bar — NAME_CONTRACT_TYPE vs Target -------------------
     if 'NAME_CONTRACT_TYPE' in df.columns:
         st.subheader("Contract Type vs Target (Stacked Bar)")
 
-        # Prepare data
-        contract_counts = df.groupby(['NAME_CONTRACT_TYPE','TARGET']).size().unstack(fill_value=0)
-        categories = contract_counts.index.tolist()
-        repaid = contract_counts[0].values
-        default = contract_counts[1].values
-
-        # Plot
-        plt.figure(figsize=(6,4))
-        plt.bar(categories, repaid, label='Repaid', color='#66b3ff')
-        plt.bar(categories, default, bottom=repaid, label='Default', color='#ff9999')
-        plt.ylabel("Counts")
-        plt.xlabel("Contract Type")
-        plt.xticks(rotation=45, ha='right')
-        plt.title("Contract Type vs Target")
-        plt.legend()
-        plt.tight_layout()
-        st.pyplot(plt)
+        def draw():
+            # Prepare data
+            contract_counts = cube.count(by=['NAME_CONTRACT_TYPE','TARGET']).unstack(fill_value=0)
+            categories = contract_counts.index.tolist()
+            repaid = contract_counts[0].values
+            default = contract_counts[1].values
+
+            # Plot
+            plt.bar(categories, repaid, label='Repaid', color='#66b3ff')
+            plt.bar(categories, default, bottom=repaid, label='Default', color='#ff9999')
+            plt.ylabel("Counts")
+            plt.xlabel("Contract Type")
+            plt.xticks(rotation=45, ha='right')
+            plt.title("Contract Type vs Target")
+            plt.legend()
+            plt.tight_layout()
+        show_figure("target.contract_stacked", draw, dataset.key, figsize=(6,4))
+
+    # ------------------- 11. Default Rate by Indicator Flag -------------------
+    # 0/1 flags are held as packed bitmaps; counts and rates are popcounts (utils/indicators.py)
+    Indicators = dataset.indicators()
+    if len(Indicators):
+        st.subheader("Default Rate by Indicator Flag")
+        with stage("target_risk.indicators", "page"):
+            Flag_Rates = Indicators.target_rates(df['TARGET'].to_numpy())
+            Flag_Table = pd.DataFrame({
+                "Rows Flagged": Flag_Rates["count"],
+                "Flagged (%)": Flag_Rates["share"] * 100,
+                "Default Rate - Flag=1 (%)": Flag_Rates["rate_flagged"] * 100,
+                "Default Rate - Flag=0 (%)": Flag_Rates["rate_unflagged"] * 100,
+            })
+            Flag_Table["Lift"] = Flag_Table["Default Rate - Flag=1 (%)"] / Default_Rate
+        st.dataframe(Flag_Table.sort_values("Lift", ascending=False).style.format(
+            {"Rows Flagged": "{:,}", "Flagged (%)": "{:.2f}", "Default Rate - Flag=1 (%)": "{:.2f}",
+             "Default Rate - Flag=0 (%)": "{:.2f}", "Lift": "{:.2f}"}, na_rep="—"))
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+# Categorical dimensions the pages slice KPIs by
+DIMENSIONS = [
+    "CODE_GENDER", "NAME_EDUCATION_TYPE", "NAME_FAMILY_STATUS",
+    "NAME_HOUSING_TYPE", "NAME_CONTRACT_TYPE", "TARGET",
+]
+
+# Numeric measures: source columns, plus 0/1 indicators derived at build time
+MEASURES = [
+    "TARGET", "AMT_INCOME_TOTAL", "AMT_CREDIT", "AMT_ANNUITY", "AMT_GOODS_PRICE",
+    "AGE_YEARS", "EMPLOYMENT_YEARS", "DTI", "LTI", "HAS_CHILDREN", "FAMILY_SIZE",
+    "IS_MARRIED", "CNT_FAM_MEMBERS",
+]
+DERIVED_MEASURES = {
+    "HIGH_CREDIT": lambda df: df["AMT_CREDIT"] > 1_000_000,
+    "CURRENTLY_WORKING": lambda df: df["DAYS_EMPLOYED"] != 365243,
+    "DAYS_EMPLOYED_WORKING": lambda df: df["DAYS_EMPLOYED"].where(df["DAYS_EMPLOYED"] != 365243),
+}
+_ROWS = "__rows__"
+_DERIVED_INPUTS = {"HIGH_CREDIT": "AMT_CREDIT", "CURRENTLY_WORKING": "DAYS_EMPLOYED", "DAYS_EMPLOYED_WORKING": "DAYS_EMPLOYED"}
+
+
+class KpiCube:
+    """
+    count / Σx / Σx² per measure for every observed combination of DIMENSIONS.
+    Means, rates and variances for any slice are derived from the cells, so the
+    cost depends on the number of cells, not on the number of rows.
+    """
+
+    def __init__(self, cells, dims, measures):
+        self.cells = cells
+        self.dims = dims
+        self.measures = measures
+
+    def _select(self, where):
+        cells = self.cells
+        for dim, value in (where or {}).items():
+            values = value if isinstance(value, (list, tuple, set, np.ndarray, pd.Index)) else [value]
+            cells = cells[cells.index.get_level_values(dim).isin(values)]
+        return cells
+
+    def rollup(self, by=None, where=None):
+        """Summed cell statistics, grouped by the dimension(s) in `by` or for the whole slice."""
+        cells = self._select(where)
+        if by is None:
+            return cells.sum()
+        return cells.groupby(level=by, observed=True).sum()
+
+    def count(self, by=None, where=None):
+        return self.rollup(by, where)[("n", _ROWS)]
+
+    def sum(self, measure, by=None, where=None):
+        return self.rollup(by, where)[("sum", measure)]
+
+    def mean(self, measure, by=None, where=None):
+        r = self.rollup(by, where)
+        return r[("sum", measure)] / r[("n", measure)]
+
+    def var(self, measure, by=None, where=None):
+        r = self.rollup(by, where)
+        n, s, ss = r[("n", measure)], r[("sum", measure)], r[("sumsq", measure)]
+        return (ss - s * s / n) / (n - 1)
+
+    def std(self, measure, by=None, where=None):
+        return np.sqrt(self.var(measure, by, where))
+
+    def share(self, by, where=None):
+        """Row share of each value of `by` within the slice (value_counts(normalize=True))."""
+        counts = self.count(by, where)
+        return counts / counts.sum()
+
+
+def build_cube(df, dims=None, measures=None):
+    """Aggregate df once into a KpiCube. Dimensions or measures absent from df are skipped."""
+    dims = [d for d in (dims or DIMENSIONS) if d in df.columns]
+    measures = [m for m in (measures or MEASURES) if m in df.columns]
+
+    values = pd.DataFrame({m: df[m].astype("float64") for m in measures}, index=df.index)
+    values[_ROWS] = 1.0
+    for name, rule in DERIVED_MEASURES.items():
+        if _DERIVED_INPUTS[name] in df.columns:
+            values[name] = rule(df).astype("float64")
+            measures.append(name)
+
+    keys = [df[d] for d in dims] or [np.zeros(len(df), dtype=np.int8)]
+    grouped = values.groupby(keys, observed=True, dropna=False)
+    cells = pd.concat({
+        "n": grouped.count(),
+        "sum": grouped.sum(),
+        "sumsq": (values * values).groupby(keys, observed=True, dropna=False).sum(),
+    }, axis=1)
+    return KpiCube(cells, dims, measures)
@@ -0,0 +1,123 @@
+import hashlib
+import os
+import shutil
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from utils.outliers import OutlierMasks
+from utils.profiling import profiled
+
+CACHE_DIR = Path(os.environ.get("BANKING_CACHE_DIR", ".cache/preprocess"))
+CACHE_BUDGET_MB = int(os.environ.get("BANKING_CACHE_BUDGET_MB", "2048"))
+
+_FRAME_FILE = "frame.parquet"
+_OUTLIERS_FILE = "outliers.parquet"
+_BLOCK_SIZE = 1 << 20
+
+
+# ------------------- Keys -------------------
+def _hash_source(source, h):
+    """Feed the raw bytes of a path or file-like object (e.g. st.file_uploader) into h."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            for block in iter(lambda: f.read(_BLOCK_SIZE), b""):
+                h.update(block)
+        return
+    if hasattr(source, "getbuffer"):
+        h.update(source.getbuffer())
+        return
+    pos = source.tell()
+    for block in iter(lambda: source.read(_BLOCK_SIZE), b""):
+        h.update(block)
+    source.seek(pos)
+
+
+@profiled("cache.key", "cache")
+def cache_key(source, version):
+    """Content hash of source plus the pipeline version, or None if source can't be read."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"v{version}:".encode())
+    try:
+        _hash_source(source, h)
+    except (OSError, AttributeError, ValueError):
+        return None
+    return h.hexdigest()
+
+
+def projection_key(key, columns):
+    """Key for a column-projected run of the same source and version."""
+    h = hashlib.blake2b(digest_size=20)
+    h.update(key.encode())
+    h.update("\x1f".join(sorted(columns)).encode())
+    return h.hexdigest()
+
+
+# ------------------- Load / Store -------------------
+@profiled("cache.load", "cache")
+def load(key, columns=None):
+    """
+    Return (df, OutlierMasks) for key, or None on a miss. A hit refreshes the entry's LRU stamp.
+    With `columns`, only those columns (where present) are read from the Parquet file.
+    """
+    entry = CACHE_DIR / key
+    try:
+        if columns is None:
+            df = pd.read_parquet(entry / _FRAME_FILE)
+        else:
+            wanted = set(columns)
+            stored = pq.read_schema(entry / _FRAME_FILE).names
+            df = pd.read_parquet(entry / _FRAME_FILE, columns=[c for c in stored if c in wanted])
+        outliers_frame = pd.read_parquet(entry / _OUTLIERS_FILE)
+    except (OSError, ValueError):
+        return None
+    if columns is not None:
+        outliers_frame = outliers_frame[outliers_frame["column"].isin(df.columns)].reset_index(drop=True)
+    os.utime(entry)
+    return df, OutlierMasks.from_frame(outliers_frame)
+
+
+@profiled("cache.store", "cache")
+def store(key, df, outliers_dict):
+    """Write an entry atomically, then evict least-recently-used entries over the size budget."""
+    entry = CACHE_DIR / key
+    tmp = CACHE_DIR / f".{key}.{os.getpid()}.tmp"
+    try:
+        tmp.mkdir(parents=True, exist_ok=True)
+        df.to_parquet(tmp / _FRAME_FILE)
+
+        outliers_dict.to_frame().to_parquet(tmp / _OUTLIERS_FILE, index=False)
+
+        if entry.exists():
+            shutil.rmtree(entry, ignore_errors=True)
+        os.replace(tmp, entry)
+    except OSError as e:
+        print(f"Could not write preprocessing cache: {e}")
+        shutil.rmtree(tmp, ignore_errors=True)
+        return
+    evict(CACHE_BUDGET_MB * 1024 * 1024)
+
+
+# ------------------- Eviction -------------------
+def _entry_size(entry):
+    return sum(p.stat().st_size for p in entry.iterdir() if p.is_file())
+
+
+def evict(budget_bytes):
+    """Delete the least recently used entries until the cache fits in budget_bytes."""
+    if not CACHE_DIR.exists():
+        return
+    entries = [e for e in CACHE_DIR.iterdir() if e.is_dir() and not e.name.startswith(".")]
+    entries.sort(key=lambda e: e.stat().st_mtime)
+    sizes = {e: _entry_size(e) for e in entries}
+    total = sum(sizes.values())
+    for e in entries:
+        if total <= budget_bytes:
+            break
+        shutil.rmtree(e, ignore_errors=True)
+        total -= sizes[e]
+
+
+def clear():
+    shutil.rmtree(CACHE_DIR, ignore_errors=True)
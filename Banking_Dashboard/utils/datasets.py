@@ -0,0 +1,233 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+from utils import cache
+from utils.aggregates import build_cube
+from utils.drivers import rank_drivers
+from utils.indicators import pack_indicators
+from utils.preprocessing import DEFAULT_PATH, pipeline_version, preprocess_data
+from utils.profiling import stage
+
+MAX_DATASETS = int(os.environ.get("BANKING_MAX_DATASETS", "4"))
+
+
+class Dataset:
+    """
+    One processed dataset shared by every session that loads the same source bytes.
+    `columns` is None for a full run, else the output columns a projected run was asked
+    for; `base_key` is the full run's key either way.
+    """
+
+    def __init__(self, key, source_name, df, outliers, columns=None, base_key=None):
+        self.key = key
+        self.base_key = base_key or key
+        self.columns = columns
+        self.source_name = source_name
+        self._order = list(df.columns)
+        # 0/1 flag columns live only as bitmaps (utils/indicators.py), unpacked when a frame asks for them
+        self._df, self._indicators = pack_indicators(df)
+        self._unpacked = {}
+        self._unpack_lock = threading.Lock()
+        self.outliers = outliers
+        self.loaded_at = time.time()
+        self.hits = 0
+        self._artifacts = {}
+        self._lock = threading.Lock()
+
+    @property
+    def empty(self):
+        return not self._order or len(self._df) == 0
+
+    @property
+    def shape(self):
+        return len(self._df), len(self._order)
+
+    def _flags(self, cols, keep=True):
+        """
+        Indicator columns as a frame in their original dtype. With keep, each column is
+        unpacked once and shared by every later frame; otherwise it is unpacked just for
+        this caller (artifact builds, which run once and would otherwise pin every flag).
+        """
+        with self._unpack_lock:
+            flags = {c: self._unpacked.get(c) for c in cols}
+        for col, values in flags.items():
+            if values is None:
+                flags[col] = pd.Series(self._indicators.values(col), index=self._indicators.index, name=col)
+                if keep:
+                    with self._unpack_lock:
+                        flags[col] = self._unpacked.setdefault(col, flags[col])
+        # copy=False: one block per cached Series, nothing consolidated or copied, and
+        # copy-on-write still tracks the cache as a reference
+        return pd.DataFrame(flags, copy=False)
+
+    def frame(self, columns=None):
+        """
+        A session-private view of `columns` (default: all): no data is copied until the
+        session writes to it. Indicator columns are unpacked from their bitmaps (original
+        dtype) the first time any frame asks for them, and only those asked for.
+        The view relies on pandas copy-on-write (set by app.py); without it the frame is a
+        deep copy, so a session's writes can never reach the shared data.
+        """
+        return self._view(columns)
+
+    def _view(self, columns=None, keep_flags=True):
+        names = self._order if columns is None else [c for c in columns if c in self._order]
+        packed = [c for c in names if c in self._indicators]
+        df = self._df[[c for c in names if c not in self._indicators]]
+        if packed:
+            df = pd.concat([df, self._flags(packed, keep_flags)], axis=1)[names]
+        return df.copy(deep=pd.get_option("mode.copy_on_write") is not True)
+
+    def filter(self, mask, columns=None):
+        """Rows where mask is True, optionally restricted to columns."""
+        return self.frame(columns)[mask]
+
+    def artifact(self, key, build):
+        """Value derived from this dataset by build(df), computed once and shared by every session."""
+        with self._lock:
+            if key not in self._artifacts:
+                name = key if isinstance(key, str) else key[0]
+                df = self._view(keep_flags=False)
+                with stage(f"artifact.{name}", "artifact", frame=df):
+                    self._artifacts[key] = build(df)
+            return self._artifacts[key]
+
+    def forget(self, key):
+        """Drop a memoized artifact, so the next artifact(key, build) rebuilds it."""
+        with self._lock:
+            self._artifacts.pop(key, None)
+
+    def cube(self):
+        """KPI aggregate cube (utils/aggregates.py)."""
+        return self.artifact("cube", build_cube)
+
+    def indicators(self):
+        """The 0/1 flag columns as packed bitmaps (utils/indicators.py)."""
+        return self._indicators
+
+    def drivers(self):
+        """Every feature ranked against TARGET (utils/drivers.py)."""
+        return self.artifact("drivers", rank_drivers)
+
+    def nbytes(self):
+        """Bytes held by the shared frame, its packed indicator columns and the ones unpacked so far."""
+        with self._unpack_lock:
+            unpacked = sum(s.nbytes for s in self._unpacked.values())
+        return int(self._df.memory_usage(deep=True).sum()) + self._indicators.nbytes + unpacked
+
+
+# ------------------- Registry -------------------
+_registry = OrderedDict()
+_registry_lock = threading.Lock()
+_build_locks = {}
+
+
+def _source_name(source):
+    return getattr(source, "name", None) or str(source)
+
+
+def load_dataset(source=None, columns=None, progress=None):
+    """
+    Return the shared Dataset for source (path or uploaded file; None -> default CSV),
+    building it once per process. Concurrent callers for the same bytes wait for
+    the first build instead of running the pipeline again.
+
+    With `columns` (source or engineered names a page declares), a registered full
+    dataset is returned if there is one; otherwise only those columns are processed
+    (see preprocess_data) and shared with every caller asking for the same set.
+    progress is passed on to preprocess_data when the pipeline runs.
+    """
+    source = source or DEFAULT_PATH
+    columns = sorted(set(columns)) if columns is not None else None
+    base_key = cache.cache_key(source, pipeline_version())
+    if base_key is None:
+        df, outliers_dict, _ = preprocess_data(source, use_cache=False, columns=columns, progress=progress)
+        return Dataset(None, _source_name(source), df, outliers_dict, columns)
+
+    key = base_key if columns is None else cache.projection_key(base_key, columns)
+    with _registry_lock:
+        lock = _build_locks.setdefault(key, threading.Lock())
+    with lock:
+        dataset = get_dataset(base_key) or get_dataset(key)
+        if dataset is not None:
+            return dataset
+        if hasattr(source, "seek"):
+            source.seek(0)
+        df, outliers_dict, _ = preprocess_data(source, columns=columns, progress=progress)
+        dataset = Dataset(key, _source_name(source), df, outliers_dict, columns, base_key)
+        if not dataset.empty:
+            _register(dataset)
+        return dataset
+
+
+def _register(dataset):
+    with _registry_lock:
+        if dataset.columns is None:
+            # The full frame answers every projection of the same source
+            for k in [k for k, d in _registry.items() if d.base_key == dataset.key]:
+                del _registry[k]
+        _registry[dataset.key] = dataset
+        while len(_registry) > MAX_DATASETS:
+            old_key, _ = _registry.popitem(last=False)
+            _build_locks.pop(old_key, None)
+
+
+def get_dataset(key):
+    """Registered Dataset for key, or None. Marks it most recently used."""
+    with _registry_lock:
+        dataset = _registry.get(key)
+        if dataset is not None:
+            _registry.move_to_end(key)
+            dataset.hits += 1
+        return dataset
+
+
+def _restore(key):
+    """Re-register a dataset evicted from the registry from its preprocessing cache entry, or None."""
+    with _registry_lock:
+        lock = _build_locks.setdefault(key, threading.Lock())
+    with lock:
+        dataset = get_dataset(key)
+        if dataset is not None:
+            return dataset
+        hit = cache.load(key)
+        if hit is None:
+            return None
+        df, outliers_dict = hit
+        dataset = Dataset(key, f"{key[:12]} (restored from cache)", df, outliers_dict)
+        _register(dataset)
+        return dataset
+
+
+def current_dataset(key=None, columns=None):
+    """
+    The dataset a session points at (st.session_state["dataset_key"]), else the default CSV,
+    processed only for `columns` when given (pages pass the columns they use).
+    A session's dataset evicted from the registry is restored from the preprocessing cache;
+    if it is gone from there too, None: callers ask for the file again rather than showing
+    a different dataset.
+    """
+    if key:
+        return get_dataset(key) or _restore(key)
+    return load_dataset(columns=columns)
+
+
+def memory_report():
+    """Bytes held per registered dataset."""
+    with _registry_lock:
+        datasets = list(_registry.values())
+    return pd.DataFrame([{
+        "dataset": d.source_name,
+        "key": d.key[:12],
+        "rows": d.shape[0],
+        "columns": d.shape[1],
+        "projected": d.columns is not None,
+        "frame_mb": d.nbytes() / 1024**2,
+        "indicators_kb": d.indicators().nbytes / 1024,
+        "outliers_kb": getattr(d.outliers, "nbytes", 0) / 1024,
+        "hits": d.hits,
+    } for d in datasets])
@@ -0,0 +1,166 @@
+import numpy as np
+import pandas as pd
+
+from utils import parallel
+
+# Columns standardized and multiplied per block, so the float64 working copy stays small on wide frames
+BLOCK_COLUMNS = 32
+# Identifiers and the target itself are never ranked
+EXCLUDE = ("TARGET", "SK_ID_CURR")
+# Added to empty good/bad cells so every category gets a finite WoE
+WOE_SMOOTHING = 0.5
+MISSING_LEVEL = "(missing)"
+
+RANK_BY = {"|Pearson|": "abs_pearson", "|Spearman|": "abs_spearman", "Information Value": "iv"}
+
+
+# ------------------- Kernels -------------------
+def rank_moments(values, positive):
+    # Per-column kernel (runs on utils/parallel.py workers). Ranks are average ranks over the
+    # column's non-missing rows (ties share their mean rank, as Series.rank); returns
+    # (rows, positive rows, Σ rank over positive rows, Σ rank² over all rows).
+    # No per-row ranks are built: small-range integer columns (flags, counts) get the size of
+    # every group of equal values from bincount; other columns sort the values once and find
+    # each positive row's average rank from its insertion points.
+    values = np.asarray(values)
+    if values.dtype.kind == "f":
+        valid = ~np.isnan(values)
+        if not valid.all():
+            values, positive = values[valid], positive[valid]
+    if not len(values):
+        return 0, 0, 0.0, 0.0
+    hits = values[positive]
+    if values.dtype.kind in "iub" and int(values.max()) - int(values.min()) <= max(len(values), 1 << 16):
+        low = int(values.min())
+        sizes = np.bincount(values.astype(np.int64) - low)
+        rank = np.cumsum(sizes) - (sizes - 1) / 2
+        hit_sizes = np.bincount(hits.astype(np.int64) - low, minlength=len(sizes))
+        return len(values), len(hits), float(hit_sizes @ rank), float(sizes @ rank ** 2)
+    xs, hits = np.sort(values), np.sort(hits)
+    # Sorted needles keep the insertion-point lookups cache friendly
+    rank_sum = ((np.searchsorted(xs, hits, "left") + np.searchsorted(xs, hits, "right")).sum() + len(hits)) / 2
+    tied = xs[1:] == xs[:-1]
+    if not tied.any():
+        m = len(xs)
+        return m, len(hits), float(rank_sum), m * (m + 1) * (2 * m + 1) / 6
+    starts = np.flatnonzero(np.r_[True, ~tied])
+    sizes = np.diff(np.r_[starts, len(xs)])
+    return len(xs), len(hits), float(rank_sum), float(sizes @ (starts + (sizes + 1) / 2) ** 2)
+
+
+def _correlate(block, positive):
+    """
+    Pearson r of every column of block (rows x columns, NaN = missing) with the 0/1
+    target, each over the rows where that column is present (pairwise complete, like
+    DataFrame.corrwith). Columns are centered in place, so every covariance comes from
+    one matrix product Z.T @ y; the standardization is applied to those k products
+    instead of rescaling the n x k block.
+    """
+    valid = ~np.isnan(block)
+    complete = valid.all()
+    if not complete:
+        np.copyto(block, 0.0, where=~valid)
+    n = valid.sum(axis=0) if not complete else np.full(block.shape[1], len(block))
+    positives = valid[positive].sum(axis=0) if not complete else np.full(block.shape[1], positive.sum())
+    with np.errstate(invalid="ignore", divide="ignore"):
+        block -= block.sum(axis=0) / n
+        if not complete:
+            block *= valid
+        std = np.sqrt(np.einsum("ij,ij->j", block, block) / n)
+        cov = block.T @ positive.astype(np.float64) / n
+        share = positives / n
+        r = cov / (std * np.sqrt(share * (1 - share)))
+    return np.clip(r, -1.0, 1.0), n
+
+
+def _spearman(moments):
+    """Spearman r from rank_moments: Pearson r of the average ranks with the 0/1 target."""
+    rows, positives, rank_sum, rank_sq = (np.array(m, dtype=np.float64) for m in zip(*moments))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_rank = (rows + 1) / 2
+        share = positives / rows
+        cov = rank_sum / rows - mean_rank * share
+        r = cov / np.sqrt((rank_sq / rows - mean_rank ** 2) * share * (1 - share))
+    return np.clip(r, -1.0, 1.0)
+
+
+# ------------------- Numeric Drivers -------------------
+def _native(s):
+    # numpy-typed columns as they are; nullable extension columns as float64 with NaN
+    return s.to_numpy() if isinstance(s.dtype, np.dtype) else s.to_numpy("float64", na_value=np.nan)
+
+
+def numeric_drivers(df, cols, positive):
+    """Pearson (blocked matrix products) and Spearman (rank sums) r with the target for numeric cols."""
+    rows = []
+    for start in range(0, len(cols), BLOCK_COLUMNS):
+        names = cols[start:start + BLOCK_COLUMNS]
+        pearson, n = _correlate(df[names].to_numpy(dtype=np.float64, na_value=np.nan), positive)
+        moments = parallel.map_columns(rank_moments, [_native(df[c]) for c in names], [(positive,)] * len(names))
+        rows.append(pd.DataFrame({"column": names, "level": None, "kind": "numeric", "rows": n,
+                                  "pearson": pearson, "spearman": _spearman(moments)}))
+    return pd.concat(rows, ignore_index=True) if rows else pd.DataFrame()
+
+
+# ------------------- Categorical Drivers -------------------
+def categorical_drivers(df, cols, positive):
+    """
+    One row per category of each categorical column (missing values are a category).
+    The one-hot indicator's r with a 0/1 target follows from the counts alone, and is
+    both its Pearson and Spearman r (ranking two-valued data is an affine map).
+    WoE = ln(share of goods / share of bads) per category; IV sums over the column.
+    """
+    n, bads = len(positive), int(positive.sum())
+    goods = n - bads
+    rows = []
+    for col in cols:
+        cat = pd.Categorical(df[col])
+        levels = list(cat.categories)
+        codes = cat.codes.astype(np.int64)
+        if (codes < 0).any():
+            codes = np.where(codes < 0, len(levels), codes)
+            levels.append(MISSING_LEVEL)
+        count = np.bincount(codes, minlength=len(levels)).astype(np.float64)
+        bad = np.bincount(codes[positive], minlength=len(levels)).astype(np.float64)
+        good = count - bad
+        with np.errstate(invalid="ignore", divide="ignore"):
+            r = (n * bad - count * bads) / np.sqrt(count * (n - count) * bads * goods)
+            woe = np.log(((good + WOE_SMOOTHING) / (goods + WOE_SMOOTHING))
+                         / ((bad + WOE_SMOOTHING) / (bads + WOE_SMOOTHING)))
+            rate = bad / count
+        iv = float(((good / goods - bad / bads) * woe).sum()) if goods and bads else np.nan
+        keep = count > 0
+        rows.append(pd.DataFrame({"column": col, "level": np.array(levels, dtype=object)[keep],
+                                  "kind": "categorical", "rows": count[keep].astype(np.int64),
+                                  "pearson": r[keep], "spearman": r[keep], "default_rate": rate[keep],
+                                  "woe": woe[keep], "iv": iv}))
+    return pd.concat(rows, ignore_index=True) if rows else pd.DataFrame()
+
+
+# ------------------- Ranking -------------------
+def rank_drivers(df, target="TARGET"):
+    """
+    Every numeric column and every category of every categorical column of df, ranked
+    by |Pearson r| with the 0/1 target. Columns: feature, column, level, kind, rows,
+    pearson, spearman, abs_pearson, abs_spearman, default_rate, woe, iv.
+    """
+    if target not in df.columns:
+        return pd.DataFrame()
+    df = df[df[target].notna()]
+    positive = df[target].to_numpy() == 1
+    features = [c for c in df.columns if c not in EXCLUDE]
+    numeric = [c for c in features if pd.api.types.is_numeric_dtype(df[c]) and not pd.api.types.is_bool_dtype(df[c])]
+    categorical = [c for c in features if c not in numeric]
+
+    parts = [p for p in (numeric_drivers(df, numeric, positive), categorical_drivers(df, categorical, positive)) if not p.empty]
+    if not parts:
+        return pd.DataFrame()
+    ranked = pd.concat(parts, ignore_index=True)
+    ranked.insert(0, "feature", np.where(ranked["level"].isna(), ranked["column"],
+                                         ranked["column"] + "=" + ranked["level"].astype(str)))
+    ranked["abs_pearson"] = ranked["pearson"].abs()
+    ranked["abs_spearman"] = ranked["spearman"].abs()
+    columns = ["feature", "column", "level", "kind", "rows", "pearson", "spearman",
+               "abs_pearson", "abs_spearman", "default_rate", "woe", "iv"]
+    ranked = ranked.reindex(columns=columns)
+    return ranked.sort_values("abs_pearson", ascending=False, na_position="last", ignore_index=True)
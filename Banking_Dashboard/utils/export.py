@@ -0,0 +1,125 @@
+import gzip
+import hashlib
+import os
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+EXPORT_DIR = Path(os.environ.get("BANKING_EXPORT_DIR", ".cache/exports"))
+EXPORT_BUDGET_MB = int(os.environ.get("BANKING_EXPORT_BUDGET_MB", "1024"))
+# Rows serialized per write, so no more than one chunk's CSV text is in memory at a time
+CHUNK_ROWS = 50_000
+
+# format -> (label, file extension, mime type)
+FORMATS = {
+    "csv": ("CSV", ".csv", "text/csv"),
+    "csv.gz": ("CSV (gzip)", ".csv.gz", "application/gzip"),
+    "csv.zst": ("CSV (zstd)", ".csv.zst", "application/zstd"),
+    "parquet": ("Parquet", ".parquet", "application/vnd.apache.parquet"),
+}
+
+
+# ------------------- Writers -------------------
+def _chunks(df):
+    for start in range(0, len(df), CHUNK_ROWS):
+        yield start, df.iloc[start:start + CHUNK_ROWS]
+
+
+def _open_csv(path, fmt):
+    if fmt == "csv.gz":
+        return gzip.open(path, "wb", compresslevel=6)
+    if fmt == "csv.zst":
+        return pa.output_stream(str(path), compression="zstd")
+    return open(path, "wb")
+
+
+def _write_csv(df, path, fmt):
+    """Same bytes as df.to_csv(index=False), written chunk by chunk."""
+    with _open_csv(path, fmt) as sink:
+        if df.empty:
+            sink.write(df.to_csv(index=False).encode("utf-8"))
+        for start, chunk in _chunks(df):
+            sink.write(chunk.to_csv(index=False, header=start == 0).encode("utf-8"))
+
+
+def _write_parquet(df, path):
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        for _, chunk in _chunks(df):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+# ------------------- Export Files -------------------
+def file_name(fmt, stem="processed_dataset"):
+    return stem + FORMATS[fmt][1]
+
+
+def export_path(key, fmt):
+    if not key:
+        raise ValueError("An export needs a dataset key or content hash to be named by")
+    return EXPORT_DIR / f"{key}{FORMATS[fmt][1]}"
+
+
+def frame_key(df):
+    """Content hash of df (column names, dtypes and values), naming exports of datasets without a key."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update("\x1f".join(f"{c}:{t}" for c, t in df.dtypes.astype(str).items()).encode())
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def write_export(df, path, fmt):
+    """Write df to path in fmt through a temporary file, so readers never see a partial export."""
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if fmt == "parquet":
+            _write_parquet(df, tmp)
+        else:
+            _write_csv(df, tmp, fmt)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    evict(EXPORT_BUDGET_MB * 1024 * 1024, keep=path)
+    return path
+
+
+def dataset_export(dataset, fmt):
+    """
+    Path of `dataset` exported as fmt, built on first request. Files are named by the
+    dataset key (source hash + pipeline version), so they are reused across sessions
+    and restarts until the data changes. A dataset without a key (its source could not
+    be hashed) is named by a hash of the processed frame instead.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}'. Choose from {list(FORMATS)}")
+
+    def build(df):
+        path = export_path(dataset.key or frame_key(df), fmt)
+        return path if path.exists() else write_export(df, path, fmt)
+
+    path = dataset.artifact(("export", fmt), build)
+    if not path.exists():  # evicted since it was built
+        dataset.forget(("export", fmt))
+        path = dataset.artifact(("export", fmt), build)
+    os.utime(path)
+    return path
+
+
+# ------------------- Eviction -------------------
+def evict(budget_bytes, keep=None):
+    """Delete the least recently used exports (except keep) until the folder fits in budget_bytes."""
+    if not EXPORT_DIR.exists():
+        return
+    files = [f for f in EXPORT_DIR.iterdir() if f.is_file() and not f.name.startswith(".")]
+    files.sort(key=lambda f: f.stat().st_mtime)
+    total = sum(f.stat().st_size for f in files)
+    for f in files:
+        if total <= budget_bytes:
+            break
+        if f == keep:
+            continue
+        total -= f.stat().st_size
+        f.unlink(missing_ok=True)
@@ -0,0 +1,90 @@
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+MARRIED_STATUSES = ["Married", "Civil marriage"]
+
+
+@dataclass(frozen=True)
+class FeatureSpec:
+    """A derived column: its inputs, output dtype (None keeps the computed dtype) and a vectorized rule."""
+    name: str
+    inputs: Tuple[str, ...]
+    dtype: Optional[str]
+    compute: Callable[[pd.DataFrame], object]
+
+
+def _values(df, col):
+    return df[col].to_numpy()
+
+
+# ------------------- Registry -------------------
+# Order matters only if a spec reads another spec's output; list dependencies first.
+FEATURES = [
+    # --Overview--
+    FeatureSpec("AGE_YEARS", ("DAYS_BIRTH",), "int8",
+                lambda df: -_values(df, "DAYS_BIRTH") / 365.25),
+    FeatureSpec("EMPLOYMENT_YEARS", ("DAYS_EMPLOYED",), "float32",
+                lambda df: np.where(_values(df, "DAYS_EMPLOYED") < 0, -_values(df, "DAYS_EMPLOYED") / 365.25, np.nan)),
+    # --Household--
+    FeatureSpec("IS_MARRIED", ("NAME_FAMILY_STATUS",), "int8",
+                lambda df: df["NAME_FAMILY_STATUS"].isin(MARRIED_STATUSES).to_numpy()),
+    FeatureSpec("HAS_CHILDREN", ("CNT_CHILDREN",), "int8",
+                lambda df: _values(df, "CNT_CHILDREN") > 0),
+    FeatureSpec("FAMILY_SIZE", ("CNT_FAM_MEMBERS",), None,
+                lambda df: df["CNT_FAM_MEMBERS"].fillna(df["CNT_FAM_MEMBERS"].median()).to_numpy()),
+    # --Financial Health--
+    FeatureSpec("LTI", ("AMT_CREDIT", "AMT_INCOME_TOTAL"), None,
+                lambda df: _values(df, "AMT_CREDIT") / _values(df, "AMT_INCOME_TOTAL")),
+    FeatureSpec("DTI", ("AMT_ANNUITY", "AMT_INCOME_TOTAL"), None,
+                lambda df: _values(df, "AMT_ANNUITY") / _values(df, "AMT_INCOME_TOTAL")),
+    FeatureSpec("ANNUITY_TO_CREDIT_RATIO", ("AMT_ANNUITY", "AMT_CREDIT"), None,
+                lambda df: _values(df, "AMT_ANNUITY") / _values(df, "AMT_CREDIT")),
+]
+
+FEATURES_BY_NAME = {spec.name: spec for spec in FEATURES}
+
+
+# ------------------- Dependency Resolution -------------------
+def required_specs(names):
+    """Specs needed to build `names`, including specs they read from, in registry order."""
+    needed = set()
+
+    def visit(name):
+        spec = FEATURES_BY_NAME.get(name)
+        if spec is None or name in needed:
+            return
+        needed.add(name)
+        for col in spec.inputs:
+            visit(col)
+
+    for name in names:
+        visit(name)
+    return [spec for spec in FEATURES if spec.name in needed]
+
+
+def raw_inputs(names):
+    """Source columns that must be loaded to build `names`."""
+    specs = required_specs(names)
+    derived = {spec.name for spec in specs}
+    return sorted({col for spec in specs for col in spec.inputs if col not in derived})
+
+
+# ------------------- Compute -------------------
+def compute_features(df, names=None):
+    """
+    Add derived columns to df in place and return it.
+    names=None builds every feature whose inputs are present; otherwise only
+    `names` and what they depend on. Specs with missing inputs are skipped.
+    """
+    specs = FEATURES if names is None else required_specs(names)
+    for spec in specs:
+        if not all(col in df.columns for col in spec.inputs):
+            continue
+        values = spec.compute(df)
+        if spec.dtype is not None:
+            values = values.astype(spec.dtype)
+        df[spec.name] = values
+    return df
@@ -0,0 +1,86 @@
+import io
+import os
+import threading
+from collections import OrderedDict
+
+import matplotlib.pyplot as plt
+import streamlit as st
+from matplotlib.figure import Figure
+
+from utils.profiling import stage
+
+FIGURE_CACHE_MB = int(os.environ.get("BANKING_FIGURE_CACHE_MB", "128"))
+
+# Same output settings st.pyplot uses, so cached images look identical
+_SAVEFIG = {"bbox_inches": "tight", "dpi": 200}
+
+_cache = OrderedDict()
+_cache_bytes = 0
+_cache_lock = threading.Lock()
+# pyplot keeps global "current figure" state; sessions run on separate threads
+_draw_lock = threading.Lock()
+
+
+def _freeze(state):
+    """Hashable form of a filter state made of lists, sets, dicts and scalars."""
+    if isinstance(state, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in state.items()))
+    if isinstance(state, (list, tuple)):
+        return tuple(_freeze(v) for v in state)
+    if isinstance(state, (set, frozenset)):
+        return tuple(sorted(_freeze(v) for v in state))
+    if hasattr(state, "tolist"):
+        return _freeze(state.tolist())
+    return state
+
+
+def _store(key, data):
+    global _cache_bytes
+    with _cache_lock:
+        if key in _cache:
+            return
+        _cache[key] = data
+        _cache_bytes += len(data)
+        while _cache_bytes > FIGURE_CACHE_MB * 1024 * 1024 and len(_cache) > 1:
+            _, old = _cache.popitem(last=False)
+            _cache_bytes -= len(old)
+
+
+def render_figure(chart_id, draw, dataset_key=None, state=None, figsize=None, fmt="png"):
+    """
+    Encoded image bytes for a chart, rendered at most once per (chart id, filter state, dataset).
+
+    draw() plots with pyplot onto a fresh figure of `figsize`; it may instead return its own
+    Figure or an object with a `.figure` (e.g. sns.pairplot's PairGrid). Every figure is
+    closed after encoding so pyplot's figure registry doesn't grow.
+    """
+    key = (chart_id, dataset_key, _freeze(state), fmt)
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    with _draw_lock, stage(f"figure.{chart_id}", "figure"):
+        fig = result_fig = plt.figure(figsize=figsize)
+        try:
+            result = draw()
+            result_fig = result if isinstance(result, Figure) else getattr(result, "figure", None) or fig
+            buf = io.BytesIO()
+            result_fig.savefig(buf, format=fmt, **_SAVEFIG)
+        finally:
+            plt.close(fig)
+            if result_fig is not fig:
+                plt.close(result_fig)
+    data = buf.getvalue()
+    _store(key, data)
+    return data
+
+
+def show_figure(chart_id, draw, dataset_key=None, state=None, figsize=None):
+    """render_figure() and display it at container width, like st.pyplot."""
+    st.image(render_figure(chart_id, draw, dataset_key, state, figsize), use_container_width=True)
+
+
+def cache_info():
+    with _cache_lock:
+        return {"figures": len(_cache), "bytes": _cache_bytes, "open_figures": len(plt.get_fignums())}
@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+
+
+class FilterEngine:
+    """
+    Precomputed filter state for categorical sidebar filters.
+
+    - One packed row bitmap per category of each dimension, so a selection's row
+      mask is bitwise ORs within a dimension and ANDs across dimensions.
+    - For every combination of categories (a cell), the pairwise-complete sufficient
+      statistics of `numeric_cols`: n, Σx, Σx², Σxy. The correlation matrix of any
+      selection is assembled by summing the selected cells, without touching rows.
+    """
+
+    def __init__(self, df, dims, numeric_cols):
+        self.dims = [d for d in dims if d in df.columns]
+        self.numeric_cols = [c for c in numeric_cols if c in df.columns]
+        self.n_rows = len(df)
+
+        codes, self.categories, self.bitmaps = [], {}, {}
+        for dim in self.dims:
+            cat = pd.Categorical(df[dim])
+            self.categories[dim] = list(cat.categories)
+            codes.append(cat.codes.astype(np.int64))
+            self.bitmaps[dim] = {
+                value: np.packbits(cat.codes == k) for k, value in enumerate(cat.categories)
+            }
+
+        # Mixed-radix cell id per row (code -1 = missing gets its own slot)
+        sizes = [len(self.categories[d]) + 1 for d in self.dims]
+        self.cell_shape = tuple(sizes)
+        cell_ids = np.ravel_multi_index([c + 1 for c in codes], sizes) if codes else np.zeros(len(df), dtype=np.int64)
+        self._build_stats(df, cell_ids)
+
+    def _build_stats(self, df, cell_ids):
+        k = len(self.numeric_cols)
+        X = df[self.numeric_cols].to_numpy(dtype=np.float64, na_value=np.nan)
+        # Correlation is shift-invariant; centering first keeps the sums well conditioned
+        X = X - np.nanmean(X, axis=0) if len(X) else X
+        valid = ~np.isnan(X)
+        X0 = np.where(valid, X, 0.0)
+        M = valid.astype(np.float64)
+
+        order = np.argsort(cell_ids, kind="stable")
+        ids, starts = np.unique(cell_ids[order], return_index=True)
+        ends = np.append(starts[1:], len(order))
+
+        self.cell_ids = ids
+        self.cell_rows = ends - starts
+        self.n = np.empty((len(ids), k, k))
+        self.sx = np.empty((len(ids), k, k))
+        self.sxx = np.empty((len(ids), k, k))
+        self.sxy = np.empty((len(ids), k, k))
+        for i, (lo, hi) in enumerate(zip(starts, ends)):
+            rows = order[lo:hi]
+            x0, m = X0[rows], M[rows]
+            self.n[i] = m.T @ m
+            self.sx[i] = x0.T @ m
+            self.sxx[i] = (x0 * x0).T @ m
+            self.sxy[i] = x0.T @ x0
+
+    # ------------------- Selection -------------------
+    def _selected_codes(self, dim, values):
+        if values is None:
+            return np.arange(len(self.categories[dim]) + 1)
+        wanted = set(values)
+        return np.array([k + 1 for k, c in enumerate(self.categories[dim]) if c in wanted], dtype=np.int64)
+
+    def _selected_cells(self, selection):
+        grids = [self._selected_codes(d, (selection or {}).get(d)) for d in self.dims]
+        if not grids:
+            return np.ones(len(self.cell_ids), dtype=bool)
+        wanted = np.ravel_multi_index(np.meshgrid(*grids, indexing="ij"), self.cell_shape).ravel()
+        return np.isin(self.cell_ids, wanted)
+
+    def mask(self, selection):
+        """Boolean row mask for {dim: selected values}; dims left out are unfiltered."""
+        packed = np.full((self.n_rows + 7) // 8, 0xFF, dtype=np.uint8)
+        for dim in self.dims:
+            values = (selection or {}).get(dim)
+            if values is None:
+                continue
+            dim_bits = np.zeros_like(packed)
+            for value in values:
+                if value in self.bitmaps[dim]:
+                    dim_bits |= self.bitmaps[dim][value]
+            packed &= dim_bits
+        return np.unpackbits(packed, count=self.n_rows).view(bool)
+
+    def count(self, selection):
+        return int(self.cell_rows[self._selected_cells(selection)].sum())
+
+    def corr(self, selection):
+        """Pearson correlation matrix (pairwise-complete, like DataFrame.corr) of the selected rows."""
+        pick = self._selected_cells(selection)
+        n, sx, sxx, sxy = (a[pick].sum(axis=0) for a in (self.n, self.sx, self.sxx, self.sxy))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = n * sxy - sx * sx.T
+            var = (n * sxx - sx * sx) * (n * sxx.T - sx.T * sx.T)
+            r = cov / np.sqrt(var)
+        r = np.clip(r, -1.0, 1.0)
+        return pd.DataFrame(r, index=self.numeric_cols, columns=self.numeric_cols)
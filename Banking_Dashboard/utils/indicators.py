@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+
+# 0/1 indicator columns of application_train, plus the engineered ones from utils/features.py
+INDICATOR_COLUMNS = (
+    ["FLAG_MOBIL", "FLAG_EMP_PHONE", "FLAG_WORK_PHONE", "FLAG_CONT_MOBILE", "FLAG_PHONE", "FLAG_EMAIL",
+     "REG_REGION_NOT_LIVE_REGION", "REG_REGION_NOT_WORK_REGION", "LIVE_REGION_NOT_WORK_REGION",
+     "REG_CITY_NOT_LIVE_CITY", "REG_CITY_NOT_WORK_CITY", "LIVE_CITY_NOT_WORK_CITY"]
+    + [f"FLAG_DOCUMENT_{k}" for k in range(2, 22)]
+    + ["HAS_CHILDREN", "IS_MARRIED"]
+)
+
+
+def _is_binary(s):
+    if pd.api.types.is_bool_dtype(s):
+        return not s.isna().any()
+    if not pd.api.types.is_numeric_dtype(s) or s.isna().any():
+        return False
+    return bool(np.isin(s.to_numpy(), (0, 1)).all())
+
+
+def _popcount(bits):
+    return np.bitwise_count(bits).sum(axis=-1, dtype=np.int64)
+
+
+class IndicatorBlock:
+    """
+    0/1 indicator columns packed into one bitmap row per column (1 bit per data row,
+    8x smaller than int8 columns). Columns come back as boolean Series, or in their
+    original dtype, on demand; counts and rates are popcounts over the packed rows, and
+    a target's rate per flag is the popcount of (flag AND target), all columns in one
+    vectorized call.
+    """
+
+    def __init__(self, columns, bits, n_rows, index=None, dtypes=None):
+        self.columns = list(columns)
+        self.bits = bits
+        self.n_rows = n_rows
+        self.index = index
+        self.dtypes = dict(dtypes or {})
+        self._pos = {c: i for i, c in enumerate(self.columns)}
+
+    @classmethod
+    def from_frame(cls, df, cols=None):
+        """Block of `cols` (default INDICATOR_COLUMNS); columns that are absent or not strictly 0/1 are skipped."""
+        cols = [c for c in (INDICATOR_COLUMNS if cols is None else cols) if c in df.columns and _is_binary(df[c])]
+        bits = np.zeros((len(cols), (len(df) + 7) // 8), dtype=np.uint8)
+        for i, col in enumerate(cols):
+            bits[i] = np.packbits(df[col].to_numpy(dtype=bool))
+        return cls(cols, bits, len(df), df.index, {c: df[c].dtype for c in cols})
+
+    def __contains__(self, col):
+        return col in self._pos
+
+    def __len__(self):
+        return len(self.columns)
+
+    # -- Columns back on demand --
+    def mask(self, col):
+        return np.unpackbits(self.bits[self._pos[col]], count=self.n_rows).view(bool)
+
+    def values(self, col):
+        """The column as it was packed (same dtype, 0/1 values)."""
+        dtype = np.dtype(self.dtypes.get(col, bool))
+        bits = np.unpackbits(self.bits[self._pos[col]], count=self.n_rows)
+        return bits.view(dtype) if dtype.itemsize == 1 and dtype.kind in "iub" else bits.astype(dtype)
+
+    def series(self, col):
+        return pd.Series(self.mask(col), index=self.index, name=col)
+
+    def frame(self, cols=None, original_dtypes=False):
+        get = self.values if original_dtypes else self.mask
+        return pd.DataFrame({c: get(c) for c in (self.columns if cols is None else cols)}, index=self.index)
+
+    # -- Popcount statistics --
+    def counts(self):
+        """Rows with the flag set, per column."""
+        return pd.Series(_popcount(self.bits), index=self.columns, name="count")
+
+    def rates(self):
+        """Share of rows with the flag set, per column."""
+        return (self.counts() / self.n_rows if self.n_rows else self.counts() * np.nan).rename("rate")
+
+    def target_rates(self, target):
+        """
+        Per flag: rows flagged, share flagged, and the rate of `target` (0/1 values, e.g.
+        TARGET for default) among flagged and unflagged rows.
+        """
+        packed = np.packbits(np.asarray(target, dtype=bool))
+        flagged = _popcount(self.bits)
+        hits = _popcount(self.bits & packed)
+        total_hits = int(_popcount(packed))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return pd.DataFrame({
+                "count": flagged,
+                "share": flagged / self.n_rows,
+                "rate_flagged": hits / flagged,
+                "rate_unflagged": (total_hits - hits) / (self.n_rows - flagged),
+            }, index=pd.Index(self.columns, name="flag"))
+
+    @property
+    def nbytes(self):
+        return self.bits.nbytes
+
+
+def pack_indicators(df, cols=None):
+    """
+    (df without its packable indicator columns, IndicatorBlock of them). Columns that
+    shared a consolidated block with a packed column are copied out, so no buffer keeps
+    the dropped int8 values alive.
+    """
+    block = IndicatorBlock.from_frame(df, cols)
+    if not len(block):
+        return df, block
+    dropped = [df[c].to_numpy() for c in block.columns]
+    rest = df.drop(columns=block.columns)
+    shared = [c for c in rest.columns if isinstance(rest[c].dtype, np.dtype)
+              and any(np.may_share_memory(rest[c].to_numpy(), d) for d in dropped)]
+    if shared:
+        rest = pd.concat([rest.drop(columns=shared), rest[shared].copy()], axis=1)[list(rest.columns)]
+    return rest, block
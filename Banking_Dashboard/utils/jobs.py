@@ -0,0 +1,241 @@
+import atexit
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import streamlit as st
+
+from utils.datasets import load_dataset
+from utils.features import FEATURES_BY_NAME
+from utils.preprocessing import DEFAULT_PATH, STAGES
+from utils.profiling import stage
+
+# Preprocessing runs that may execute at once; more uploads queue behind them
+JOB_WORKERS = int(os.environ.get("BANKING_JOB_WORKERS", "2"))
+# Seconds between progress refreshes of a page following a job
+POLL_INTERVAL = float(os.environ.get("BANKING_JOB_POLL_S", "0.5"))
+# Finished jobs kept for sessions that have not picked up their result yet
+MAX_JOBS = 32
+
+STAGE_LABELS = {
+    "load": "Loading CSV",
+    "optimize": "Optimizing column types",
+    "nulls": "Treating missing values",
+    "outliers": "Detecting outliers",
+    "features": "Engineering features",
+}
+FINISHED = ("done", "failed", "cancelled")
+
+
+class Cancelled(Exception):
+    """Raised from a job's stage hook once the job has been cancelled."""
+
+
+class PreprocessJob:
+    """
+    One preprocess_data run on a worker thread (through load_dataset, so the result is
+    the shared Dataset). After every stage the job publishes what is known so far, so
+    a page can render it while later stages run:
+      load     -> "schema" (column, dtype), "rows"
+      optimize -> "nulls" (missing values per column, before treatment), "memory_mb"
+      outliers -> "outliers" (count per column)
+      features -> "features" (summary of the engineered columns)
+    Cancelling takes effect at the next stage boundary; the partial run is discarded.
+    Threads, not processes: the Dataset registry and its frames live in this process.
+    """
+
+    def __init__(self, source=None, columns=None):
+        self.id = uuid.uuid4().hex
+        self.source = source or DEFAULT_PATH
+        self.source_name = getattr(self.source, "name", None) or str(self.source)
+        self.columns = columns
+        self.state = "queued"
+        self.stage_times = {}
+        self.dataset = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._artifacts = {}
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self._last = None
+
+    # ------------------- State -------------------
+    @property
+    def finished(self):
+        return self.state in FINISHED
+
+    @property
+    def progress(self):
+        """Fraction of STAGES completed (1.0 once finished)."""
+        return 1.0 if self.finished else len(self.stage_times) / len(STAGES)
+
+    @property
+    def wall_s(self):
+        end = self.finished_at or time.time()
+        return end - (self.started_at or end)
+
+    def status(self):
+        if self.state == "running":
+            pending = [s for s in STAGES if s not in self.stage_times]
+            label = STAGE_LABELS[pending[0]] if pending else "Caching result"
+            return f"{label}... ({len(self.stage_times)}/{len(STAGES)} stages, {self.wall_s:.1f}s)"
+        return {"queued": "Waiting for a worker...", "done": "Done", "cancelled": "Cancelled",
+                "failed": f"Failed: {self.error}"}[self.state]
+
+    def artifact(self, name, default=None):
+        with self._lock:
+            return self._artifacts.get(name, default)
+
+    def cancel(self):
+        self._cancel.set()
+
+    # ------------------- Publishing -------------------
+    def _publish(self, **artifacts):
+        with self._lock:
+            self._artifacts.update(artifacts)
+
+    def _publish_frame(self, stage_name, df, outliers_dict):
+        if stage_name == "load":
+            self._publish(rows=len(df), schema=pd.DataFrame({"column": df.columns, "dtype": df.dtypes.astype(str).values}))
+        elif stage_name == "optimize":
+            nulls = df.isna().sum()
+            self._publish(nulls=nulls[nulls > 0].sort_values(ascending=False),
+                          memory_mb=float(df.memory_usage(deep=True).sum()) / 1024**2)
+        elif stage_name == "outliers" and outliers_dict:
+            self._publish(outliers=outliers_dict.counts())
+        elif stage_name == "features":
+            engineered = [c for c in df.columns if c in FEATURES_BY_NAME]
+            self._publish(features=df[engineered].describe().T if engineered else pd.DataFrame())
+
+    def _on_stage(self, stage_name, df, outliers_dict):
+        if self._cancel.is_set():
+            raise Cancelled()
+        now = time.perf_counter()
+        self.stage_times[stage_name] = now - self._last
+        self._last = now
+        self._publish_frame(stage_name, df, outliers_dict)
+        if self._cancel.is_set():
+            raise Cancelled()
+
+    # ------------------- Run -------------------
+    def run(self):
+        if self._cancel.is_set():
+            self.state, self.finished_at = "cancelled", time.time()
+            return
+        self.state, self.started_at, self._last = "running", time.time(), time.perf_counter()
+        try:
+            with stage("job.preprocess", "job", source=self.source_name):
+                dataset = load_dataset(self.source, self.columns, progress=self._on_stage)
+            if dataset.empty:
+                raise ValueError(f"no rows could be read from {self.source_name}")
+            if self.artifact("features") is None:
+                # Served from the registry or the disk cache: no stage ran, publish from the result
+                df = dataset.frame()
+                for name in STAGES:
+                    self._publish_frame(name, df, dataset.outliers)
+            self.dataset, self.state = dataset, "done"
+        except Cancelled:
+            self.state = "cancelled"
+        except Exception as e:
+            print(f"Error preprocessing {self.source_name}: {e}")
+            self.error, self.state = str(e), "failed"
+        finally:
+            self.finished_at = time.time()
+
+
+# ------------------- Job Registry -------------------
+_jobs = OrderedDict()
+_jobs_lock = threading.Lock()
+_executor = None
+
+
+def _pool():
+    global _executor
+    with _jobs_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(JOB_WORKERS, thread_name_prefix="preprocess")
+        return _executor
+
+
+@atexit.register
+def shutdown():
+    for job in list(_jobs.values()):
+        job.cancel()
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+
+
+def submit(source=None, columns=None):
+    """Start preprocessing source (path or uploaded file; None -> default CSV) in the background."""
+    job = PreprocessJob(source, columns)
+    with _jobs_lock:
+        _jobs[job.id] = job
+        done = [k for k, j in _jobs.items() if j.finished]
+        for k in done[:max(len(_jobs) - MAX_JOBS, 0)]:
+            del _jobs[k]
+    _pool().submit(job.run)
+    return job
+
+
+def get_job(job_id):
+    with _jobs_lock:
+        return _jobs.get(job_id)
+
+
+def cancel(job_id):
+    """Cancel a job if it has not finished (e.g. its session uploaded another file)."""
+    job = get_job(job_id) if job_id else None
+    if job is not None and not job.finished:
+        job.cancel()
+
+
+def collect_job(session_state):
+    """
+    The session's preprocessing job once it has finished, detached from the session;
+    its dataset becomes session_state["dataset_key"], or its error session_state["dataset_error"].
+    None while it runs or when there is no job. A job id no longer in the registry
+    (trimmed past MAX_JOBS) is dropped, so app.py submits the file again.
+    """
+    job = get_job(session_state.get("dataset_job"))
+    if job is None:
+        session_state.pop("dataset_job", None)
+        return None
+    if not job.finished:
+        return None
+    session_state.pop("dataset_job", None)
+    if job.state == "done":
+        session_state["dataset_key"] = job.dataset.key
+    elif job.state == "failed":
+        session_state["dataset_error"] = job.error
+    return job
+
+
+def session_job(session_state):
+    """The session's preprocessing job while it is still running, else None (a finished one is collected)."""
+    collect_job(session_state)
+    job = get_job(session_state.get("dataset_job"))
+    return job if job is not None and not job.finished else None
+
+
+# ------------------- Progress Display -------------------
+def follow_job(job, render=None):
+    """
+    Progress bar for job, plus render(job) for what it has published so far, refreshed
+    every POLL_INTERVAL seconds without rerunning the page; once the job finishes the
+    whole script reruns so the page renders the result.
+    """
+    @st.fragment(run_every=POLL_INTERVAL)
+    def follow():
+        if job.finished:
+            st.rerun()
+        st.progress(job.progress, text=job.status())
+        if render is not None:
+            render(job)
+
+    follow()
@@ -0,0 +1,17 @@
+import streamlit as st
+
+from utils.profiling import PROFILE_ENABLED
+
+# Pages in pages/ that only show in the sidebar while their feature is on
+OPTIONAL_PAGES = {"Performance": PROFILE_ENABLED}
+
+
+def hide_disabled_pages():
+    """
+    Hide the sidebar links of OPTIONAL_PAGES that are turned off. Streamlit lists every
+    file in pages/, so each page (and app.py) calls this after st.set_page_config.
+    """
+    hidden = [name for name, enabled in OPTIONAL_PAGES.items() if not enabled]
+    if hidden:
+        rules = ", ".join(f'[data-testid="stSidebarNav"] li:has(a[href$="/{name}"])' for name in hidden)
+        st.html(f"<style>{rules} {{ display: none; }}</style>")
@@ -0,0 +1,136 @@
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+from utils import parallel, sketches
+
+# Fence multipliers per detector
+IQR_K = 1.5
+MAD_K = 3.5
+ZSCORE_K = 3.0
+_MAD_SCALE = 0.6745  # makes MAD comparable to a standard deviation under normality
+
+
+# ------------------- Result -------------------
+class OutlierMasks(Mapping):
+    """
+    Per-column outlier flags stored as one packed bitmap row per column (1 bit per data row).
+    Behaves as a read-only mapping of column -> np.int32 row positions, but counts(),
+    mask() and total() answer without materializing any index arrays.
+    """
+
+    def __init__(self, columns, bits, n_rows, counts, fences=None):
+        self.columns = list(columns)
+        self.bits = bits
+        self.n_rows = n_rows
+        self._counts = np.asarray(counts, dtype=np.int64)
+        self._pos = {c: i for i, c in enumerate(self.columns)}
+        self.fences = fences
+
+    # -- Mapping protocol --
+    def __getitem__(self, col):
+        return np.flatnonzero(self.mask(col)).astype(np.int32)
+
+    def __iter__(self):
+        return iter(self.columns)
+
+    def __len__(self):
+        return len(self.columns)
+
+    # -- Cheap accessors --
+    def mask(self, col):
+        return np.unpackbits(self.bits[self._pos[col]], count=self.n_rows).view(bool)
+
+    def counts(self):
+        return pd.Series(self._counts, index=self.columns, name="outliers")
+
+    def total(self):
+        return int(self._counts.sum())
+
+    def any_mask(self):
+        """Rows flagged in at least one column."""
+        return np.unpackbits(np.bitwise_or.reduce(self.bits, axis=0), count=self.n_rows).view(bool)
+
+    @property
+    def nbytes(self):
+        return self.bits.nbytes + self._counts.nbytes
+
+    # -- Serialization (one row per column, bitmap as bytes) --
+    def to_frame(self):
+        return pd.DataFrame({
+            "column": self.columns,
+            "count": self._counts,
+            "n_rows": np.full(len(self.columns), self.n_rows, dtype=np.int64),
+            "bits": [row.tobytes() for row in self.bits],
+        })
+
+    @classmethod
+    def from_frame(cls, frame):
+        n_rows = int(frame["n_rows"].iloc[0]) if len(frame) else 0
+        width = (n_rows + 7) // 8
+        bits = np.frombuffer(b"".join(frame["bits"]), dtype=np.uint8).reshape(len(frame), width)
+        return cls(frame["column"].tolist(), bits, n_rows, frame["count"].to_numpy())
+
+
+# ------------------- Fences -------------------
+def _quantile(data, q, approximate):
+    # approximate: from per-column KLL sketches (utils/sketches.py) instead of a sort/selection
+    return sketches.quantiles(sketches.frame_sketches(data), q) if approximate else data.quantile(q)
+
+
+def _iqr_fences(data, approximate=False):
+    q = _quantile(data, [0.25, 0.75], approximate)
+    iqr = q.loc[0.75] - q.loc[0.25]
+    return q.loc[0.25] - IQR_K * iqr, q.loc[0.75] + IQR_K * iqr
+
+
+def _mad_fences(data, approximate=False):
+    med = _quantile(data, 0.5, approximate)
+    mad = _quantile((data - med).abs(), 0.5, approximate)
+    width = MAD_K * mad / _MAD_SCALE
+    return med - width, med + width
+
+
+def _zscore_fences(data, approximate=False):
+    mean, std = data.mean(), data.std()
+    return mean - ZSCORE_K * std, mean + ZSCORE_K * std
+
+
+DETECTORS = {"iqr": _iqr_fences, "mad": _mad_fences, "zscore": _zscore_fences}
+
+
+# ------------------- Detect -------------------
+def _flag(values, lower, upper):
+    # Per-column kernel (runs on utils/parallel.py workers): outlier count and packed mask
+    mask = (values < lower) | (values > upper)
+    return np.count_nonzero(mask), np.packbits(mask)
+
+
+def detect_outliers(df, method="iqr", cols=None, approximate=False):
+    """
+    Flag values outside the detector's fences for every numeric column (or `cols`).
+    Fences for all columns come from one vectorized call; each column's mask is
+    packed to bits as soon as it is built, column-parallel via utils/parallel.py.
+    approximate: estimate quantile-based fences (iqr, mad) from mergeable sketches.
+    """
+    if method not in DETECTORS:
+        raise ValueError(f"Unknown outlier method '{method}'. Choose from {sorted(DETECTORS)}")
+    if cols is None:
+        cols = df.select_dtypes(include=np.number).columns
+    cols = list(cols)
+
+    n_rows = len(df)
+    bits = np.zeros((len(cols), (n_rows + 7) // 8), dtype=np.uint8)
+    counts = np.zeros(len(cols), dtype=np.int64)
+    if not cols:
+        return OutlierMasks(cols, bits, n_rows, counts)
+
+    lower, upper = DETECTORS[method](df[cols], approximate)
+    flags = parallel.map_columns(_flag, [df[col].to_numpy() for col in cols],
+                                 [(lower[col], upper[col]) for col in cols])
+    for i, (count, packed) in enumerate(flags):
+        counts[i] = count
+        bits[i] = packed
+
+    return OutlierMasks(cols, bits, n_rows, counts, fences=pd.DataFrame({"lower": lower, "upper": upper}))
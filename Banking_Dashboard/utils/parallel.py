@@ -0,0 +1,146 @@
+import atexit
+import multiprocessing as mp
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# serial | threads | processes
+BACKEND = os.environ.get("BANKING_PARALLEL", "threads")
+BACKENDS = ("serial", "threads", "processes")
+_ALIGN = 64
+# Columns per task, so tiny columns don't pay one round trip each
+_TASKS_PER_WORKER = 4
+
+
+def available_cores():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+MAX_WORKERS = int(os.environ.get("BANKING_WORKERS", "0")) or available_cores()
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _pool(backend):
+    with _pools_lock:
+        if backend not in _pools:
+            if backend == "threads":
+                _pools[backend] = ThreadPoolExecutor(MAX_WORKERS, thread_name_prefix="columns")
+            else:
+                # forkserver children start from a clean single-threaded server (Streamlit runs many threads)
+                method = "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
+                _pools[backend] = ProcessPoolExecutor(MAX_WORKERS, mp_context=mp.get_context(method))
+        return _pools[backend]
+
+
+@atexit.register
+def shutdown():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        _pools.clear()
+
+
+# ------------------- Shared Memory -------------------
+def _shareable(values):
+    return isinstance(values, np.ndarray) and values.dtype.kind in "biufcmM"
+
+
+class SharedColumns:
+    """
+    Numeric column buffers copied once into a single shared-memory block. Workers
+    receive (block name, offset, dtype, length) descriptors and map the block,
+    instead of unpickling a copy of every column.
+    """
+
+    def __init__(self, arrays):
+        offsets, total = [], 0
+        for a in arrays:
+            offsets.append(total)
+            total += -(-a.nbytes // _ALIGN) * _ALIGN
+        self.shm = shared_memory.SharedMemory(create=True, size=max(total, 1))
+        self.specs = []
+        for a, offset in zip(arrays, offsets):
+            view = np.ndarray(a.shape, dtype=a.dtype, buffer=self.shm.buf, offset=offset)
+            view[...] = a
+            self.specs.append((self.shm.name, offset, a.dtype.str, a.shape))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _run_shared(kernel, specs, args):
+    """Worker side: map the block, run kernel on each column view, release the block."""
+    shm = shared_memory.SharedMemory(name=specs[0][0])
+    try:
+        out = []
+        for (_, offset, dtype, shape), extra in zip(specs, args):
+            values = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+            out.append(kernel(values, *extra))
+            del values
+        return out
+    finally:
+        shm.close()
+
+
+def _run_local(kernel, arrays, args):
+    return [kernel(values, *extra) for values, extra in zip(arrays, args)]
+
+
+# ------------------- Column Map -------------------
+def _chunks(n, workers):
+    size = max(1, -(-n // (workers * _TASKS_PER_WORKER)))
+    return [range(i, min(i + size, n)) for i in range(0, n, size)]
+
+
+def map_columns(kernel, arrays, args=None, backend=None):
+    """
+    [kernel(arrays[i], *args[i]) for i in range(len(arrays))] on the configured backend.
+
+    Results always come back in input order and each kernel call sees exactly the
+    values the serial loop would, so every backend produces the serial output.
+    With "processes", kernel must be a module-level function; numeric arrays go
+    through shared memory and anything else (object columns) runs in the caller.
+    """
+    backend = backend or BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}'. Choose from {list(BACKENDS)}")
+    args = list(args) if args is not None else [()] * len(arrays)
+    if backend == "serial" or MAX_WORKERS <= 1 or len(arrays) <= 1:
+        return _run_local(kernel, arrays, args)
+
+    results = [None] * len(arrays)
+    if backend == "threads":
+        pool = _pool("threads")
+        futures = [(idx, pool.submit(_run_local, kernel, [arrays[i] for i in idx], [args[i] for i in idx]))
+                   for idx in _chunks(len(arrays), MAX_WORKERS)]
+        for idx, future in futures:
+            for i, value in zip(idx, future.result()):
+                results[i] = value
+        return results
+
+    shared = [i for i, a in enumerate(arrays) if _shareable(a)]
+    local = [i for i, a in enumerate(arrays) if not _shareable(a)]
+    with SharedColumns([arrays[i] for i in shared]) as block:
+        pool = _pool("processes")
+        futures = []
+        for idx in _chunks(len(shared), MAX_WORKERS):
+            cols = [shared[k] for k in idx]
+            futures.append((cols, pool.submit(_run_shared, kernel, [block.specs[k] for k in idx], [args[i] for i in cols])))
+        for i, value in zip(local, _run_local(kernel, [arrays[i] for i in local], [args[i] for i in local])):
+            results[i] = value
+        for cols, future in futures:
+            for i, value in zip(cols, future.result()):
+                results[i] = value
+    return results
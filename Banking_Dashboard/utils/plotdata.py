@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+
+# Raw points are only shipped to a chart below this many rows; above it they are sampled
+MAX_POINTS = 5_000
+MAX_FLIERS = 200
+KDE_GRID = 256
+
+
+def _finite(values):
+    values = np.asarray(values, dtype=np.float64)
+    return values[np.isfinite(values)]
+
+
+# ------------------- Histograms -------------------
+def histogram(values, bins=30, range=None):
+    """(counts, edges) for the non-null values, as np.histogram."""
+    return np.histogram(_finite(values), bins=bins, range=range)
+
+
+def hist_bars(ax, counts, edges, **kwargs):
+    """Draw precomputed counts like plt.hist(values, bins=edges)."""
+    if np.ndim(counts) == 1:
+        return ax.hist(edges[:-1], bins=edges, weights=counts, **kwargs)
+    return ax.hist([edges[:-1]] * len(counts), bins=edges, weights=list(counts), **kwargs)
+
+
+def kde_curve(values, grid=KDE_GRID):
+    """
+    Gaussian KDE evaluated on `grid` points via a binned estimate (histogram + smoothing),
+    scaled to counts per unit so it overlays a count histogram after multiplying by bin width.
+    Bandwidth follows Scott's rule (std * n^-1/5), seaborn's default; like seaborn's histplot
+    and matplotlib's violinplot, the curve is cut at the data range.
+    """
+    x = _finite(values)
+    if len(x) < 2 or x.min() == x.max():
+        return np.array([]), np.array([])
+    bw = x.std(ddof=1) * len(x) ** (-1 / 5)
+    lo, hi = x.min() - 3 * bw, x.max() + 3 * bw
+    counts, edges = np.histogram(x, bins=grid, range=(lo, hi))
+    step = edges[1] - edges[0]
+    half = int(np.ceil(4 * bw / step))
+    offsets = np.arange(-half, half + 1) * step
+    kernel = np.exp(-0.5 * (offsets / bw) ** 2) / (bw * np.sqrt(2 * np.pi))
+    density = np.convolve(counts, kernel)[half:half + grid]
+    centers = (edges[:-1] + edges[1:]) / 2
+    inside = (centers >= x.min()) & (centers <= x.max())
+    return centers[inside], density[inside]
+
+
+# ------------------- 2D Aggregation -------------------
+def hist2d(x, y, bins=60):
+    """Non-empty cells of a 2D histogram as (x centers, y centers, counts)."""
+    x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    ok = np.isfinite(x) & np.isfinite(y)
+    counts, xe, ye = np.histogram2d(x[ok], y[ok], bins=bins)
+    xc, yc = np.meshgrid((xe[:-1] + xe[1:]) / 2, (ye[:-1] + ye[1:]) / 2, indexing="ij")
+    nz = counts > 0
+    return xc[nz], yc[nz], counts[nz]
+
+
+def hexbin_binned(ax, x, y, gridsize=50, bins=400, **kwargs):
+    """ax.hexbin over a fine pre-binned grid: the chart gets cell counts instead of every point."""
+    xc, yc, counts = hist2d(x, y, bins=bins)
+    return ax.hexbin(xc, yc, C=counts, reduce_C_function=np.sum, gridsize=gridsize, **kwargs)
+
+
+# ------------------- Box / Violin Summaries -------------------
+def box_stats(values, label="", whis=1.5, max_fliers=MAX_FLIERS, seed=0):
+    """Five-number summary in the dict form Axes.bxp draws, with at most max_fliers fliers."""
+    x = _finite(values)
+    if len(x) == 0:
+        return {"label": label, "med": np.nan, "q1": np.nan, "q3": np.nan,
+                "whislo": np.nan, "whishi": np.nan, "fliers": np.array([])}
+    q1, med, q3 = np.percentile(x, [25, 50, 75])
+    iqr = q3 - q1
+    inside = x[(x >= q1 - whis * iqr) & (x <= q3 + whis * iqr)]
+    fliers = x[(x < q1 - whis * iqr) | (x > q3 + whis * iqr)]
+    if len(fliers) > max_fliers:
+        fliers = np.random.default_rng(seed).choice(fliers, max_fliers, replace=False)
+    return {"label": label, "med": med, "q1": q1, "q3": q3,
+            "whislo": inside.min() if len(inside) else q1,
+            "whishi": inside.max() if len(inside) else q3,
+            "fliers": fliers}
+
+
+def grouped_box_stats(df, value, by, **kwargs):
+    """box_stats per group of `by`, in group order."""
+    return [box_stats(g[value], label=str(k), **kwargs)
+            for k, g in df.groupby(by, observed=True, sort=True)]
+
+
+def violin_stats(values, grid=KDE_GRID):
+    """The dict Axes.violin draws: KDE curve plus mean/median/min/max."""
+    x = _finite(values)
+    coords, vals = kde_curve(x, grid)
+    return {"coords": coords, "vals": vals / max(len(x), 1), "mean": x.mean(), "median": np.median(x),
+            "min": x.min(), "max": x.max()}
+
+
+# ------------------- Sampling -------------------
+def stratified_sample(df, by="TARGET", n=MAX_POINTS, seed=0):
+    """
+    At most n rows drawn proportionally from each class of `by`, so the class mix
+    of the chart matches the data. Frames already under n pass through.
+    """
+    if len(df) <= n:
+        return df
+    if by not in df.columns:
+        return df.sample(n, random_state=seed)
+    return df.groupby(by, observed=True, group_keys=False).sample(frac=n / len(df), random_state=seed)
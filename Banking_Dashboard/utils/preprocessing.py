@@ -1,151 +1,253 @@
+import functools
+import os
 import pandas as pd
 import numpy as np
 import string
 
-def preprocess_data(file=None):
+from utils import cache, features, outliers, parallel, schema, sketches
+from utils.profiling import profiled
+
+DEFAULT_PATH = "application_train_10000.csv"
+
+# Bump whenever a stage below changes its output, so stale cache entries are ignored.
+PIPELINE_VERSION = "4"
+
+# exact | approximate: imputation medians and IQR fences from sort/selection, or from
+# mergeable KLL sketches (utils/sketches.py) that never need a whole column at once
+QUANTILES = os.environ.get("BANKING_QUANTILES", "exact")
+QUANTILE_MODES = ("exact", "approximate")
+
+# Stages reported to preprocess_data's progress hook, in run order
+STAGES = ("load", "optimize", "nulls", "outliers", "features")
+
+
+def _copy_on_write(fn):
+    # Stages start from shallow copies: with copy-on-write a column is only duplicated when it is
+    # replaced, so untouched columns stay shared with the input frame (and the caller's frame never
+    # changes). The option is scoped to the stage call; app.py turns it on for the whole app.
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        if pd.get_option("mode.copy_on_write") is True:
+            return fn(*args, **kwargs)
+        with pd.option_context("mode.copy_on_write", True):
+            return fn(*args, **kwargs)
+    return run
+
+
+# ------------------- Load Data -------------------
+@profiled("load")
+def _load_data(file, usecols=None):
+    source = file if file else DEFAULT_PATH
+    try:
+        typed = schema.read_typed_csv(source, usecols)
+        if typed is not None:
+            return typed
+        return pd.read_csv(source, usecols=None if usecols is None else (lambda c: c in set(usecols)))
+    except Exception as e:
+        print(f"Error loading dataset: {e}")
+        return pd.DataFrame()
+
+
+# ------------------- Optimize Numeric Columns -------------------
+def _target_dtype(values):
+    # Per-column kernel (runs on utils/parallel.py workers): smallest dtype that holds the values
+    if values.dtype.kind in "iu":
+        if len(values) == 0:
+            return None
+        lo, hi = values.min(), values.max()
+        for dt in ("int8", "int16", "int32"):
+            if lo >= np.iinfo(dt).min and hi <= np.iinfo(dt).max:
+                return dt
+        return None
+    v64 = values.astype("float64")  # one column at a time, so the probe never holds a float64 copy of the frame
+    return "float16" if np.allclose(v64, v64.astype("float16"), rtol=1e-03, atol=1e-06, equal_nan=True) else "float32"
+
+
+@profiled()
+@_copy_on_write
+def optimize_dataframe(df):
+    # Columns already at their target dtype (e.g. loaded via utils/schema.py) are left untouched
+    optimized = df.copy(deep=False)
+    cols, values = [], []
+    for col in optimized.columns:
+        s = optimized[col]
+        if pd.api.types.is_integer_dtype(s):
+            cols.append(col)
+            values.append(s.to_numpy() if isinstance(s.dtype, np.dtype) else s.dropna().to_numpy("int64"))
+        elif pd.api.types.is_float_dtype(s) and s.dtype != "float16":
+            cols.append(col)
+            values.append(s.to_numpy() if isinstance(s.dtype, np.dtype) else s.to_numpy("float64", na_value=np.nan))
+
+    for col, target in zip(cols, parallel.map_columns(_target_dtype, values)):
+        if target is not None and optimized[col].dtype != target:
+            optimized[col] = optimized[col].astype(target)
+    return optimized
+
+
+# ------------------- Treat Nulls -------------------
+def _mode_value(values):
+    # Per-column kernel: category codes (-1 = missing) give the most frequent code,
+    # anything else the first of Series.mode(); None when every value is missing
+    if values.dtype.kind in "iu":
+        counts = np.bincount(values[values >= 0])
+        return int(counts.argmax()) if counts.size else None
+    mode_val = pd.Series(values).mode(dropna=True)
+    return None if mode_val.empty else mode_val[0]
+
+
+def _check_quantiles(quantiles):
+    quantiles = quantiles or QUANTILES
+    if quantiles not in QUANTILE_MODES:
+        raise ValueError(f"Unknown quantile mode '{quantiles}'. Choose from {list(QUANTILE_MODES)}")
+    return quantiles
+
+
+def pipeline_version(quantiles=None):
+    """Cache version of a run: approximate runs produce different values, so they get their own entries."""
+    quantiles = _check_quantiles(quantiles)
+    return PIPELINE_VERSION if quantiles == "exact" else f"{PIPELINE_VERSION}-{quantiles}"
+
+
+@profiled()
+@_copy_on_write
+def treat_nulls(df, quantiles=None):
+    quantiles = _check_quantiles(quantiles)
+    cleaned = df.copy(deep=False)
+    threshold = 0.6
+    null_ratio = cleaned.isna().mean()
+    to_drop = null_ratio[null_ratio > threshold].index.tolist()
+    cleaned = cleaned.drop(columns=to_drop)
+    if cleaned.shape[1] == 0:
+        return cleaned
+
+    num_cols = [c for c in cleaned.select_dtypes(include=[np.number]).columns if cleaned[c].isna().any()]
+    cat_cols = [c for c in cleaned.select_dtypes(include=["object","category","bool"]).columns if cleaned[c].isna().any()]
+    dt_cols  = [c for c in cleaned.select_dtypes(include=["datetime64"]).columns if cleaned[c].isna().any()]
+
+    if num_cols:
+        if quantiles == "approximate":
+            medians = sketches.quantiles(sketches.frame_sketches(cleaned, num_cols), 0.5)
+        else:
+            medians = cleaned[num_cols].median()
+        # Column by column: only the filled columns are rewritten, never the whole numeric block
+        for c in num_cols:
+            cleaned[c] = cleaned[c].fillna(medians[c])
+
+    is_cat = [isinstance(cleaned[c].dtype, pd.CategoricalDtype) for c in cat_cols]
+    values = [cleaned[c].cat.codes.to_numpy() if cat else cleaned[c].to_numpy(dtype=object)
+              for c, cat in zip(cat_cols, is_cat)]
+    for c, cat, mode_val in zip(cat_cols, is_cat, parallel.map_columns(_mode_value, values)):
+        if mode_val is not None:
+            cleaned[c] = cleaned[c].fillna(cleaned[c].cat.categories[mode_val] if cat else mode_val)
+        else:
+            cleaned[c] = cleaned[c].fillna("" if cleaned[c].dtype=="object" else 0)
+
+    for c in dt_cols:
+        cleaned[c] = cleaned[c].fillna(method="ffill").fillna(method="bfill")
+
+    return cleaned
+
+
+# ------------------- Detect Outliers -------------------
+@profiled()
+def find_outliers_iqr(df, cols=None, quantiles=None):
+    # Returns an OutlierMasks: column -> np.int32 row positions, backed by packed bitmaps
+    approximate = _check_quantiles(quantiles) == "approximate"
+    return outliers.detect_outliers(df, "iqr", cols, approximate=approximate)
+
+
+# ------------------- Clean Text Columns -------------------
+@_copy_on_write
+def clean_text_column(df, col):
+    cleaned = df.copy(deep=False)
+
+    def to_lower(s): return s.str.lower()
+    def remove_punctuation(s): return s.str.translate(str.maketrans("", "", string.punctuation))
+    def remove_numbers(s): return s.str.translate(str.maketrans("", "", "0123456789"))
+    def remove_extra_spaces(s): return s.str.split().str.join(" ")
+
+    if col in cleaned.columns:
+        text_series = cleaned[col].astype(str)
+        text_series = to_lower(text_series)
+        text_series = remove_punctuation(text_series)
+        text_series = remove_numbers(text_series)
+        text_series = remove_extra_spaces(text_series)
+        cleaned[col] = text_series
+
+    return cleaned
+
+
+# ------------------- Feature Engineering -------------------
+@profiled()
+def engineer_features(df, names=None):
+    # Derived columns are declared in utils/features.py
+    return features.compute_features(df, names)
+
+
+def _projection(columns):
+    """(source columns to read, feature names to build) for the requested output columns."""
+    derived = [c for c in columns if c in features.FEATURES_BY_NAME]
+    raw = [c for c in columns if c not in features.FEATURES_BY_NAME]
+    return sorted(set(raw) | set(features.raw_inputs(derived))), derived
+
+
+@profiled()
+def preprocess_data(file=None, use_cache=True, columns=None, quantiles=None, progress=None):
     """
     Complete preprocessing pipeline:
     1) Load dataset
     2) Optimize numeric columns
     3) Treat nulls
-    4) Feature engineering
-    5) Detect outliers
-    6) Clean text
+    4) Detect outliers
+    5) Feature engineering
+    Results are cached on disk keyed by the input bytes and PIPELINE_VERSION,
+    so a repeat call with the same file skips every stage (see utils/cache.py).
+    Every stage is timed by utils/profiling.py when profiling is on (BANKING_PROFILE=1).
+    columns: restrict the run to these output columns (source or engineered names).
+    Only their source columns are parsed and only the features they need are built;
+    every stage works column by column, so the result equals those columns of a full run.
+    An existing full-run cache entry is read with Parquet column selection instead.
+    quantiles: "exact" or "approximate" (sketch-based medians and IQR fences);
+    defaults to BANKING_QUANTILES. Each mode has its own cache entries.
+    progress: optional hook progress(stage, df, outliers_dict) called after each of STAGES
+    with the frame so far (outliers_dict is None until "outliers"). It is not called on a
+    cache hit; an exception it raises aborts the run before the next stage (utils/jobs.py).
     Returns:
         df : pd.DataFrame
-        outliers_dict: dict
+        outliers_dict: utils.outliers.OutlierMasks (read-only column -> row positions mapping)
         clean_text_column: function
     """
-
-    # ------------------- Load Data -------------------
-    def _load_data(file):
-        default_path = "application_train_10000.csv"
-        try:
-            if file:
-                return pd.read_csv(file)
-            else:
-                return pd.read_csv(default_path)
-        except Exception as e:
-            print(f"Error loading dataset: {e}")
-            return pd.DataFrame()
-
-    df = _load_data(file)
+    quantiles = _check_quantiles(quantiles)
+    usecols, derived = _projection(columns) if columns is not None else (None, None)
+    key = cache.cache_key(file or DEFAULT_PATH, pipeline_version(quantiles)) if use_cache else None
+    if key and columns is not None:
+        hit = cache.load(key, columns=usecols + derived)
+        key = cache.projection_key(key, columns)
+        hit = hit or cache.load(key)
+    elif key:
+        hit = cache.load(key)
+    else:
+        hit = None
+    if hit is not None:
+        df, outliers_dict = hit
+        return df, outliers_dict, clean_text_column
+
+    progress = progress or (lambda stage, df, outliers_dict: None)
+    df = _load_data(file, usecols)
     if df.empty:
         return pd.DataFrame(), {}, None
-
-    # ------------------- Optimize Numeric Columns -------------------
-    def optimize_dataframe(df):
-        optimized = df.copy()
-        for col in optimized.columns:
-            s = optimized[col]
-            if pd.api.types.is_integer_dtype(s):
-                vals = s.astype("int64")
-                if vals.min() >= np.iinfo(np.int8).min and vals.max() <= np.iinfo(np.int8).max:
-                    optimized[col] = s.astype("int8")
-                elif vals.min() >= np.iinfo(np.int16).min and vals.max() <= np.iinfo(np.int16).max:
-                    optimized[col] = s.astype("int16")
-                elif vals.min() >= np.iinfo(np.int32).min and vals.max() <= np.iinfo(np.int32).max:
-                    optimized[col] = s.astype("int32")
-            elif pd.api.types.is_float_dtype(s):
-                s64 = s.astype("float64")
-                if np.allclose(s64, s64.astype("float16"), rtol=1e-03, atol=1e-06, equal_nan=True):
-                    optimized[col] = s64.astype("float16")
-                else:
-                    optimized[col] = s64.astype("float32")
-        return optimized
+    progress("load", df, None)
 
     df = optimize_dataframe(df)
-
-    # ------------------- Treat Nulls -------------------
-    def treat_nulls(df):
-        cleaned = df.copy()
-        threshold = 0.6
-        null_ratio = cleaned.isna().mean()
-        to_drop = null_ratio[null_ratio > threshold].index.tolist()
-        cleaned = cleaned.drop(columns=to_drop)
-        if cleaned.shape[1] == 0:
-            return cleaned
-
-        num_cols = [c for c in cleaned.select_dtypes(include=[np.number]).columns if cleaned[c].isna().any()]
-        cat_cols = [c for c in cleaned.select_dtypes(include=["object","category","bool"]).columns if cleaned[c].isna().any()]
-        dt_cols  = [c for c in cleaned.select_dtypes(include=["datetime64"]).columns if cleaned[c].isna().any()]
-
-        if num_cols:
-            medians = cleaned[num_cols].median()
-            cleaned[num_cols] = cleaned[num_cols].fillna(medians)
-
-        for c in cat_cols:
-            mode_val = cleaned[c].mode(dropna=True)
-            if not mode_val.empty:
-                cleaned[c] = cleaned[c].fillna(mode_val[0])
-            else:
-                cleaned[c] = cleaned[c].fillna("" if cleaned[c].dtype=="object" else 0)
-
-        for c in dt_cols:
-            cleaned[c] = cleaned[c].fillna(method="ffill").fillna(method="bfill")
-
-        return cleaned
-
-    df = treat_nulls(df)
-
-    # ------------------- Detect Outliers -------------------
-    def find_outliers_iqr(df, cols=None):
-        if cols is None:
-            cols = df.select_dtypes(include=np.number).columns
-        outliers = {}
-        for col in cols:
-            Q1 = df[col].quantile(0.25)
-            Q3 = df[col].quantile(0.75)
-            IQR = Q3 - Q1
-            lower = Q1 - 1.5*IQR
-            upper = Q3 + 1.5*IQR
-            mask = (df[col] < lower) | (df[col] > upper)
-            outliers[col] = df[mask].index.tolist()
-        return outliers
-
-    outliers_dict = find_outliers_iqr(df)
-
-    # ------------------- Clean Text Columns -------------------
-    def clean_text_column(df, col):
-        cleaned = df.copy()
-
-        def to_lower(s): return s.str.lower()
-        def remove_punctuation(s): return s.str.translate(str.maketrans("", "", string.punctuation))
-        def remove_numbers(s): return s.str.translate(str.maketrans("", "", "0123456789"))
-        def remove_extra_spaces(s): return s.str.split().str.join(" ")
-
-        if col in cleaned.columns:
-            text_series = cleaned[col].astype(str)
-            text_series = to_lower(text_series)
-            text_series = remove_punctuation(text_series)
-            text_series = remove_numbers(text_series)
-            text_series = remove_extra_spaces(text_series)
-            cleaned[col] = text_series
-
-        return cleaned
-
-    # ------------------- Feature Engineering --Overview-------------------
-    if "DAYS_BIRTH" in df.columns:
-        df["AGE_YEARS"] = (-df["DAYS_BIRTH"] / 365.25).astype(int)
-
-    if "DAYS_EMPLOYED" in df.columns:
-        df["EMPLOYMENT_YEARS"] = df["DAYS_EMPLOYED"].apply(
-            lambda x: -x / 365.25 if x < 0 else None
-        )  
-    # ------------------- Feature Engineering — Household -------------------
-    if "NAME_FAMILY_STATUS" in df.columns:
-        df["IS_MARRIED"] = df["NAME_FAMILY_STATUS"].apply(lambda x: 1 if x in ["Married","Civil marriage"] else 0)
-
-    if "CNT_CHILDREN" in df.columns:
-        df["HAS_CHILDREN"] = (df["CNT_CHILDREN"] > 0).astype(int)
-
-    if "CNT_FAM_MEMBERS" in df.columns:
-        df["FAMILY_SIZE"] = df["CNT_FAM_MEMBERS"].fillna(df["CNT_FAM_MEMBERS"].median())
-
-    # ------------------- Feature Engineering -Financial Health -------------------
-    if "AMT_INCOME_TOTAL" in df.columns and "AMT_CREDIT" in df.columns and "AMT_ANNUITY" in df.columns:
-        df["LTI"] = df["AMT_CREDIT"] / df["AMT_INCOME_TOTAL"]           
-        df["DTI"] = df["AMT_ANNUITY"] / df["AMT_INCOME_TOTAL"]         
-        df["ANNUITY_TO_CREDIT_RATIO"] = df["AMT_ANNUITY"] / df["AMT_CREDIT"]  
+    progress("optimize", df, None)
+    df = treat_nulls(df, quantiles)
+    progress("nulls", df, None)
+    outliers_dict = find_outliers_iqr(df, quantiles=quantiles)
+    progress("outliers", df, outliers_dict)
+    df = engineer_features(df, derived)
+    progress("features", df, outliers_dict)
+
+    if key:
+        cache.store(key, df, outliers_dict)
 
     return df, outliers_dict, clean_text_column
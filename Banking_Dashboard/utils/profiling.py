@@ -0,0 +1,267 @@
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+import pandas as pd
+import psutil
+
+# Opt-in: BANKING_PROFILE=1 records stages; otherwise every hook is a no-op
+PROFILE_ENABLED = os.environ.get("BANKING_PROFILE", "0") != "0"
+# When set, every finished stage is appended here as one line of a Chrome trace (chrome://tracing,
+# Perfetto); the JSON array format lets both read the file without its closing bracket
+TRACE_FILE = os.environ.get("BANKING_TRACE_FILE")
+MAX_EVENTS = int(os.environ.get("BANKING_PROFILE_EVENTS", "5000"))
+RSS_INTERVAL = 0.005
+
+_PROCESS = psutil.Process()
+_ids = itertools.count(1)
+_events = deque(maxlen=MAX_EVENTS)
+_events_lock = threading.Lock()
+_listeners = []
+_local = threading.local()
+_trace_lock = threading.Lock()
+
+
+@dataclass
+class Event:
+    """
+    One timed stage. CPU time is process-wide (it includes pyarrow's reader threads);
+    rss_delta_mb is the peak RSS growth while the stage ran; frame sizes are shallow
+    (object columns count their pointers, not the strings).
+    """
+    id: int
+    name: str
+    category: str
+    start: float
+    parent: Optional[int] = None
+    thread: int = 0
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    rss_delta_mb: float = 0.0
+    rows_in: Optional[int] = None
+    cols_in: Optional[int] = None
+    mb_in: Optional[float] = None
+    rows_out: Optional[int] = None
+    cols_out: Optional[int] = None
+    mb_out: Optional[float] = None
+    attrs: dict = field(default_factory=dict)
+
+    def _frame(self, frame, prefix):
+        if isinstance(frame, pd.DataFrame):
+            setattr(self, f"rows_{prefix}", len(frame))
+            setattr(self, f"cols_{prefix}", frame.shape[1])
+            setattr(self, f"mb_{prefix}", float(frame.memory_usage(index=False).sum()) / 1024**2)
+
+    def input(self, frame):
+        self._frame(frame, "in")
+
+    def output(self, frame):
+        self._frame(frame, "out")
+
+    def to_dict(self):
+        return asdict(self)
+
+
+# ------------------- RSS Sampler -------------------
+# One background thread samples RSS while any stage is open and raises each open stage's peak
+_active = {}
+_active_lock = threading.Lock()
+_wake = threading.Event()
+_sampler = None
+
+
+def _sample_rss():
+    while True:
+        _wake.wait()
+        while True:
+            rss = _PROCESS.memory_info().rss
+            with _active_lock:
+                if not _active:
+                    _wake.clear()
+                    break
+                for peak in _active.values():
+                    peak[0] = max(peak[0], rss)
+            time.sleep(RSS_INTERVAL)
+
+
+def _track(event_id, rss):
+    global _sampler
+    with _active_lock:
+        _active[event_id] = peak = [rss]
+        if _sampler is None:
+            _sampler = threading.Thread(target=_sample_rss, name="rss-sampler", daemon=True)
+            _sampler.start()
+    _wake.set()
+    return peak
+
+
+def _untrack(event_id):
+    with _active_lock:
+        return _active.pop(event_id)[0]
+
+
+# ------------------- Hooks -------------------
+class stage:
+    """
+    Context manager timing one stage; nested stages on the same thread become children.
+
+        with stage("treat_nulls", "pipeline", frame=df) as ev:
+            out = treat_nulls(df)
+            ev.output(out)
+    """
+
+    def __init__(self, name, category="app", frame=None, **attrs):
+        self.name = name
+        self.category = category
+        self.frame = frame
+        self.attrs = attrs
+        self.event = None
+
+    def __enter__(self):
+        if not PROFILE_ENABLED:
+            self.event = Event(0, self.name, self.category, time.time())
+            return self.event
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        ev = self.event = Event(
+            next(_ids), self.name, self.category, time.time(),
+            parent=stack[-1].id if stack else None, thread=threading.get_ident(), attrs=self.attrs,
+        )
+        ev.input(self.frame)
+        stack.append(ev)
+        self._rss0 = _PROCESS.memory_info().rss
+        _track(ev.id, self._rss0)
+        self._t0, self._c0 = time.perf_counter(), time.process_time()
+        return ev
+
+    def __exit__(self, exc_type, exc, tb):
+        if not PROFILE_ENABLED:
+            return False
+        ev = self.event
+        ev.wall_s = time.perf_counter() - self._t0
+        ev.cpu_s = time.process_time() - self._c0
+        peak = max(_untrack(ev.id), _PROCESS.memory_info().rss)
+        ev.rss_delta_mb = (peak - self._rss0) / 1024**2
+        if exc_type is not None:
+            ev.attrs["error"] = exc_type.__name__
+        _local.stack.pop()
+        _publish(ev)
+        return False
+
+
+def profiled(name=None, category="pipeline"):
+    """Decorator form of stage(): the first DataFrame argument and a DataFrame result are sized."""
+    def wrap(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            frame = next((a for a in args if isinstance(a, pd.DataFrame)), None)
+            with stage(label, category, frame=frame) as ev:
+                result = fn(*args, **kwargs)
+                ev.output(result[0] if isinstance(result, tuple) and result else result)
+                return result
+        return inner
+    return wrap
+
+
+def _publish(ev):
+    with _events_lock:
+        _events.append(ev)
+        listeners = list(_listeners)
+    for listener in listeners:
+        listener(ev)
+    if TRACE_FILE:
+        _append_trace(ev)
+
+
+# ------------------- Event API -------------------
+def add_listener(callback):
+    """Call callback(event) for every finished stage. Returns a function that removes it."""
+    with _events_lock:
+        _listeners.append(callback)
+
+    def remove():
+        with _events_lock:
+            if callback in _listeners:
+                _listeners.remove(callback)
+    return remove
+
+
+def events(name=None, category=None, since=None):
+    """Finished stages, oldest first, optionally filtered by name, category and start time."""
+    with _events_lock:
+        found = list(_events)
+    return [e for e in found
+            if (name is None or e.name == name)
+            and (category is None or e.category == category)
+            and (since is None or e.start >= since)]
+
+
+def events_frame(**filters):
+    """events() as a DataFrame, one row per stage."""
+    return pd.DataFrame([e.to_dict() for e in events(**filters)], columns=list(Event.__dataclass_fields__))
+
+
+def last_run(name):
+    """The latest stage called name followed by all stages nested in it."""
+    found = events()
+    roots = [e for e in found if e.name == name]
+    if not roots:
+        return []
+    ids, run = {roots[-1].id}, []
+    # Children finish (and are stored) before their parent
+    for e in reversed(found):
+        if e.id in ids or e.parent in ids:
+            ids.add(e.id)
+            run.append(e)
+    return sorted(run, key=lambda e: e.start)
+
+
+def clear():
+    with _events_lock:
+        _events.clear()
+
+
+def _trace_event(e, pid):
+    args = {k: v for k, v in e.to_dict().items()
+            if k not in ("name", "category", "start", "wall_s", "thread", "attrs") and v is not None}
+    args.update({k: str(v) for k, v in e.attrs.items()})
+    return {"name": e.name, "cat": e.category, "ph": "X", "ts": e.start * 1e6,
+            "dur": e.wall_s * 1e6, "pid": pid, "tid": e.thread, "args": args}
+
+
+def chrome_trace(found=None):
+    """Trace Event Format dict ("X" complete events, microseconds) for chrome://tracing or Perfetto."""
+    found = events() if found is None else found
+    pid = os.getpid()
+    return {"traceEvents": [_trace_event(e, pid) for e in found], "displayTimeUnit": "ms"}
+
+
+def _append_trace(ev):
+    # One event per line, so each stage costs one small write however long the history is
+    line = json.dumps(_trace_event(ev, os.getpid()))
+    with _trace_lock:
+        try:
+            with open(TRACE_FILE, "a") as fh:
+                if fh.tell() == 0:
+                    fh.write("[\n")
+                fh.write(line + ",\n")
+        except OSError as e:
+            print(f"Could not write trace {TRACE_FILE}: {e}")
+
+
+def write_chrome_trace(path):
+    """Write the recorded history as one trace file (on demand; TRACE_FILE is appended to as stages finish)."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as fh:
+        json.dump(chrome_trace(), fh)
+    os.replace(tmp, path)
+    return path
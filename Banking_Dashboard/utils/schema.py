@@ -0,0 +1,114 @@
+import hashlib
+import json
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+
+from utils.cache import CACHE_DIR
+
+SCHEMA_DIR = CACHE_DIR.parent / "schema"
+SAMPLE_ROWS = 50_000
+CATEGORY_MAX_UNIQUE = 50
+
+_ARROW_TYPES = {
+    "int8": pa.int8(), "int16": pa.int16(), "int32": pa.int32(), "int64": pa.int64(),
+    "float32": pa.float32(), "float64": pa.float64(), "bool": pa.bool_(),
+    "object": pa.string(), "category": pa.dictionary(pa.int32(), pa.string()),
+}
+
+
+# ------------------- Inference -------------------
+def infer_dtypes(frame):
+    """
+    Dtype map for a sample of the file: smallest int that fits, float32 for floats
+    (optimize_dataframe still probes float16 afterwards) and category for text
+    columns with at most CATEGORY_MAX_UNIQUE distinct values.
+    """
+    dtypes = {}
+    for col in frame.columns:
+        s = frame[col]
+        if pd.api.types.is_bool_dtype(s):
+            dtypes[col] = "bool"
+        elif pd.api.types.is_integer_dtype(s):
+            lo, hi = s.min(), s.max()
+            dtypes[col] = next((dt for dt in ("int8", "int16", "int32")
+                                if lo >= np.iinfo(dt).min and hi <= np.iinfo(dt).max), "int64")
+        elif pd.api.types.is_float_dtype(s):
+            dtypes[col] = "float32"
+        else:
+            n_unique = s.nunique(dropna=True)
+            dtypes[col] = "category" if n_unique <= CATEGORY_MAX_UNIQUE and n_unique <= len(s) // 2 else "object"
+    return dtypes
+
+
+# ------------------- Persistence -------------------
+def _schema_path(columns):
+    digest = hashlib.blake2b("\x1f".join(columns).encode(), digest_size=16).hexdigest()
+    return SCHEMA_DIR / f"{digest}.json"
+
+
+def load_schema(columns):
+    try:
+        with open(_schema_path(columns)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_schema(columns, dtypes):
+    path = _schema_path(columns)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(dtypes, f, indent=1)
+    except OSError as e:
+        print(f"Could not save schema: {e}")
+
+
+# ------------------- Typed Load -------------------
+def _rewind(source):
+    if hasattr(source, "seek"):
+        source.seek(0)
+
+
+def read_typed_csv(source, usecols=None):
+    """
+    Load a CSV straight into narrow dtypes using the persisted dtype map for its header
+    (inferred from the first SAMPLE_ROWS rows on first sight), so the int64/float64/object
+    frame is never built. Files with the same columns share one map.
+    With `usecols`, only those columns (in file order) are parsed, and the map only needs
+    entries for them; missing entries are inferred and added.
+    Falls back to a plain read when the map doesn't fit the data, and re-learns the map
+    from that full read. Returns None only if the file can't be read at all.
+    """
+    try:
+        columns = list(pd.read_csv(source, nrows=0).columns)
+        _rewind(source)
+        read_cols = columns if usecols is None else [c for c in columns if c in set(usecols)]
+        dtypes = load_schema(columns) or {}
+        missing = [c for c in read_cols if c not in dtypes]
+        if missing:
+            dtypes.update(infer_dtypes(pd.read_csv(source, nrows=SAMPLE_ROWS, usecols=missing)))
+            _rewind(source)
+            save_schema(columns, dtypes)
+    except (OSError, ValueError):
+        _rewind(source)
+        return None
+
+    column_types = {c: _ARROW_TYPES[dtypes[c]] for c in read_cols}
+    try:
+        table = pacsv.read_csv(
+            source,
+            convert_options=pacsv.ConvertOptions(
+                column_types=column_types, include_columns=read_cols, strings_can_be_null=True,
+            ),
+        )
+        return table.to_pandas(split_blocks=True, self_destruct=True)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        _rewind(source)
+        frame = pd.read_csv(source, usecols=read_cols)
+        relearned = infer_dtypes(frame)
+        save_schema(columns, {**dtypes, **relearned})
+        return frame.astype({c: dt for c, dt in relearned.items() if dt == "category"})
@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils.outliers import OutlierMasks
+from utils.preprocessing import engineer_features
+from utils.schema import _rewind
+from utils.sketches import DEFAULT_K, KLLSketch
+
+NULL_DROP_THRESHOLD = 0.6
+
+
+# ------------------- Pass 1: Column Statistics -------------------
+def scan_csv(source, chunksize=100_000, k=DEFAULT_K):
+    """
+    First pass over a CSV, one chunk in memory at a time.
+    Returns per-column stats: kind, min/max, null count, float16 fit,
+    category counts for text columns and a KLL quantile sketch of numeric columns
+    (used for approximate medians and quartiles; see utils/sketches.py).
+    """
+    _rewind(source)
+    stats = {}
+    n_rows = 0
+
+    for chunk in pd.read_csv(source, chunksize=chunksize):
+        n_rows += len(chunk)
+        for col in chunk.columns:
+            s = chunk[col]
+            st = stats.setdefault(col, {"kind": "int", "min": np.inf, "max": -np.inf,
+                                        "nulls": 0, "fits_f16": True, "counts": None, "sketch": KLLSketch(k)})
+            st["nulls"] += int(s.isna().sum())
+            if pd.api.types.is_bool_dtype(s):
+                st["kind"] = "bool" if st["kind"] in ("int", "bool") else st["kind"]
+            elif pd.api.types.is_numeric_dtype(s) and st["kind"] != "object":
+                if pd.api.types.is_float_dtype(s):
+                    st["kind"] = "float"
+                s64 = s.astype("float64")
+                if s64.notna().any():
+                    st["min"] = min(st["min"], s64.min())
+                    st["max"] = max(st["max"], s64.max())
+                if st["fits_f16"]:
+                    st["fits_f16"] = np.allclose(s64, s64.astype("float16"), rtol=1e-03, atol=1e-06, equal_nan=True)
+                st["sketch"].update(s64.to_numpy())
+            else:
+                st["kind"] = "object"
+                vc = s.value_counts(dropna=True)
+                st["counts"] = vc if st["counts"] is None else st["counts"].add(vc, fill_value=0)
+
+    return {"n_rows": n_rows, "columns": stats}
+
+
+# ------------------- Plan: dtypes, drops, fills, fences -------------------
+def _int_dtype(lo, hi):
+    for dt in ("int8", "int16", "int32"):
+        if lo >= np.iinfo(dt).min and hi <= np.iinfo(dt).max:
+            return dt
+    return "int64"
+
+
+def build_plan(scan):
+    """Turn scan stats into the same decisions optimize_dataframe/treat_nulls/find_outliers_iqr make."""
+    n_rows = max(scan["n_rows"], 1)
+    read_dtypes, cast, fills, drop = {}, {}, {}, []
+
+    for col, st in scan["columns"].items():
+        if st["nulls"] / n_rows > NULL_DROP_THRESHOLD:
+            drop.append(col)
+            continue
+        if st["kind"] == "int":
+            read_dtypes[col] = "int64"
+            cast[col] = _int_dtype(st["min"], st["max"])
+        elif st["kind"] == "float":
+            read_dtypes[col] = "float64"
+            cast[col] = "float16" if st["fits_f16"] else "float32"
+        elif st["kind"] == "object":
+            read_dtypes[col] = "object"
+
+    # Approximate medians/quartiles come from each column's sketch; the quartiles see the
+    # nulls as copies of the (cast) median, like the imputed in-memory column
+    quartiles = {}
+    for col in cast:
+        st = scan["columns"][col]
+        median = np.asarray(st["sketch"].median()).astype(cast[col]).item()
+        if st["nulls"]:
+            fills[col] = median
+        quartiles[col] = st["sketch"].copy().update_repeated(median, st["nulls"]).quantile([0.25, 0.75])
+
+    for col, st in scan["columns"].items():
+        if col in drop or st["kind"] != "object" or not st["nulls"]:
+            continue
+        counts = st["counts"]
+        fills[col] = counts.idxmax() if counts is not None and not counts.empty else ""
+
+    q = pd.DataFrame(quartiles, index=[0.25, 0.75])
+    iqr = q.loc[0.75] - q.loc[0.25]
+    fences = pd.DataFrame({"lower": q.loc[0.25] - 1.5 * iqr, "upper": q.loc[0.75] + 1.5 * iqr})
+
+    return {"read_dtypes": read_dtypes, "cast": cast, "fills": fills, "drop": drop, "fences": fences}
+
+
+# ------------------- Pass 2: Transform and Write -------------------
+def preprocess_streaming(source, sink, chunksize=100_000, k=DEFAULT_K):
+    """
+    Out-of-core variant of preprocess_data for CSVs larger than RAM.
+    Pass 1 gathers column stats, pass 2 downcasts, imputes and engineers
+    features chunk by chunk and appends to a Parquet file at `sink`.
+    Medians and IQR fences are estimated from per-column KLL sketches of size ~k.
+    Returns:
+        outliers_dict: utils.outliers.OutlierMasks (read-only column -> row positions
+        mapping), as preprocess_data returns
+    """
+    plan = build_plan(scan_csv(source, chunksize, k))
+    fences = plan["fences"]
+    found = {col: [] for col in fences.index}
+
+    _rewind(source)
+    writer = None
+    n_rows = 0
+    try:
+        reader = pd.read_csv(source, chunksize=chunksize, dtype=plan["read_dtypes"],
+                             usecols=lambda c: c not in plan["drop"])
+        for chunk in reader:
+            n_rows += len(chunk)
+            chunk = chunk.astype(plan["cast"])
+            chunk = chunk.fillna({c: v for c, v in plan["fills"].items() if c in chunk.columns})
+
+            for col, (lower, upper) in fences.iterrows():
+                mask = (chunk[col] < lower) | (chunk[col] > upper)
+                found[col].append(chunk.index[mask.to_numpy()].to_numpy().astype(np.int32))
+
+            chunk = engineer_features(chunk)
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(sink, table.schema)
+            writer.write_table(table.cast(writer.schema))
+    finally:
+        if writer is not None:
+            writer.close()
+
+    # Row positions are only kept per chunk; each column's bitmap is packed once at the end
+    bits = np.zeros((len(found), (n_rows + 7) // 8), dtype=np.uint8)
+    counts = np.zeros(len(found), dtype=np.int64)
+    for i, parts in enumerate(found.values()):
+        mask = np.zeros(n_rows, dtype=bool)
+        for rows in parts:
+            mask[rows] = True
+        counts[i] = np.count_nonzero(mask)
+        bits[i] = np.packbits(mask)
+    return OutlierMasks(list(found), bits, n_rows, counts, fences=fences)
@@ -1,20 +1,20 @@
-import pandas as pd
-import glob
-import json
+import sys
 
-files = glob.glob(r"D:\DATA SCIENCE\Exception_Handling\json_files\*.json")
+from tickets import JSON_DIR, load_tickets, ticket_files
+from ticket_store import TicketStore
 
-dfs = []
-for f in files:
-    with open(f, "r") as json_file:
-        data = json.load(json_file)  
-        try:
-            df = pd.DataFrame(data)   
-        except ValueError:
-            df = pd.json_normalize(data) 
-
-        dfs.append(df)
-
-final_df = pd.concat(dfs, ignore_index=True)
+# Default: incremental mode (ticket_store.py) — only new or changed files are parsed and
+# appended to a Parquet store partitioned by created month; `--full` re-reads every file.
+if "--full" in sys.argv:
+    # Files are read concurrently and flattened against a fixed schema in one pass (tickets.py),
+    # instead of json.load + DataFrame/json_normalize + concat per file
+    files = ticket_files(JSON_DIR)
+    final_df = load_tickets(files)
+else:
+    store = TicketStore(source_dir=JSON_DIR)
+    stats = store.sync()
+    print(f"Ticket store: {stats['files']} files, {stats['parsed']} parsed, "
+          f"{stats['tickets']} tickets added, {stats['deleted']} deleted")
+    final_df = store.load()
 
 print(final_df)
@@ -0,0 +1,249 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from tickets import JSON_DIR, TICKET_SCHEMA, _fit_schema, tickets_frame
+
+STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "tickets")
+# A month partition with more part files than this is merged into one file after a sync
+COMPACT_MAX_FILES = 8
+
+_MANIFEST = "manifest.parquet"
+# The frame load() last built, with the store version it was built from
+_SNAPSHOT = "snapshot.parquet"
+_MANIFEST_COLUMNS = ["path", "size", "mtime_ns", "hash", "batch", "tickets"]
+
+
+def _hash_bytes(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _read_changed(full_path, known_hash):
+    """Worker: (hash, records). records is None when the content hash is unchanged (e.g. only touched)."""
+    try:
+        with open(full_path, "rb") as f:
+            data = f.read()
+        digest = _hash_bytes(data)
+        if digest == known_hash:
+            return digest, None
+        parsed = json.loads(data)
+        return digest, parsed if isinstance(parsed, list) else [parsed]
+    except (OSError, ValueError) as e:
+        print(f"Skipping {full_path}: {e}")
+        return None, []
+
+
+class TicketStore:
+    """
+    Incremental copy of a ticket folder as Parquet, partitioned by created month.
+
+    The manifest records (path, size, mtime, content hash) per source file plus the batch
+    its tickets were written in; only files whose size/mtime changed are re-read, and only
+    those whose hash changed are parsed. Every stored row carries its source file and batch,
+    so rows from older versions of a changed (or deleted) file are filtered on load and
+    dropped by compaction. The manifest and the list of live part files are replaced
+    atomically together, so an interrupted sync or compaction leaves the store readable.
+    Every sync that changes something and every compaction moves to a new batch number,
+    which versions the store: load() keeps the frame it built for a version (in memory
+    and as a snapshot file) and returns it until the version changes.
+    """
+
+    def __init__(self, root=STORE_DIR, source_dir=JSON_DIR):
+        self.root = root
+        self.source_dir = source_dir
+        self.manifest, self.parts, self.next_batch = self._read_manifest()
+        self._frame, self._frame_version = None, None
+
+    # ------------------- Manifest -------------------
+    def _read_manifest(self):
+        path = os.path.join(self.root, _MANIFEST)
+        try:
+            table = pq.read_table(path)
+        except (OSError, pa.ArrowInvalid):
+            return pd.DataFrame({c: pd.Series(dtype="int64" if c in ("size", "mtime_ns", "batch", "tickets") else "object")
+                                 for c in _MANIFEST_COLUMNS}), [], 1
+        meta = json.loads(table.schema.metadata[b"ticket_store"])
+        return table.to_pandas(), meta["parts"], meta["next_batch"]
+
+    @property
+    def version(self):
+        return self.next_batch
+
+    def _write_manifest(self):
+        table = pa.Table.from_pandas(self.manifest[_MANIFEST_COLUMNS], preserve_index=False)
+        meta = json.dumps({"parts": self.parts, "next_batch": self.next_batch}).encode()
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), b"ticket_store": meta})
+        os.makedirs(self.root, exist_ok=True)
+        tmp = os.path.join(self.root, f".{_MANIFEST}.{os.getpid()}.tmp")
+        pq.write_table(table, tmp)
+        os.replace(tmp, os.path.join(self.root, _MANIFEST))
+
+    # ------------------- Sync -------------------
+    def _scan(self):
+        rows = []
+        with os.scandir(self.source_dir) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith(".json"):
+                    st = entry.stat()
+                    rows.append((entry.name, st.st_size, st.st_mtime_ns))
+        return pd.DataFrame(rows, columns=["path", "size", "mtime_ns"])
+
+    def sync(self, max_workers=None):
+        """Bring the store up to date with the source folder. Returns counts of what changed."""
+        scanned = self._scan()
+        merged = scanned.merge(self.manifest, on="path", how="left", suffixes=("", "_old"))
+        candidates = merged[(merged["size"] != merged["size_old"]) | (merged["mtime_ns"] != merged["mtime_ns_old"])]
+        deleted = self.manifest[~self.manifest["path"].isin(scanned["path"])]
+        stats = {"files": len(scanned), "read": len(candidates), "parsed": 0, "tickets": 0, "deleted": len(deleted)}
+        if candidates.empty and deleted.empty:
+            return stats
+
+        paths = [os.path.join(self.source_dir, p) for p in candidates["path"]]
+        known = candidates["hash"].where(candidates["hash"].notna(), None).tolist()
+        with ThreadPoolExecutor(max_workers or min(32, (os.cpu_count() or 1) + 4)) as pool:
+            results = list(pool.map(_read_changed, paths, known))
+
+        batch = self.next_batch
+        records, sources, updates = [], [], []
+        for row, (digest, parsed) in zip(candidates.itertuples(index=False), results):
+            if digest is None:  # unreadable: left out of the manifest, so retried next sync
+                continue
+            if parsed is None:  # same bytes, new stat: keep the stored rows
+                updates.append((row.path, row.size, row.mtime_ns, digest, int(row.batch), int(row.tickets)))
+                continue
+            records.extend(parsed)
+            sources.extend([row.path] * len(parsed))
+            updates.append((row.path, row.size, row.mtime_ns, digest, batch, len(parsed)))
+            stats["parsed"] += 1
+        kept = self.manifest[self.manifest["path"].isin(scanned["path"]) & ~self.manifest["path"].isin(candidates["path"])]
+        self.manifest = pd.concat([kept, pd.DataFrame(updates, columns=_MANIFEST_COLUMNS)], ignore_index=True).astype(
+            {"size": "int64", "mtime_ns": "int64", "batch": "int64", "tickets": "int64"})
+
+        if records:
+            self.parts.extend(self._write_batch(records, sources, batch))
+            stats["tickets"] = len(records)
+        self.next_batch = batch + 1
+        self._write_manifest()
+        if self._needs_compaction():
+            self.compact()
+        return stats
+
+    def _write_batch(self, records, sources, batch):
+        try:
+            table = pa.Table.from_pylist(records, schema=TICKET_SCHEMA)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            records, sources = _fit_schema(records, sources)
+            table = pa.Table.from_pylist(records, schema=TICKET_SCHEMA)
+        table = table.append_column("_source", pa.array(sources, pa.string()).dictionary_encode())
+        table = table.append_column("_batch", pa.array([batch] * table.num_rows, pa.int64()))
+        months = pc.fill_null(pc.utf8_slice_codeunits(table["created_date"], 0, 7), "unknown")
+        written = []
+        for month in pc.unique(months).to_pylist():
+            rel = os.path.join(f"created_month={month}", f"part-{batch:08d}.parquet")
+            os.makedirs(os.path.join(self.root, os.path.dirname(rel)), exist_ok=True)
+            pq.write_table(table.filter(pc.equal(months, month)), os.path.join(self.root, rel))
+            written.append(rel)
+        return written
+
+    # ------------------- Load -------------------
+    def _valid(self, table):
+        """Rows whose (source, batch) is the manifest's current version of that file."""
+        current = pa.array(self.manifest["path"].tolist(), pa.string())
+        batches = pa.array(self.manifest["batch"].tolist(), pa.int64())
+        idx = pc.index_in(pc.cast(table["_source"], pa.string()), value_set=current)
+        return table.filter(pc.equal(table["_batch"], pc.take(batches, idx)))
+
+    def _read_parts(self, parts):
+        tables = [pq.read_table(os.path.join(self.root, p), partitioning=None) for p in parts]
+        return pa.concat_tables(tables, promote_options="default") if tables else None
+
+    def _read_snapshot(self):
+        try:
+            table = pq.read_table(os.path.join(self.root, _SNAPSHOT))
+        except (OSError, pa.ArrowInvalid):
+            return None
+        meta = json.loads((table.schema.metadata or {}).get(b"ticket_store", b"{}"))
+        return table.to_pandas() if meta.get("version") == self.version else None
+
+    def _write_snapshot(self, df):
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        meta = json.dumps({"version": self.version}).encode()
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), b"ticket_store": meta})
+        os.makedirs(self.root, exist_ok=True)
+        tmp = os.path.join(self.root, f".{_SNAPSHOT}.{os.getpid()}.tmp")
+        pq.write_table(table, tmp)
+        os.replace(tmp, os.path.join(self.root, _SNAPSHOT))
+
+    def _build(self):
+        table = self._read_parts(self.parts)
+        if table is None:
+            return tickets_frame(TICKET_SCHEMA.empty_table())
+        return tickets_frame(self._valid(table).drop_columns(["_source", "_batch"]))
+
+    def load(self):
+        """
+        Current tickets as tickets.tickets_frame() builds them. While the store version is
+        unchanged (sync found nothing new, changed or deleted) the frame built for it is
+        returned, from memory or from the snapshot file, instead of re-reading every part.
+        """
+        if self._frame_version != self.version:
+            df = self._read_snapshot()
+            if df is None:
+                df = self._build()
+                try:
+                    # An empty frame is cheap to build, and Parquet would not keep its category dtypes
+                    if not df.empty:
+                        self._write_snapshot(df)
+                except (OSError, pa.ArrowException) as e:
+                    print(f"Skipping ticket snapshot: {e}")
+            self._frame, self._frame_version = df, self.version
+        return self._frame.copy()
+
+    # ------------------- Compaction -------------------
+    def _partitions(self):
+        groups = {}
+        for rel in self.parts:
+            groups.setdefault(os.path.dirname(rel), []).append(rel)
+        return groups
+
+    def _needs_compaction(self):
+        return any(len(files) > COMPACT_MAX_FILES for files in self._partitions().values())
+
+    def compact(self, force=False):
+        """Merge each month's part files (all months if force) into one, dropping stale rows."""
+        old_parts = list(self.parts)
+        new_parts = []
+        for month, files in self._partitions().items():
+            if not force and len(files) <= COMPACT_MAX_FILES:
+                new_parts.extend(files)
+                continue
+            table = self._valid(self._read_parts(files))
+            if table.num_rows == 0:
+                continue
+            rel = os.path.join(month, f"part-{self.next_batch:08d}-c.parquet")
+            pq.write_table(table, os.path.join(self.root, rel))
+            new_parts.append(rel)
+        self.next_batch += 1
+        self.parts = new_parts
+        self._write_manifest()
+        # Only now are the replaced files unreferenced; leftovers of interrupted runs go too
+        live = set(new_parts)
+        for rel in old_parts:
+            if rel not in live:
+                try:
+                    os.remove(os.path.join(self.root, rel))
+                except OSError:
+                    pass
+
+
+def load_tickets_incremental(source_dir=JSON_DIR, root=STORE_DIR, max_workers=None):
+    """Sync the store with source_dir, then return every current ticket."""
+    store = TicketStore(root, source_dir)
+    store.sync(max_workers)
+    return store.load()
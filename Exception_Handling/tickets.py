@@ -0,0 +1,109 @@
+import glob
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+JSON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "json_files")
+
+# Fixed ticket schema: keys outside it are ignored, missing keys become nulls
+TICKET_SCHEMA = pa.schema([
+    ("ticket_id", pa.string()),
+    ("priority", pa.string()),
+    ("category", pa.string()),
+    ("status", pa.string()),
+    ("created_date", pa.string()),
+    ("resolved_date", pa.string()),
+    ("assigned_to", pa.string()),
+    ("subject", pa.string()),
+    ("description", pa.string()),
+    ("resolution", pa.string()),
+    ("resolution_steps", pa.list_(pa.string())),
+    ("time_spent_minutes", pa.int32()),
+    ("tags", pa.list_(pa.string())),
+    ("impact", pa.string()),
+    ("root_cause", pa.string()),
+    ("prevention_measures", pa.string()),
+    ("user", pa.struct([("name", pa.string()), ("department", pa.string()), ("email", pa.string())])),
+])
+CATEGORICAL = ["priority", "category", "status"]
+DATES = ["created_date", "resolved_date"]
+
+
+# ------------------- Read -------------------
+def ticket_files(folder=JSON_DIR):
+    return sorted(glob.glob(os.path.join(folder, "*.json")))
+
+
+def read_tickets(path):
+    """Ticket records in one file (a single ticket object or a list of them)."""
+    with open(path, "r") as json_file:
+        data = json.load(json_file)
+    return data if isinstance(data, list) else [data]
+
+
+def _read_all(files, max_workers):
+    records, sources = [], []
+    with ThreadPoolExecutor(max_workers) as pool:
+        for path, result in zip(files, pool.map(_safe_read, files)):
+            records.extend(result)
+            sources.extend([path] * len(result))
+    return records, sources
+
+
+def _safe_read(path):
+    try:
+        return read_tickets(path)
+    except (OSError, ValueError) as e:
+        print(f"Skipping {path}: {e}")
+        return []
+
+
+def _fit_schema(records, sources):
+    """(records, sources) that fit TICKET_SCHEMA; the rest are reported and dropped."""
+    good, good_sources = [], []
+    for record, path in zip(records, sources):
+        try:
+            pa.Table.from_pylist([record], schema=TICKET_SCHEMA)
+            good.append(record)
+            good_sources.append(path)
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            print(f"Skipping ticket in {path}: {e}")
+    return good, good_sources
+
+
+def _to_table(records, sources):
+    """Arrow table of records under TICKET_SCHEMA; records that don't fit it are reported and dropped."""
+    try:
+        return pa.Table.from_pylist(records, schema=TICKET_SCHEMA)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.Table.from_pylist(_fit_schema(records, sources)[0], schema=TICKET_SCHEMA)
+
+
+# ------------------- Flatten -------------------
+def tickets_frame(table):
+    """
+    One row per ticket: `user` flattened to user.name / user.department / user.email
+    (json_normalize's names), resolution_step_count added, categorical priority /
+    category / status and UTC timestamps for the dates.
+    """
+    table = table.append_column("resolution_step_count", pc.list_value_length(table["resolution_steps"]))
+    for col in CATEGORICAL:
+        table = table.set_column(table.schema.get_field_index(col), col, pc.dictionary_encode(table[col]))
+    df = table.flatten().to_pandas(types_mapper={pa.int32(): pd.Int32Dtype()}.get)
+    for col in DATES:
+        df[col] = pd.to_datetime(df[col], utc=True, format="ISO8601")
+    return df
+
+
+def load_tickets(files=None, max_workers=None):
+    """
+    Read every ticket file concurrently (thread pool), then build a single frame
+    against TICKET_SCHEMA in one pass instead of one small frame per file.
+    """
+    files = ticket_files() if files is None else files
+    records, sources = _read_all(files, max_workers or min(32, (os.cpu_count() or 1) + 4))
+    return tickets_frame(_to_table(records, sources))
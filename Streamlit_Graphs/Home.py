@@ -104,15 +104,25 @@
 import streamlit as st
 import pandas as pd
 import altair as alt
+from source_cache import load_excel
+from filter_index import FilterIndex
+from chart_data import aggregate, stratified_sample
 
 # ---------------- Load Data ----------------
-@st.cache_data
+# The workbook is converted once to a typed, memory-mapped Feather file (source_cache.py)
+# that survives restarts; it is rebuilt when the .xls changes (mtime / content hash).
+# cache_resource keeps the memory-mapped frame itself: cache_data would pickle a copy per rerun
+@st.cache_resource
 def load_data():
-    df = pd.read_excel("Sample - Superstore (2).xls")
-    df["Order Date"] = pd.to_datetime(df["Order Date"])
-    return df
+    return load_excel("Sample - Superstore (2).xls")
 
-df = load_data()
+# Rows sorted by Order Date + per-Region/Category bitmaps (filter_index.py), built once per process
+@st.cache_resource
+def load_index():
+    return FilterIndex(load_data(), "Order Date", ["Region", "Category"])
+
+index = load_index()
+df = index.df
 
 st.title("📊 Superstore Sales Dashboard with Inline Filters")
 
@@ -124,15 +134,15 @@ fcol1, fcol2, fcol3 = st.columns([1, 1, 2])
 with fcol1:
     region_filter = st.multiselect(
         "Select Region",
-        options=df["Region"].unique(),
-        default=df["Region"].unique()
+        options=index.options["Region"],
+        default=index.options["Region"]
     )
 
 with fcol2:
     category_filter = st.multiselect(
         "Select Category",
-        options=df["Category"].unique(),
-        default=df["Category"].unique()
+        options=index.options["Category"],
+        default=index.options["Category"]
     )
 
 with fcol3:
@@ -145,11 +155,7 @@ with fcol3:
 start_date = pd.to_datetime(date_range[0])
 end_date = pd.to_datetime(date_range[1])
 
-df_filtered = df[
-    (df["Region"].isin(region_filter)) &
-    (df["Category"].isin(category_filter)) &
-    (df["Order Date"].between(start_date, end_date))
-]
+df_filtered = index.filter({"Region": region_filter, "Category": category_filter}, start_date, end_date)
 
 st.write(f"### 📑 Filtered Data ({len(df_filtered)} rows)")
 st.dataframe(df_filtered.head())
@@ -169,6 +175,8 @@ with kpi3:
     st.metric("Total Orders", f"{df_filtered['Order ID'].nunique():,}")
 
 # ---------------- Charts ----------------
+# Encodings are evaluated server-side (chart_data.py): charts receive one row per group,
+# and the scatter a capped sample stratified by Sub-Category, instead of every order
 
 st.markdown("### 📊 Visualizations")
 
@@ -177,25 +185,20 @@ col1, col2 = st.columns(2)
 
 with col1:
     st.subheader("Sales by Category")
-    cat_chart = alt.Chart(df_filtered).mark_bar().encode(
-        x="Category",
-        y="sum(Sales)",
-        color="Category"
-    )
+    cat_data, cat_enc = aggregate(df_filtered, x="Category", y="sum(Sales)", color="Category")
+    cat_chart = alt.Chart(cat_data).mark_bar().encode(**cat_enc)
     st.altair_chart(cat_chart, use_container_width=True)
 
 with col2:
     st.subheader("Sales by Region")
-    region_chart = alt.Chart(df_filtered).mark_bar().encode(
-        x="Region",
-        y="sum(Sales)",
-        color="Region"
-    )
+    region_data, region_enc = aggregate(df_filtered, x="Region", y="sum(Sales)", color="Region")
+    region_chart = alt.Chart(region_data).mark_bar().encode(**region_enc)
     st.altair_chart(region_chart, use_container_width=True)
 
 # Profit vs Sales Scatter
 st.subheader("Profit vs Sales (by Sub-Category)")
-scatter = alt.Chart(df_filtered).mark_circle(size=60).encode(
+scatter_data = stratified_sample(df_filtered[["Sub-Category", "Sales", "Profit"]], "Sub-Category")
+scatter = alt.Chart(scatter_data).mark_circle(size=60).encode(
     x="Sales",
     y="Profit",
     color="Sub-Category",
@@ -205,9 +208,6 @@ st.altair_chart(scatter, use_container_width=True)
 
 # Sales Over Time
 st.subheader("Sales Over Time")
-time_chart = alt.Chart(df_filtered).mark_line().encode(
-    x="yearmonth(Order Date)",
-    y="sum(Sales)",
-    color="Region"
-)
+time_data, time_enc = aggregate(df_filtered, x="yearmonth(Order Date)", y="sum(Sales)", color="Region")
+time_chart = alt.Chart(time_data).mark_line().encode(**time_enc)
 st.altair_chart(time_chart, use_container_width=True)
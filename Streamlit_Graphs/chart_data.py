@@ -0,0 +1,72 @@
+import re
+
+import altair as alt
+import pandas as pd
+
+# Raw points are only shipped to a chart below this many rows; above it they are sampled
+MAX_POINTS = 5_000
+
+AGGREGATES = {"sum": "Sum of", "mean": "Mean of", "count": "Count of"}
+# Vega-Lite time unit -> pandas period the rows are floored to
+TIME_UNITS = {"year": "Y", "yearquarter": "Q", "yearmonth": "M", "yearmonthdate": "D"}
+_SHORTHAND = re.compile(r"^(\w+)\((.*)\)$")
+
+
+def _parse(shorthand):
+    """'sum(Sales)' -> ('sum', 'Sales'), 'Region' -> (None, 'Region')."""
+    match = _SHORTHAND.match(shorthand)
+    return (match.group(1), match.group(2)) if match else (None, shorthand)
+
+
+def _type(series):
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return "temporal"
+    if pd.api.types.is_numeric_dtype(series) and not isinstance(series.dtype, pd.CategoricalDtype):
+        return "quantitative"
+    return "nominal"
+
+
+# ---------------- Aggregation ----------------
+def aggregate(df, **channels):
+    """
+    Evaluate Altair encoding shorthands on the server.
+
+    channels map an Altair channel to a shorthand, e.g. x="yearmonth(Order Date)",
+    y="sum(Sales)", color="Region". Plain fields and time units become group keys;
+    sum / mean / count become measures. Returns (one row per group, {channel: encoding})
+    so the chart receives the aggregated rows instead of every order.
+    """
+    keys, measures, encodings = {}, {}, {}
+    for channel, shorthand in channels.items():
+        op, field = _parse(shorthand)
+        enc = getattr(alt, channel.capitalize())
+        if op in AGGREGATES:
+            name = f"{op}_{field}" if field else op
+            measures[name] = (field or df.columns[0], "size" if op == "count" else op)
+            encodings[channel] = enc(f"{name}:Q", title=f"{AGGREGATES[op]} {field or 'Records'}")
+        elif op in TIME_UNITS:
+            keys[field] = df[field].dt.to_period(TIME_UNITS[op]).dt.start_time
+            encodings[channel] = enc(f"{field}:T", timeUnit=op)
+        elif op is None:
+            keys[field] = df[field]
+            encodings[channel] = enc(field, type=_type(df[field]))
+        else:
+            raise ValueError(f"Unsupported encoding '{shorthand}'")
+
+    if not keys:
+        raise ValueError("aggregate() needs at least one group key (a field or time unit)")
+    # Keys keep their field names, so the result's columns are the encoded fields
+    data = df.groupby(list(keys.values()), observed=True).agg(**measures)
+    return data.reset_index(), encodings
+
+
+def stratified_sample(df, by, n=MAX_POINTS, seed=0):
+    """
+    At most n rows drawn proportionally from each class of `by`, so the class mix
+    of the chart matches the data. Frames already under n pass through.
+    """
+    if len(df) <= n:
+        return df
+    sample = df.groupby(by, observed=True, group_keys=False).sample(frac=n / len(df), random_state=seed)
+    # Per-group rounding can overshoot; stay under the cap (Altair refuses > 5000 rows)
+    return sample.sample(n, random_state=seed) if len(sample) > n else sample
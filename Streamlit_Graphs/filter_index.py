@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+
+class FilterIndex:
+    """
+    Precomputed state for the global filters.
+
+    - Rows sorted by `date_col`, so a date range is a contiguous slice found with searchsorted.
+    - One packed row bitmap per category of each dimension (in sorted row order); a selection
+      ORs bitmaps within a dimension and ANDs across dimensions, reading only the bytes that
+      cover the date slice.
+
+    Filtering therefore costs O(rows in the date range), not O(table).
+    """
+
+    def __init__(self, df, date_col, dims):
+        self.date_col = date_col
+        self.dims = [d for d in dims if d in df.columns]
+        # Widget options in the source's order of appearance, as df[dim].unique() gave them
+        self.options = {dim: list(pd.unique(df[dim].dropna())) for dim in self.dims}
+
+        self.df = df.sort_values(date_col, kind="stable", na_position="last")
+        dates = self.df[date_col]
+        self.dates = dates.to_numpy(dtype="datetime64[ns]")[: int(dates.notna().sum())]
+        self.n_rows = len(self.df)
+
+        self.bitmaps, self.complete = {}, {}
+        for dim in self.dims:
+            cat = pd.Categorical(self.df[dim])
+            self.bitmaps[dim] = {value: np.packbits(cat.codes == k) for k, value in enumerate(cat.categories)}
+            # Selecting every category only skips the dimension if no row is missing it
+            self.complete[dim] = bool((cat.codes >= 0).all())
+
+    # ------------------- Selection -------------------
+    def date_slice(self, start, end):
+        """Row range [lo, hi) with start <= date <= end (Series.between)."""
+        lo = int(np.searchsorted(self.dates, np.datetime64(start, "ns"), side="left"))
+        hi = int(np.searchsorted(self.dates, np.datetime64(end, "ns"), side="right"))
+        return lo, max(lo, hi)
+
+    def positions(self, selection, start, end):
+        """Sorted row positions matching {dim: selected values} within [start, end]."""
+        lo, hi = self.date_slice(start, end)
+        b0, b1 = lo // 8, (hi + 7) // 8
+        packed = None
+        for dim in self.dims:
+            values = (selection or {}).get(dim)
+            if values is None or (self.complete[dim] and set(values) >= set(self.bitmaps[dim])):
+                continue
+            dim_bits = np.zeros(b1 - b0, dtype=np.uint8)
+            for value in values:
+                if value in self.bitmaps[dim]:
+                    dim_bits |= self.bitmaps[dim][value][b0:b1]
+            packed = dim_bits if packed is None else packed & dim_bits
+        if packed is None:
+            return np.arange(lo, hi)
+        bits = np.unpackbits(packed)[lo - 8 * b0: hi - 8 * b0]
+        return lo + np.flatnonzero(bits)
+
+    def filter(self, selection, start, end):
+        """Rows of the (date-sorted) frame matching the selection."""
+        pos = self.positions(selection, start, end)
+        if len(pos) and pos[-1] - pos[0] + 1 == len(pos):
+            return self.df.iloc[pos[0]: pos[-1] + 1]
+        return self.df.iloc[pos]
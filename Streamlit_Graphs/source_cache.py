@@ -0,0 +1,89 @@
+import hashlib
+import json
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+CATEGORICAL = ["Region", "Category", "Sub-Category"]
+DATES = ["Order Date"]
+
+
+# ---------------- Source Fingerprint ----------------
+def _stat(path):
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _hash_file(path):
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def cache_path(source, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, os.path.splitext(os.path.basename(source))[0] + ".feather")
+
+
+# ---------------- Convert ----------------
+def convert_excel(source, target):
+    """Read the workbook once and write it as uncompressed Feather (memory-mappable) with typed columns."""
+    meta = {**_stat(source), "hash": _hash_file(source)}  # taken first, so an edit mid-read invalidates
+    df = pd.read_excel(source)
+    for col in DATES:
+        df[col] = pd.to_datetime(df[col])
+    for col in CATEGORICAL:
+        df[col] = df[col].astype("category")
+    _write_cache(pa.Table.from_pandas(df, preserve_index=False), target, meta)
+    return df
+
+
+def _write_cache(table, target, meta):
+    table = table.replace_schema_metadata({**table.schema.metadata, b"source": json.dumps(meta).encode()})
+    try:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp = f"{target}.{os.getpid()}.tmp"
+        feather.write_feather(table, tmp, compression="uncompressed")
+        os.replace(tmp, target)
+    except OSError as e:
+        print(f"Could not write cache {target}: {e}")
+
+
+def _cached_source(target):
+    try:
+        with pa.memory_map(target) as source:
+            return json.loads(pa.ipc.open_file(source).schema.metadata[b"source"])
+    except (OSError, KeyError, ValueError, pa.ArrowInvalid):
+        return None
+
+
+def is_fresh(source, target):
+    """
+    Cache matches the source: same size and mtime, or (after a copy/touch) the same content
+    hash, in which case the new mtime is recorded so later loads skip the hash again.
+    """
+    meta = _cached_source(target)
+    if meta is None:
+        return False
+    stat = _stat(source)
+    if stat["size"] == meta["size"] and stat["mtime_ns"] == meta["mtime_ns"]:
+        return True
+    if stat["size"] != meta["size"] or _hash_file(source) != meta["hash"]:
+        return False
+    _write_cache(feather.read_table(target, memory_map=True), target, {**stat, "hash": meta["hash"]})
+    return True
+
+
+def load_excel(source, cache_dir=CACHE_DIR):
+    """
+    Superstore frame from the columnar cache, memory-mapped, converting the workbook
+    first if the cache is missing or stale.
+    """
+    target = cache_path(source, cache_dir)
+    if not is_fresh(source, target):
+        return convert_excel(source, target)
+    return feather.read_table(target, memory_map=True).to_pandas(split_blocks=True)